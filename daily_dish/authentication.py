@@ -1,8 +1,8 @@
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from django.contrib.auth import get_user_model
-from .models import ApiKey
 from django.utils import timezone
+from .services import api_keys
 
 User = get_user_model()
 
@@ -19,24 +19,20 @@ class ApiKeyAuthentication(BaseAuthentication):
         if not api_key:
             return None
         
-        try:
-            api_key_obj = ApiKey.objects.get(api_key=api_key, is_active=True)
-            
-            # 有効期限チェック
-            if api_key_obj.expires_at and api_key_obj.expires_at < timezone.now():
-                raise AuthenticationFailed('API Key has expired')
-            
-            # 使用回数と最終使用日時を更新
-            api_key_obj.usage_count += 1
-            api_key_obj.last_used_at = timezone.now()
-            api_key_obj.save()
-            
-            # API Key認証の場合は特別なユーザーオブジェクトを返す
-            # 実際の認証には使用しないが、ログ等で識別するため
-            return (None, api_key_obj)
-            
-        except ApiKey.DoesNotExist:
+        api_key_obj = api_keys.get_active_key(api_key)
+        if api_key_obj is None:
             raise AuthenticationFailed('Invalid API Key')
+        
+        # 有効期限チェック
+        if api_key_obj.expires_at and api_key_obj.expires_at < timezone.now():
+            raise AuthenticationFailed('API Key has expired')
+        
+        # 使用回数と最終使用日時はまとめて反映する（リクエストごとの書き込みなし）
+        api_keys.record_usage(api_key_obj)
+        
+        # API Key認証の場合は特別なユーザーオブジェクトを返す
+        # 実際の認証には使用しないが、ログ等で識別するため
+        return (None, api_key_obj)
     
     def authenticate_header(self, request):
         return 'X-API-KEY'
@@ -0,0 +1,427 @@
+# daily_dish/cache_backends.py
+"""
+2層キャッシュ（プロセス内L1 + Redis L2）
+
+- L1: ワーカープロセスごとの上限付きLRU。読み取りで温まり、よく使うキーはRedisへ行かずに返す
+- 無効化: 書き込み（set/delete/incr 等）はキーをRedis pub/subで通知し、他のワーカーはL1から破棄する
+- サーキットブレーカー: Redisへの接続エラーが続いたら一定時間Redisを呼ばずL1のみで動く
+  （接続・読み取りタイムアウトは OPTIONS の SOCKET_CONNECT_TIMEOUT / SOCKET_TIMEOUT で短くする）
+- ヒット率などは services/metrics.py のメトリクスとして /api/internal/metrics に出力する
+
+Djangoはキャッシュのインスタンスをスレッドごとに作るため、L1・ブレーカー・購読スレッドは
+LOCATION ごとにプロセス内で共有する（fork後は作り直す）。
+"""
+import logging
+import os
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from urllib.parse import urlsplit
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django_redis.cache import RedisCache
+from django_redis.exceptions import ConnectionInterrupted
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from .services import metrics
+
+logger = logging.getLogger(__name__)
+
+# Redisに到達できなかったとみなす例外（それ以外の例外はRedisが応答したものとして扱う）
+L2_ERRORS = (ConnectionInterrupted, RedisConnectionError, RedisTimeoutError, OSError)
+# L1に値のまま保持する型（それ以外は呼び出し元の変更が共有されないよう pickle して保持）
+IMMUTABLE_TYPES = (int, float, str, bytes, bool, type(None))
+CLEAR_ALL = '*'
+
+_MISSING = object()
+
+
+class CircuitBreaker:
+    """連続 failure_threshold 回の失敗で開き、reset_timeout 秒後に1回だけ試行（半開）する"""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self.trial_in_flight or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self.trial_in_flight = True
+            return True
+
+    def success(self) -> bool:
+        """成功を記録（開いていた回路が閉じたら True）"""
+        with self._lock:
+            recovered = self.opened_at is not None
+            self.failures = 0
+            self.opened_at = None
+            self.trial_in_flight = False
+            return recovered
+
+    def failure(self) -> bool:
+        """失敗を記録（回路が新たに開いたら True）"""
+        with self._lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.opened_at is not None:
+                # 半開での試行が失敗したら再び待つ
+                self.opened_at = time.monotonic()
+                return False
+            if self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+class LocalCache:
+    """有効期限付きの上限付きLRU"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key -> (expires_at, pickled, value)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=_MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, pickled, value = entry
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+        return pickle.loads(value) if pickled else value
+
+    def set(self, key, value, ttl: float):
+        if ttl <= 0:
+            self.delete(key)
+            return
+        pickled = not isinstance(value, IMMUTABLE_TYPES)
+        entry = (time.monotonic() + ttl, pickled, pickle.dumps(value, pickle.HIGHEST_PROTOCOL) if pickled else value)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete(self, key) -> bool:
+        with self._lock:
+            return self._data.pop(key, None) is not None
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class TieredState:
+    """プロセス内で共有する状態（L1・ブレーカー・統計・無効化の購読）"""
+
+    def __init__(self, name: str, channel, max_entries: int, failure_threshold: int, reset_timeout: float):
+        self.name = name
+        self.channel = channel
+        self.pid = os.getpid()
+        # 自分が送った無効化通知を無視するための識別子
+        self.origin = uuid.uuid4().hex
+        self.local = LocalCache(max_entries)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        # 結果 -> カウンター（メトリクスAPIはワーカーをまたいで合計する）
+        self.requests = {
+            result: metrics.CACHE_REQUESTS.labels(name, result) for result in ('l1_hit', 'l2_hit', 'miss')
+        }
+        self.l2_errors = metrics.CACHE_L2_ERRORS.labels(name)
+        self.circuit_open = metrics.CACHE_CIRCUIT_OPEN.labels(name)
+        self.l1_entries = metrics.CACHE_L1_ENTRIES.labels(name)
+        self.subscriber = None
+        self._lock = threading.Lock()
+
+    def count(self, result: str):
+        self.requests[result].inc()
+        self.l1_entries.set(len(self.local))
+
+    def handle_message(self, data):
+        """無効化通知 "<origin> <key>" を処理（自分の通知は無視）"""
+        if isinstance(data, bytes):
+            data = data.decode()
+        origin, _, key = data.partition(' ')
+        if origin == self.origin:
+            return
+        if key == CLEAR_ALL:
+            self.local.clear()
+        else:
+            self.local.delete(key)
+
+    def ensure_subscriber(self, get_client):
+        if self.channel is None or self.subscriber is not None:
+            return
+        with self._lock:
+            if self.subscriber is None:
+                self.subscriber = threading.Thread(
+                    target=self._listen, args=(get_client,), name=f'cache-invalidation-{self.name}', daemon=True
+                )
+                self.subscriber.start()
+
+    def _listen(self, get_client):
+        backoff = 0.5
+        while True:
+            try:
+                pubsub = get_client().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # 購読していなかった間の通知は届かないためL1を捨てる
+                self.local.clear()
+                backoff = 0.5
+                while True:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None and message['type'] == 'message':
+                        self.handle_message(message['data'])
+            except Exception:
+                logger.warning('Cache invalidation subscriber disconnected (%s)', self.channel, exc_info=True)
+                self.local.clear()
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+
+# (LOCATION, チャンネル) -> TieredState
+_states = {}
+_states_lock = threading.Lock()
+
+
+def _shared_state(key, factory) -> TieredState:
+    with _states_lock:
+        state = _states.get(key)
+        if state is None or state.pid != os.getpid():
+            state = _states[key] = factory()
+        return state
+
+
+def _display_name(server) -> str:
+    """メトリクスのラベル用のサーバー名（URLの認証情報は含めない）"""
+    if isinstance(server, (list, tuple)):
+        server = ','.join(server)
+    parts = [urlsplit(location.strip()) for location in str(server).split(',')]
+    return ','.join(f'{part.hostname}:{part.port or 6379}{part.path}' if part.hostname else part.path for part in parts)
+
+
+class TieredRedisCache(RedisCache):
+    """
+    django_redis の RedisCache の前段にプロセス内LRUを置くキャッシュ
+    OPTIONS:
+    - L1_MAX_ENTRIES: L1の上限件数（既定 1000）
+    - L1_TIMEOUT: L1に保持する秒数の上限（既定 30、無効化通知が届かない場合の最大のずれ）
+    - INVALIDATION_CHANNEL: 無効化通知のチャンネル（None で無効）
+    - CIRCUIT_FAILURE_THRESHOLD / CIRCUIT_RESET_TIMEOUT: ブレーカーが開く連続失敗回数 / 再試行までの秒数
+    Redisに到達できない間の書き込みはL1にのみ反映され、復旧時にL1を破棄してRedisに合わせる。
+    incr / decr はワーカーごとに値が食い違わないよう、Redisに到達できない間は ValueError を送出する。
+    """
+
+    def __init__(self, server, params):
+        params = dict(params)
+        options = params['OPTIONS'] = dict(params.get('OPTIONS', {}))
+        max_entries = options.pop('L1_MAX_ENTRIES', 1000)
+        self.l1_timeout = options.pop('L1_TIMEOUT', 30)
+        channel = options.pop('INVALIDATION_CHANNEL', f"{params.get('KEY_PREFIX') or 'daily_dish'}:cache-invalidation")
+        failure_threshold = options.pop('CIRCUIT_FAILURE_THRESHOLD', 2)
+        reset_timeout = options.pop('CIRCUIT_RESET_TIMEOUT', 15)
+        super().__init__(server, params)
+        self._state_key = (str(server), channel)
+        self._state_factory = lambda: TieredState(
+            _display_name(server), channel, max_entries, failure_threshold, reset_timeout
+        )
+
+    @property
+    def state(self) -> TieredState:
+        return _shared_state(self._state_key, self._state_factory)
+
+    def _l1_key(self, key, version=None) -> str:
+        return str(self.client.make_key(key, version=version))
+
+    def _l1_ttl(self, timeout) -> float:
+        if timeout is DEFAULT_TIMEOUT:
+            timeout = self.default_timeout
+        return self.l1_timeout if timeout is None else min(self.l1_timeout, timeout)
+
+    def _l2(self, call, fallback):
+        """Redisを呼ぶ（回路が開いている・到達できない場合は fallback の結果）"""
+        state = self.state
+        if not state.breaker.allow():
+            return fallback()
+        try:
+            result = call()
+        except L2_ERRORS:
+            state.l2_errors.inc()
+            if state.breaker.failure():
+                state.circuit_open.set(1)
+                logger.warning('Redis unreachable, serving cache from process memory for %ss', state.breaker.reset_timeout)
+            return fallback()
+        except Exception:
+            # Redisは応答している（ValueError など呼び出し側の例外）
+            self._succeeded(state)
+            raise
+        self._succeeded(state)
+        return result
+
+    def _succeeded(self, state):
+        if state.breaker.success():
+            # 障害中のL1だけの書き込みは他のワーカーと食い違うため捨てる
+            logger.warning('Redis reachable again, dropping process-memory cache')
+            state.circuit_open.set(0)
+            state.local.clear()
+        state.ensure_subscriber(lambda: self.client.get_client(write=True))
+
+    def _l2_write(self, l1_key: str, call, fallback):
+        """Redisへ書き込み、書き込めたら他のワーカーへ無効化を通知"""
+        written = []
+
+        def write():
+            result = call()
+            written.append(True)
+            return result
+
+        result = self._l2(write, fallback)
+        if written:
+            self._publish(l1_key)
+        return result
+
+    def _publish(self, l1_key: str):
+        """無効化を通知（失敗しても書き込みは成功しているため、他のワーカーのL1は L1_TIMEOUT で切れるのを待つ）"""
+        state = self.state
+        if state.channel is None:
+            return
+        try:
+            self.client.get_client(write=True).publish(state.channel, f'{state.origin} {l1_key}')
+        except Exception:
+            logger.warning('Failed to publish cache invalidation (%s)', state.channel, exc_info=True)
+
+    # 読み取り
+
+    def get(self, key, default=None, version=None, client=None):
+        state = self.state
+        l1_key = self._l1_key(key, version)
+        value = state.local.get(l1_key)
+        if value is not _MISSING:
+            state.count('l1_hit')
+            return value
+        value = self._l2(lambda: super(TieredRedisCache, self).get(key, _MISSING, version, client), lambda: _MISSING)
+        if value is _MISSING:
+            state.count('miss')
+            return default
+        state.count('l2_hit')
+        state.local.set(l1_key, value, self.l1_timeout)
+        return value
+
+    def get_many(self, keys, version=None, client=None):
+        state = self.state
+        found, remaining = {}, {}
+        for key in keys:
+            l1_key = self._l1_key(key, version)
+            value = state.local.get(l1_key)
+            if value is _MISSING:
+                remaining[key] = l1_key
+            else:
+                state.count('l1_hit')
+                found[key] = value
+        if remaining:
+            fetched = self._l2(lambda: super(TieredRedisCache, self).get_many(list(remaining), version=version, client=client), dict)
+            for key, l1_key in remaining.items():
+                if key in fetched:
+                    state.count('l2_hit')
+                    state.local.set(l1_key, fetched[key], self.l1_timeout)
+                    found[key] = fetched[key]
+                else:
+                    state.count('miss')
+        return found
+
+    def has_key(self, key, version=None, client=None):
+        return self.get(key, _MISSING, version=version, client=client) is not _MISSING
+
+    # 書き込み（L1へ反映し、他のワーカーへ無効化を通知）
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None, nx=False, xx=False):
+        state = self.state
+        l1_key = self._l1_key(key, version)
+
+        def call():
+            return super(TieredRedisCache, self).set(key, value, timeout=timeout, version=version, client=client, nx=nx, xx=xx)
+
+        def fallback():
+            exists = state.local.get(l1_key) is not _MISSING
+            return not (nx and exists or xx and not exists)
+
+        stored = self._l2_write(l1_key, call, fallback)
+        if stored:
+            state.local.set(l1_key, value, self._l1_ttl(timeout))
+        return stored
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        return self.set(key, value, timeout=timeout, version=version, client=client, nx=True)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        for key, value in data.items():
+            self.set(key, value, timeout=timeout, version=version, client=client)
+        return []
+
+    def delete(self, key, version=None, prefix=None, client=None):
+        state = self.state
+        l1_key = self._l1_key(key, version)
+        deleted = state.local.delete(l1_key)
+
+        def call():
+            return super(TieredRedisCache, self).delete(key, version=version, prefix=prefix, client=client)
+
+        return self._l2_write(l1_key, call, lambda: deleted)
+
+    def delete_many(self, keys, version=None, client=None):
+        return sum(bool(self.delete(key, version=version, client=client)) for key in keys)
+
+    def _incr(self, key, delta, version, client):
+        state = self.state
+        l1_key = self._l1_key(key, version)
+
+        def call():
+            return super(TieredRedisCache, self).incr(key, delta=delta, version=version, client=client)
+
+        def fallback():
+            # L1の値から数えるとワーカーごとに値が分かれ、復旧後に障害前の値と重なることがある
+            # （バージョン番号は ValueError を受けて時刻から作り直す）
+            raise ValueError(f"Key '{key}' cannot be incremented while Redis is unreachable")
+
+        value = self._l2_write(l1_key, call, fallback)
+        state.local.set(l1_key, value, self.l1_timeout)
+        return value
+
+    def incr(self, key, delta=1, version=None, client=None):
+        return self._incr(key, delta, version, client)
+
+    def decr(self, key, delta=1, version=None, client=None):
+        return self._incr(key, -delta, version, client)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None, client=None):
+        state = self.state
+        exists = state.local.get(self._l1_key(key, version)) is not _MISSING
+        return self._l2(lambda: super(TieredRedisCache, self).touch(key, timeout=timeout, version=version, client=client), lambda: exists)
+
+    def clear(self):
+        state = self.state
+        state.local.clear()
+
+        def call():
+            return super(TieredRedisCache, self).clear()
+
+        return self._l2_write(CLEAR_ALL, call, lambda: None)
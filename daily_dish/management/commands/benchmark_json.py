@@ -0,0 +1,84 @@
+import timeit
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from daily_dish.models import Recipe, User
+from daily_dish.parsers import FastJSONParser
+from daily_dish.renderers import FastJSONRenderer, orjson
+from daily_dish.serializers import RecipeSerializer
+
+
+def build_page(rows):
+    """レシピ一覧1ページ分のシリアライズ済みデータを作成（DBは使わない）"""
+    user = User(id=1, username='benchmark')
+    now = timezone.now()
+    recipes = []
+    for i in range(rows):
+        recipe = Recipe(
+            id=i + 1, user=user, recipe_name=f'ベンチマーク用レシピ{i}',
+            recipe_url=f'https://example.com/recipes/{i}',
+            created_at=now - timedelta(minutes=i), updated_at=now,
+        )
+        recipe.set_ingredients([
+            {'name': f'材料{n}', 'amount': Decimal(f'{n * 10 + 0.5}'), 'unit': 'g'}
+            for n in range(1, 11)
+        ])
+        recipes.append(recipe)
+    return {
+        'count': rows,
+        'next': None,
+        'previous': None,
+        'results': RecipeSerializer(recipes, many=True).data,
+    }
+
+
+class Command(BaseCommand):
+    """JSONレンダラー・パーサーの処理時間を比較する"""
+    help = 'JSONRenderer/JSONParser と FastJSONRenderer/FastJSONParser の処理時間を比較します'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[20, 1000],
+            help='1ページの件数（複数指定可）'
+        )
+        parser.add_argument(
+            '--number',
+            type=int,
+            default=50,
+            help='計測の繰り返し回数'
+        )
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write('orjsonがインストールされていないため、標準のjsonモジュールで計測します')
+
+        number = options['number']
+        stock_renderer, fast_renderer = JSONRenderer(), FastJSONRenderer()
+        stock_parser, fast_parser = JSONParser(), FastJSONParser()
+
+        self.stdout.write(f"{'rows':>6} {'bytes':>9} {'render (stock/fast)':>24} {'parse (stock/fast)':>24}")
+        for rows in options['rows']:
+            data = build_page(rows)
+            body = stock_renderer.render(data)
+            if fast_renderer.render(data) != body:
+                self.stderr.write(f'{rows}件: 出力が一致しません')
+
+            render_stock = timeit.timeit(lambda: stock_renderer.render(data), number=number) / number
+            render_fast = timeit.timeit(lambda: fast_renderer.render(data), number=number) / number
+            parse_stock = timeit.timeit(lambda: stock_parser.parse(BytesIO(body)), number=number) / number
+            parse_fast = timeit.timeit(lambda: fast_parser.parse(BytesIO(body)), number=number) / number
+
+            self.stdout.write(
+                f'{rows:>6} {len(body):>9} '
+                f'{render_stock * 1000:>9.3f}ms/{render_fast * 1000:>7.3f}ms ({render_stock / render_fast:4.1f}x) '
+                f'{parse_stock * 1000:>9.3f}ms/{parse_fast * 1000:>7.3f}ms ({parse_stock / parse_fast:4.1f}x)'
+            )
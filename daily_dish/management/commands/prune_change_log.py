@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from daily_dish.services import change_feed
+
+
+class Command(BaseCommand):
+    """保持期間を過ぎた変更履歴（ChangeLog）を削除する"""
+    help = '差分同期フィードの変更履歴のうち保持期間（CHANGE_LOG_RETENTION_DAYS）を過ぎたものを削除します'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'CHANGE_LOG_RETENTION_DAYS', 30),
+            help='残す日数'
+        )
+    
+    def handle(self, *args, **options):
+        deleted = change_feed.prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"{deleted}件の変更履歴を削除しました"))
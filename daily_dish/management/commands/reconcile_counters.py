@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from daily_dish.models import UserCounter
+from daily_dish.services import conditional, counters, dashboard
+from daily_dish.services.cache_versions import bump_version
+
+
+class Command(BaseCommand):
+    """件数カウンターを実件数と照合し、ずれを修正する"""
+    help = '件数カウンター（UserCounter / GlobalCounter）を実件数から再集計します'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='ずれを表示するだけで修正しない'
+        )
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        
+        drift = counters.find_user_drift()
+        for user_id, counts in drift:
+            self.stdout.write(f"user {user_id}: {counts}")
+        
+        global_stats = counters.count_global_rows()
+        global_drift = counters.get_global_stats() != global_stats
+        if global_drift:
+            self.stdout.write(f"global: {global_stats}")
+        
+        if dry_run:
+            self.stdout.write(f"{len(drift)}件のユーザーカウンターにずれがあります")
+            return
+        
+        with transaction.atomic():
+            for user_id, counts in drift:
+                UserCounter.objects.update_or_create(user_id=user_id, defaults=counts)
+            if global_drift:
+                counters.rebuild_global_counter()
+        # キャッシュ済みの統計を破棄
+        for user_id, _ in drift:
+            bump_version(dashboard.DASHBOARD_VERSION, user_id)
+        if global_drift:
+            bump_version(dashboard.DASHBOARD_VERSION, conditional.ALL_USERS)
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(drift)}件のユーザーカウンターを修正しました"
+            + ("（全体カウンターも修正）" if global_drift else "")
+        ))
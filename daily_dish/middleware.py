@@ -0,0 +1,66 @@
+import logging
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connection
+
+from .services import metrics, slow_queries
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """QUERY_BUDGETS のクエリ数を超えた（QUERY_BUDGET_STRICT=True のときのみ送出）"""
+
+
+class MetricsMiddleware:
+    """
+    エンドポイント（URL名・メソッド）ごとにSQL件数・SQL時間・レイテンシを計測する
+    - SERVER_TIMING=True で Server-Timing ヘッダーを付与
+    - QUERY_BUDGETS の上限を超えたら警告ログ（QUERY_BUDGET_STRICT=True なら例外）
+    MIDDLEWARE の先頭に置く。ストリーミングレスポンスの本文生成中のSQLは含まない。
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = perf_counter()
+        request_metrics = metrics.RequestMetrics()
+        request.metrics = request_metrics
+        with connection.execute_wrapper(request_metrics):
+            response = self.get_response(request)
+        total = perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match is not None else metrics.UNMATCHED_VIEW
+        metrics.record_request(view, request.method, request_metrics, total)
+
+        if getattr(settings, 'SERVER_TIMING', False):
+            response['Server-Timing'] = request_metrics.server_timing(total)
+
+        budget = metrics.query_budget(view, request.method)
+        if budget is not None and request_metrics.queries > budget:
+            metrics.record_budget_exceeded(view, request.method)
+            message = f'{request.method} {view}: {request_metrics.queries} queries (budget {budget})'
+            if getattr(settings, 'QUERY_BUDGET_STRICT', False):
+                raise QueryBudgetExceeded(message)
+            logger.warning('Query budget exceeded: %s', message)
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """
+    SLOW_QUERY_THRESHOLD_MS を超えたクエリを実行計画付きでログに出力する
+    （services/slow_queries.py、未設定時は何もしない）
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        threshold = slow_queries.threshold()
+        if threshold is None:
+            return self.get_response(request)
+        with connection.execute_wrapper(slow_queries.SlowQueryLogger(request, threshold)):
+            return self.get_response(request)
@@ -0,0 +1,60 @@
+# Generated by Django 4.2 on 2026-10-18 07:45
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_wide_columns(apps, schema_editor):
+    """既存レシピのワイドカラムからRecipeIngredientを作成"""
+    Recipe = apps.get_model('daily_dish', 'Recipe')
+    RecipeIngredient = apps.get_model('daily_dish', 'RecipeIngredient')
+    
+    batch = []
+    for recipe in Recipe.objects.order_by('id').iterator(chunk_size=500):
+        for i in range(1, 21):
+            name = getattr(recipe, f'ingredient_{i}')
+            amount = getattr(recipe, f'amount_{i}')
+            unit = getattr(recipe, f'unit_{i}')
+            if name and amount and unit:
+                batch.append(RecipeIngredient(
+                    recipe_id=recipe.id, position=i, name=name, amount=amount, unit=unit
+                ))
+        if len(batch) >= 1000:
+            RecipeIngredient.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        RecipeIngredient.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0002_user_line_user_id_user_users_line_us_d15412_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecipeIngredient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('name', models.CharField(max_length=100)),
+                ('amount', models.DecimalField(decimal_places=1, max_digits=10)),
+                ('unit', models.CharField(max_length=20)),
+                ('recipe', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='recipe_ingredients', to='daily_dish.recipe')),
+            ],
+            options={
+                'db_table': 'recipe_ingredients',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='recipeingredient',
+            index=models.Index(fields=['name', 'recipe'], name='recipe_ingr_name_631fc1_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='recipeingredient',
+            unique_together={('recipe', 'position')},
+        ),
+        # ワイドカラムは移行期間中も残すため、逆方向は何もしない
+        migrations.RunPython(copy_wide_columns, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.2 on 2026-10-18 07:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0003_recipe_ingredient'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GlobalCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_recipes', models.BigIntegerField(default=0)),
+                ('total_cooked_dishes', models.BigIntegerField(default=0)),
+                ('total_users', models.BigIntegerField(default=0)),
+                ('total_ingredient_cache', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'global_counters',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total_recipes', models.IntegerField(default=0)),
+                ('total_cooked_dishes', models.IntegerField(default=0)),
+                ('total_ingredient_cache', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'user_counters',
+            },
+        ),
+    ]
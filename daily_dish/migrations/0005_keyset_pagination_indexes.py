@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 07:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0004_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cookeddish',
+            index=models.Index(fields=['-created_at', '-id'], name='cooked_dish_created_7eded0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientcache',
+            index=models.Index(fields=['-created_at', '-id'], name='ingredient__created_29bcc9_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['-created_at', '-id'], name='recipes_created_9aa31f_idx'),
+        ),
+    ]
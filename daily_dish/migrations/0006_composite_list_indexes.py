@@ -0,0 +1,71 @@
+# Generated by Django 4.2 on 2026-10-18 07:52
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        # 新しいインデックスを先に作成してから、重複するインデックスを削除する
+        migrations.AddIndex(
+            model_name='cookeddish',
+            index=models.Index(fields=['user', '-created_at', '-id', 'recipe'], name='cooked_dish_user_id_4e5289_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='cookeddish',
+            index=models.Index(fields=['-created_at', '-id', 'recipe', 'user'], name='cooked_dish_created_b90988_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ingredientcache',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='ingredient__user_id_4c8bf0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recipe',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='recipes_user_id_f74ee6_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='cookeddish',
+            name='cooked_dish_user_id_d1e44a_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cookeddish',
+            name='cooked_dish_recipe__9ed29b_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cookeddish',
+            name='cooked_dish_created_369ea1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='cookeddish',
+            name='cooked_dish_created_7eded0_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ingredientcache',
+            name='ingredient__user_id_47e501_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='recipe',
+            name='recipes_user_id_cc6c4b_idx',
+        ),
+        migrations.AlterField(
+            model_name='cookeddish',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='ingredientcache',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='user',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
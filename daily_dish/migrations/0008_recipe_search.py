@@ -0,0 +1,83 @@
+# Generated by Django 4.2 on 2026-10-18 08:10
+
+import unicodedata
+
+from django.db import migrations
+
+# 以下は services/search.py・services/ingredients.py のこの時点の実装の写し
+# （アプリのコードが変わっても、このマイグレーションの結果は変わらないようにする）
+SEARCH_TABLE = 'recipe_search'
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def bigrams(term):
+    term = ''.join(ch for ch in normalize(term) if ch.isalnum())
+    if not term:
+        return []
+    return [term[i:i + 2] for i in range(len(term) - 1)] + [term[-1]]
+
+
+def document_terms(recipe_name, ingredient_names):
+    terms = [normalize(recipe_name)] + [normalize(name) for name in ingredient_names]
+    return [term for term in terms if term]
+
+
+def index_recipe(schema_editor, recipe_id, terms):
+    if schema_editor.connection.vendor == 'sqlite':
+        tokens = ' '.join(token for term in terms for token in bigrams(term))
+        schema_editor.execute(f'INSERT INTO {SEARCH_TABLE} (rowid, tokens) VALUES (%s, %s)', [recipe_id, tokens])
+    else:
+        schema_editor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (recipe_id, document) VALUES (%s, %s)', [recipe_id, '\n'.join(terms)]
+        )
+
+
+def create_search_index(apps, schema_editor):
+    """DBに応じた検索索引を作成し、既存レシピを索引"""
+    connection = schema_editor.connection
+    if connection.vendor == 'sqlite':
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {SEARCH_TABLE} "
+            "USING fts5(tokens, tokenize='unicode61 remove_diacritics 0')"
+        )
+    elif connection.vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        schema_editor.execute(
+            f'CREATE TABLE {SEARCH_TABLE} ('
+            'recipe_id bigint PRIMARY KEY REFERENCES recipes (id) ON DELETE CASCADE, '
+            'document text NOT NULL)'
+        )
+        schema_editor.execute(
+            f'CREATE INDEX recipe_search_document_trgm ON {SEARCH_TABLE} '
+            'USING gin (document gin_trgm_ops)'
+        )
+    else:
+        return
+    
+    Recipe = apps.get_model('daily_dish', 'Recipe')
+    RecipeIngredient = apps.get_model('daily_dish', 'RecipeIngredient')
+    for recipe in Recipe.objects.order_by('id').iterator(chunk_size=500):
+        names = RecipeIngredient.objects.filter(recipe_id=recipe.id).order_by('position').values_list('name', flat=True)
+        index_recipe(schema_editor, recipe.id, document_terms(recipe.recipe_name, names))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0007_change_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
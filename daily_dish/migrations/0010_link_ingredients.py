@@ -0,0 +1,135 @@
+# Generated by Django 4.2 on 2026-10-18 08:02
+
+from decimal import Decimal
+import unicodedata
+
+from django.db import migrations, models
+
+
+# 以下は services/ingredients.py のこの時点の実装・同義語の写し
+# （アプリのコードが変わっても、このマイグレーションの結果は変わらないようにする）
+DEFAULT_SYNONYMS = {
+    '鶏肉': ['とり肉', 'とりにく', '鳥肉'],
+    '豚肉': ['ぶた肉', 'ぶたにく'],
+    '牛肉': ['ぎゅう肉', 'ぎゅうにく'],
+    '卵': ['たまご', '玉子'],
+    '玉ねぎ': ['たまねぎ', '玉葱'],
+    '人参': ['にんじん'],
+    'じゃがいも': ['じゃが芋', '馬鈴薯'],
+    '豆腐': ['とうふ'],
+    '醤油': ['しょうゆ', '醬油'],
+    '味噌': ['みそ'],
+    '砂糖': ['さとう'],
+    '塩': ['しお'],
+}
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def clean_name(name):
+    return ' '.join((name or '').split())
+
+
+def normalize_name(name):
+    text = unicodedata.normalize('NFKC', name or '').lower().translate(_KATAKANA_TO_HIRAGANA)
+    return ''.join(text.split())
+
+
+# 重複行の合算に使う単位の大きさ（質量はg・体積はml基準、services/units.py の表をこの時点で固定）
+UNIT_FACTORS = {
+    'g': ('mass', Decimal('1')), 'グラム': ('mass', Decimal('1')), 'gram': ('mass', Decimal('1')),
+    'grams': ('mass', Decimal('1')), 'kg': ('mass', Decimal('1000')), 'kilo': ('mass', Decimal('1000')),
+    'キロ': ('mass', Decimal('1000')), 'キログラム': ('mass', Decimal('1000')), 'mg': ('mass', Decimal('0.001')),
+    'ml': ('volume', Decimal('1')), 'cc': ('volume', Decimal('1')), 'ミリリットル': ('volume', Decimal('1')),
+    'dl': ('volume', Decimal('100')), 'l': ('volume', Decimal('1000')), 'ℓ': ('volume', Decimal('1000')),
+    'リットル': ('volume', Decimal('1000')), '大さじ': ('volume', Decimal('15')), '大匙': ('volume', Decimal('15')),
+    'tbsp': ('volume', Decimal('15')), '小さじ': ('volume', Decimal('5')), '小匙': ('volume', Decimal('5')),
+    'tsp': ('volume', Decimal('5')), 'カップ': ('volume', Decimal('200')), 'cup': ('volume', Decimal('200')),
+    '合': ('volume', Decimal('180')),
+}
+
+
+def convert_amount(amount, unit, to_unit):
+    """量を to_unit に換算（同じ次元でなければNone）"""
+    def lookup(value):
+        value = unicodedata.normalize('NFKC', value or '').strip()
+        return UNIT_FACTORS.get(value) or UNIT_FACTORS.get(value.lower())
+    source, target = lookup(unit), lookup(to_unit)
+    if source is None or target is None or source[0] != target[0]:
+        return None
+    return (amount * source[1] / target[1]).quantize(Decimal('0.1'))
+
+
+def link_ingredients(apps, schema_editor):
+    """同義語を登録し、既存の材料・食材キャッシュに正規食材IDを設定"""
+    Ingredient = apps.get_model('daily_dish', 'Ingredient')
+    IngredientSynonym = apps.get_model('daily_dish', 'IngredientSynonym')
+    RecipeIngredient = apps.get_model('daily_dish', 'RecipeIngredient')
+    IngredientCache = apps.get_model('daily_dish', 'IngredientCache')
+    UserCounter = apps.get_model('daily_dish', 'UserCounter')
+    GlobalCounter = apps.get_model('daily_dish', 'GlobalCounter')
+    ChangeLog = apps.get_model('daily_dish', 'ChangeLog')
+    
+    ids = {}
+    for name, synonyms in DEFAULT_SYNONYMS.items():
+        ingredient = Ingredient.objects.create(name=name, normalized_name=normalize_name(name))
+        ids[ingredient.normalized_name] = ingredient.id
+        for synonym in synonyms:
+            key = normalize_name(synonym)
+            if key not in ids:
+                IngredientSynonym.objects.create(ingredient=ingredient, normalized_name=key)
+                ids[key] = ingredient.id
+    
+    def ingredient_id(name):
+        key = normalize_name(name)
+        if not key:
+            return None
+        if key not in ids:
+            ids[key] = Ingredient.objects.create(name=clean_name(name), normalized_name=key).id
+        return ids[key]
+    
+    for name in RecipeIngredient.objects.values_list('name', flat=True).distinct():
+        RecipeIngredient.objects.filter(name=name).update(ingredient_id=ingredient_id(name))
+    
+    # 表記ゆれで重複している食材キャッシュは古い行にまとめる（単位が違えば古い行の単位に換算）
+    # 個数とgのように換算できない行は正規食材を設定せずに残す（IngredientCache.save() も設定しない）
+    kept = {}
+    for item in IngredientCache.objects.order_by('created_at', 'id').iterator():
+        item.ingredient_id = ingredient_id(item.ingredient_name)
+        key = (item.user_id, item.ingredient_id)
+        first = kept.get(key)
+        if first is None:
+            kept[key] = item
+            item.save(update_fields=['ingredient'])
+            continue
+        amount = item.amount if first.unit == item.unit else convert_amount(item.amount, item.unit, first.unit)
+        if amount is None:
+            continue
+        first.amount += amount
+        first.save(update_fields=['amount'])
+        item_id = item.id
+        item.delete()
+        # シグナルが発火しないため、件数カウンターと変更フィードを直接更新
+        UserCounter.objects.filter(user_id=item.user_id).update(
+            total_ingredient_cache=models.F('total_ingredient_cache') - 1
+        )
+        GlobalCounter.objects.filter(pk=1).update(
+            total_ingredient_cache=models.F('total_ingredient_cache') - 1
+        )
+        ChangeLog.objects.bulk_create([
+            ChangeLog(resource='ingredient-cache', object_id=first.id, action='upsert'),
+            ChangeLog(resource='ingredient-cache', object_id=item_id, action='delete'),
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0009_ingredients'),
+    ]
+
+    # PostgreSQLでは同じトランザクションでデータ更新の後にインデックス・制約を変更できない
+    # （pending trigger events）ため、スキーマ変更（0009・0011）と分ける
+    operations = [
+        migrations.RunPython(link_ingredients, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2 on 2026-10-18 08:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0010_link_ingredients'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recipeingredient',
+            index=models.Index(fields=['ingredient', 'recipe'], name='recipe_ingr_ingredi_d53db0_idx'),
+        ),
+        migrations.RemoveIndex(
+            model_name='recipeingredient',
+            name='recipe_ingr_name_631fc1_idx',
+        ),
+        migrations.AddConstraint(
+            model_name='ingredientcache',
+            constraint=models.UniqueConstraint(fields=('user', 'ingredient'), name='ingredient_cache_user_ingredient_uniq'),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2 on 2026-10-18 08:06
+
+from django.db import migrations, models
+
+
+def build_snapshots(apps, schema_editor):
+    """既存レシピのワイドカラムから材料スナップショットを作成"""
+    Recipe = apps.get_model('daily_dish', 'Recipe')
+    
+    batch = []
+    for recipe in Recipe.objects.order_by('id').iterator(chunk_size=500):
+        snapshot = []
+        for i in range(1, 21):
+            name = getattr(recipe, f'ingredient_{i}')
+            amount = getattr(recipe, f'amount_{i}')
+            unit = getattr(recipe, f'unit_{i}')
+            if name and amount and unit:
+                snapshot.append({'name': name, 'amount': float(amount), 'unit': unit})
+        recipe.ingredients_snapshot = snapshot
+        batch.append(recipe)
+        if len(batch) >= 500:
+            Recipe.objects.bulk_update(batch, ['ingredients_snapshot'])
+            batch = []
+    if batch:
+        Recipe.objects.bulk_update(batch, ['ingredients_snapshot'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0011_ingredient_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='ingredients_snapshot',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.RunPython(build_snapshots, migrations.RunPython.noop),
+    ]
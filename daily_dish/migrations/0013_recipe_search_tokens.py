@@ -0,0 +1,83 @@
+# Generated by Django 4.2 on 2026-10-18 09:40
+
+import unicodedata
+
+from django.db import migrations
+
+# 以下は services/search.py・services/ingredients.py のこの時点の実装の写し
+# （アプリのコードが変わっても、このマイグレーションの結果は変わらないようにする）
+SEARCH_TABLE = 'recipe_search'
+
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text):
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def search_tokens(terms):
+    tokens = set()
+    for term in terms:
+        term = ''.join(ch for ch in normalize(term) if ch.isalnum())
+        tokens.update(term[i:i + 2] for i in range(len(term) - 1))
+        tokens.update(term)
+    return sorted(tokens)
+
+
+def document_terms(recipe_name, ingredient_names):
+    terms = [normalize(recipe_name)] + [normalize(name) for name in ingredient_names]
+    return [term for term in terms if term]
+
+
+def _recipe_terms(apps):
+    Recipe = apps.get_model('daily_dish', 'Recipe')
+    RecipeIngredient = apps.get_model('daily_dish', 'RecipeIngredient')
+    for recipe in Recipe.objects.order_by('id').iterator(chunk_size=500):
+        names = RecipeIngredient.objects.filter(recipe_id=recipe.id).order_by('position').values_list('name', flat=True)
+        yield recipe.id, document_terms(recipe.recipe_name, names)
+
+
+def use_bigram_tokens(apps, schema_editor):
+    """
+    PostgreSQLの索引を pg_trgm の部分一致から bigram のトークン配列に置き換える
+    （pg_trgm は1〜2文字の検索語から trigram を取り出せず、索引全体を走査するため）
+    テーブル・インデックスの変更を先に行い、データの書き込みは最後に行う
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS recipe_search_document_trgm')
+    schema_editor.execute(f'ALTER TABLE {SEARCH_TABLE} DROP COLUMN document')
+    schema_editor.execute(f"ALTER TABLE {SEARCH_TABLE} ADD COLUMN tokens text[] NOT NULL DEFAULT '{{}}'")
+    schema_editor.execute(f'CREATE INDEX recipe_search_tokens ON {SEARCH_TABLE} USING gin (tokens)')
+    for recipe_id, terms in _recipe_terms(apps):
+        schema_editor.execute(
+            f'UPDATE {SEARCH_TABLE} SET tokens = %s WHERE recipe_id = %s', [search_tokens(terms), recipe_id]
+        )
+
+
+def use_trigram_document(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS recipe_search_tokens')
+    schema_editor.execute(f'ALTER TABLE {SEARCH_TABLE} DROP COLUMN tokens')
+    schema_editor.execute(f"ALTER TABLE {SEARCH_TABLE} ADD COLUMN document text NOT NULL DEFAULT ''")
+    schema_editor.execute(
+        f'CREATE INDEX recipe_search_document_trgm ON {SEARCH_TABLE} '
+        'USING gin (document gin_trgm_ops)'
+    )
+    for recipe_id, terms in _recipe_terms(apps):
+        schema_editor.execute(
+            f'UPDATE {SEARCH_TABLE} SET document = %s WHERE recipe_id = %s', ['\n'.join(terms), recipe_id]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('daily_dish', '0012_recipe_ingredients_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(use_bigram_tokens, use_trigram_document),
+    ]
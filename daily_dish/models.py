@@ -1,4 +1,5 @@
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Prefetch
 from django.contrib.auth.models import AbstractUser
 from django.core.exceptions import ValidationError
 from decimal import Decimal
@@ -28,11 +29,80 @@ class User(AbstractUser):
     def is_line_linked(self):
         """LINE連携状態の確認"""
         return bool(self.line_user_id)
+    
+    def save(self, *args, **kwargs):
+        """件数カウンター（post_saveで更新）と同じトランザクションで保存"""
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+
+
+class Ingredient(models.Model):
+    """正規食材モデル（表記ゆれをまとめた食材の辞書）"""
+    name = models.CharField(max_length=100)  # 表示名
+    normalized_name = models.CharField(max_length=100, unique=True)  # 照合用キー
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'ingredients'
+    
+    def __str__(self):
+        return self.name
+
+
+class IngredientSynonym(models.Model):
+    """食材の別表記（とり肉 -> 鶏肉 など）"""
+    ingredient = models.ForeignKey(Ingredient, on_delete=models.CASCADE, related_name='synonyms')
+    normalized_name = models.CharField(max_length=100, unique=True)  # 別表記の照合用キー
+    
+    class Meta:
+        db_table = 'ingredient_synonyms'
+    
+    def __str__(self):
+        return f"{self.normalized_name} -> {self.ingredient_id}"
+
+
+# 材料スロット（ingredient_N / amount_N / unit_N）のフィールド名
+INGREDIENT_SLOT_FIELDS = frozenset(
+    f'{prefix}_{i}'
+    for i in range(1, 21)
+    for prefix in ('ingredient', 'amount', 'unit')
+)
+
+
+# 一覧APIで読み込む列（ワイドカラムは読まない）
+RECIPE_LISTING_FIELDS = (
+    'id', 'user_id', 'recipe_name', 'recipe_url', 'ingredients_snapshot', 'created_at', 'updated_at'
+)
+
+
+class RecipeQuerySet(models.QuerySet):
+    """レシピ用クエリセット"""
+    
+    def with_ingredients(self):
+        """正規化テーブルの材料をまとめて取得（get_ingredientsの二重読み込み用）"""
+        return self.prefetch_related(
+            Prefetch('recipe_ingredients', queryset=RecipeIngredient.objects.order_by('position'))
+        )
+    
+    def listing(self):
+        """一覧表示に必要な列だけを取得（材料はスナップショット列から読む）"""
+        return self.only(*RECIPE_LISTING_FIELDS)
+    
+    def using_ingredient(self, name):
+        """指定した材料（表記ゆれを含む）を使うレシピに絞り込み（(ingredient, recipe)インデックスを利用）"""
+        from .services.ingredients import resolve_id
+        ingredient_id = resolve_id(name, create=False)
+        if ingredient_id is None:
+            return self.none()
+        return self.filter(
+            id__in=RecipeIngredient.objects.filter(ingredient_id=ingredient_id).values('recipe_id')
+        )
 
 
 class Recipe(models.Model):
     """統一レシピモデル（既存・新規両方対応）"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # user_idの検索は(user, -created_at, -id)インデックスで行う
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     recipe_name = models.CharField(max_length=255)
     recipe_url = models.URLField(max_length=500, null=True, blank=True)  # URLフィールド追加
     
@@ -117,29 +187,86 @@ class Recipe(models.Model):
     amount_20 = models.DecimalField(max_digits=10, decimal_places=1, null=True, blank=True)
     unit_20 = models.CharField(max_length=20, null=True, blank=True)
     
+    # get_ingredients()の結果を保存したもの（save時に更新、一覧APIはこの列だけを読む）
+    ingredients_snapshot = models.JSONField(default=list, blank=True)
+    
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    objects = RecipeQuerySet.as_manager()
+    
     class Meta:
         db_table = 'recipes'
         indexes = [
-            models.Index(fields=['user']),
+            # ユーザー別一覧（WHERE user_id = ? ORDER BY created_at DESC, id DESC）
+            models.Index(fields=['user', '-created_at', '-id']),
+            # 全体一覧・キーセットページネーション（外部API）
+            models.Index(fields=['-created_at', '-id']),
         ]
     
-    def get_ingredients(self):
-        """材料リストを取得"""
-        ingredients = []
+    def save(self, *args, **kwargs):
+        """保存時に材料スナップショットと正規化テーブル（RecipeIngredient）も更新"""
+        update_fields = kwargs.get('update_fields')
+        # 取得済みの材料は古くなるため破棄（post_saveのハンドラがワイドカラムを読めるように）
+        getattr(self, '_prefetched_objects_cache', {}).pop('recipe_ingredients', None)
+        if update_fields is not None and not INGREDIENT_SLOT_FIELDS.intersection(update_fields):
+            super().save(*args, **kwargs)
+            return
+        
+        self.ingredients_snapshot = self._build_ingredients()
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'ingredients_snapshot'}
+        
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_recipe_ingredients()
+    
+    def sync_recipe_ingredients(self):
+        """ワイドカラムの材料を正規食材IDとともにRecipeIngredientへ反映"""
+        from .services.ingredients import resolve_ids
+        slots = list(self._iter_ingredient_slots())
+        ingredient_ids = resolve_ids(ingredient['name'] for _, ingredient in slots)
+        rows = [
+            RecipeIngredient(
+                recipe=self, position=position,
+                ingredient_id=ingredient_ids.get(ingredient['name']), **ingredient
+            )
+            for position, ingredient in slots
+        ]
+        self.recipe_ingredients.all().delete()
+        RecipeIngredient.objects.bulk_create(rows)
+    
+    def _iter_ingredient_slots(self):
+        """有効な材料スロットを(位置, 材料)で列挙"""
         for i in range(1, 21):
             name = getattr(self, f'ingredient_{i}')
             amount = getattr(self, f'amount_{i}')
             unit = getattr(self, f'unit_{i}')
             
             if name and amount and unit:
-                ingredients.append({
-                    'name': name,
-                    'amount': float(amount),
-                    'unit': unit
-                })
+                yield i, {'name': name, 'amount': amount, 'unit': unit}
+    
+    def get_ingredients(self):
+        """材料リストを取得"""
+        # with_ingredients()で取得済みなら正規化テーブルから読み込む
+        prefetched = getattr(self, '_prefetched_objects_cache', {}).get('recipe_ingredients')
+        if prefetched is not None:
+            return [ingredient.as_dict() for ingredient in prefetched]
+        
+        # 保存済みのレコードはスナップショット列を使う（読み込まれていない場合はワイドカラム）
+        if self.pk is not None and 'ingredients_snapshot' in self.__dict__:
+            return list(self.ingredients_snapshot)
+        return self._build_ingredients()
+    
+    def _build_ingredients(self):
+        """ワイドカラムから材料リストを作成"""
+        ingredients = []
+        for _, ingredient in self._iter_ingredient_slots():
+            ingredients.append({
+                'name': ingredient['name'],
+                'amount': float(ingredient['amount']),
+                'unit': ingredient['unit']
+            })
         return ingredients
     
     def set_ingredients(self, ingredients_data):
@@ -155,6 +282,7 @@ class Recipe(models.Model):
             setattr(self, f'ingredient_{i}', ingredient.get('name'))
             setattr(self, f'amount_{i}', ingredient.get('amount'))
             setattr(self, f'unit_{i}', ingredient.get('unit'))
+        self.ingredients_snapshot = self._build_ingredients()
     
     def is_existing_recipe(self):
         """既存レシピかどうかを判定"""
@@ -168,28 +296,95 @@ class Recipe(models.Model):
         return f"{self.recipe_name} by {self.user.username}"
 
 
+class RecipeIngredient(models.Model):
+    """レシピ材料モデル（Recipeのワイドカラムを正規化したもの）"""
+    # (recipe, position)のユニーク制約がrecipe_id先頭のインデックスを兼ねる
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='recipe_ingredients',
+        db_index=False
+    )
+    position = models.PositiveSmallIntegerField()  # 元の材料スロット番号（1-20）
+    name = models.CharField(max_length=100)  # 入力された表示名
+    # 照合・集計用の正規食材（(ingredient, recipe)インデックスで検索）
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='recipe_ingredients',
+        db_index=False
+    )
+    amount = models.DecimalField(max_digits=10, decimal_places=1)
+    unit = models.CharField(max_length=20)
+    
+    class Meta:
+        db_table = 'recipe_ingredients'
+        unique_together = ['recipe', 'position']
+        indexes = [
+            models.Index(fields=['ingredient', 'recipe']),
+        ]
+    
+    def as_dict(self):
+        """Recipe.get_ingredients()と同じ形式で返す"""
+        return {
+            'name': self.name,
+            'amount': float(self.amount),
+            'unit': self.unit
+        }
+    
+    def __str__(self):
+        return f"{self.name} {self.amount}{self.unit} ({self.recipe_id})"
+
+
+# 料理履歴一覧で読み込む列（レシピは一覧用の列のみ、ユーザーはユーザー名のみ）
+# select_related('recipe', 'user') と組み合わせて使う
+COOKED_DISH_LISTING_FIELDS = (
+    'id', 'user_id', 'recipe_id', 'created_at', 'user__username',
+) + tuple(f'recipe__{name}' for name in RECIPE_LISTING_FIELDS)
+
+
 class CookedDish(models.Model):
     """料理履歴モデル"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    # user_idの検索は(user, -created_at, -id, recipe)インデックスで行う
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
     recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE)  # 直接レシピ参照
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         db_table = 'cooked_dishes'
+        # 列数が少ないため、一覧用インデックスは全列を含むカバリングインデックスにする
         indexes = [
-            models.Index(fields=['user']),
-            models.Index(fields=['recipe']),
-            models.Index(fields=['created_at']),
+            # ユーザー別一覧（WHERE user_id = ? ORDER BY created_at DESC, id DESC）
+            models.Index(fields=['user', '-created_at', '-id', 'recipe']),
+            # 全体一覧・キーセットページネーション（外部API）
+            models.Index(fields=['-created_at', '-id', 'recipe', 'user']),
         ]
     
+    def save(self, *args, **kwargs):
+        """件数カウンター（post_saveで更新）と同じトランザクションで保存"""
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.recipe.recipe_name} cooked by {self.user.username} at {self.created_at}"
 
 
 class IngredientCache(models.Model):
     """食材キャッシュモデル"""
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
-    ingredient_name = models.CharField(max_length=100)
+    # user_idの検索はunique_togetherと(user, -created_at, -id)インデックスで行う
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    ingredient_name = models.CharField(max_length=100)  # 入力された表示名
+    # 照合・集計用の正規食材（保存時に食材名から解決）
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='ingredient_caches',
+        db_index=False
+    )
     amount = models.DecimalField(max_digits=10, decimal_places=1)
     unit = models.CharField(max_length=20)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -197,14 +392,107 @@ class IngredientCache(models.Model):
     class Meta:
         db_table = 'ingredient_cache'
         unique_together = ['user', 'ingredient_name']
+        constraints = [
+            # 表記ゆれによる重複登録を防ぐ
+            models.UniqueConstraint(fields=['user', 'ingredient'], name='ingredient_cache_user_ingredient_uniq'),
+        ]
         indexes = [
-            models.Index(fields=['user']),
+            # ユーザー別一覧（WHERE user_id = ? ORDER BY created_at DESC, id DESC）
+            models.Index(fields=['user', '-created_at', '-id']),
+            # 全体一覧・キーセットページネーション（外部API）
+            models.Index(fields=['-created_at', '-id']),
         ]
     
+    def save(self, *args, **kwargs):
+        """正規食材を解決し、件数カウンター（post_saveで更新）と同じトランザクションで保存"""
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None or 'ingredient_name' in update_fields:
+            from .services.ingredients import resolve_id
+            ingredient_id = resolve_id(self.ingredient_name)
+            # 移行時に単位を換算できず合算しなかった重複行は、正規食材を設定せずに残す
+            if self.pk is not None and self.ingredient_id is None and ingredient_id is not None:
+                duplicates = IngredientCache.objects.filter(user_id=self.user_id, ingredient_id=ingredient_id)
+                if duplicates.exclude(pk=self.pk).exists():
+                    ingredient_id = None
+            self.ingredient_id = ingredient_id
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | {'ingredient'}
+        with transaction.atomic(savepoint=False):
+            super().save(*args, **kwargs)
+    
     def __str__(self):
         return f"{self.ingredient_name} {self.amount}{self.unit} for {self.user.username}"
 
 
+class UserCounter(models.Model):
+    """ユーザー単位の件数カウンター（統計API用、シグナルで更新）"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='counter')
+    total_recipes = models.IntegerField(default=0)
+    total_cooked_dishes = models.IntegerField(default=0)
+    total_ingredient_cache = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'user_counters'
+    
+    def as_stats(self):
+        """統計APIの形式で返す"""
+        return {
+            'total_recipes': self.total_recipes,
+            'total_cooked_dishes': self.total_cooked_dishes,
+            'total_ingredient_cache': self.total_ingredient_cache,
+        }
+    
+    def __str__(self):
+        return f"Counters for user {self.user_id}"
+
+
+class GlobalCounter(models.Model):
+    """全体の件数カウンター（外部統計API用、pk=1の1行のみ）"""
+    total_recipes = models.BigIntegerField(default=0)
+    total_cooked_dishes = models.BigIntegerField(default=0)
+    total_users = models.BigIntegerField(default=0)
+    total_ingredient_cache = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'global_counters'
+    
+    def as_stats(self):
+        """外部統計APIの形式で返す"""
+        return {
+            'total_recipes': self.total_recipes,
+            'total_cooked_dishes': self.total_cooked_dishes,
+            'total_users': self.total_users,
+            'total_ingredient_cache': self.total_ingredient_cache,
+        }
+    
+    def __str__(self):
+        return "Global counters"
+
+
+class ChangeLog(models.Model):
+    """変更履歴モデル（外部アプリの差分同期用、seqは単調増加）"""
+    ACTION_UPSERT = 'upsert'
+    ACTION_DELETE = 'delete'
+    ACTION_CHOICES = [
+        (ACTION_UPSERT, 'Upsert'),
+        (ACTION_DELETE, 'Delete'),
+    ]
+    
+    seq = models.BigAutoField(primary_key=True)
+    resource = models.CharField(max_length=20)  # recipes / cooked-dishes / ingredient-cache
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'change_log'
+    
+    def __str__(self):
+        return f"#{self.seq} {self.action} {self.resource}/{self.object_id}"
+
+
 class ApiKey(models.Model):
     """API Key管理モデル"""
     key_name = models.CharField(max_length=100)
@@ -0,0 +1,122 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(PageNumberPagination):
+    """
+    一覧API共通のページネーション
+
+    - ?cursor=<token> : (created_at, id)によるキーセット方式。OFFSETを使わないため
+      深いページでも最初のページと同じコストで取得できる（最初のページは ?cursor= ）
+    - ?page=N : 従来のページ番号方式
+    - ?count=false : 件数（COUNT(*)）を返さない
+    - ?page_size=N : 1ページの件数（max_page_sizeまで）
+    """
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.mode = 'page'
+
+        if self.cursor_query_param in request.query_params:
+            self.mode = 'cursor'
+            return self.paginate_keyset(queryset, request)
+
+        if not self.count_enabled(request):
+            self.mode = 'no_count'
+            return self.paginate_without_count(queryset, request)
+
+        return super().paginate_queryset(queryset, request, view)
+
+    def count_enabled(self, request):
+        value = request.query_params.get(self.count_query_param, 'true')
+        return value.lower() not in ('false', '0', 'no')
+
+    # --- キーセット方式 ---
+    def paginate_keyset(self, queryset, request):
+        page_size = self.get_page_size(request)
+        position = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        queryset = queryset.order_by('-created_at', '-id')
+        if position is not None:
+            created_at, pk = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=pk)
+            )
+
+        # 1件多く取得して次ページの有無を判定
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page_rows = rows[:page_size]
+        return self.page_rows
+
+    def encode_cursor(self, row):
+        if isinstance(row, dict):
+            created_at, pk = row['created_at'], row['id']
+        else:
+            created_at, pk = row.created_at, row.pk
+        token = f'{created_at.isoformat()}|{pk}'
+        return base64.urlsafe_b64encode(token.encode('ascii')).decode('ascii')
+
+    def decode_cursor(self, token):
+        if not token:
+            return None
+        try:
+            created_at, pk = base64.urlsafe_b64decode(token.encode('ascii')).decode('ascii').split('|')
+            return datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_cursor_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page_rows[-1]))
+
+    # --- 件数なしのページ番号方式 ---
+    def paginate_without_count(self, queryset, request):
+        page_size = self.get_page_size(request)
+        try:
+            self.page_number = int(request.query_params.get(self.page_query_param, 1))
+            if self.page_number < 1:
+                raise ValueError
+        except ValueError:
+            raise NotFound(self.invalid_page_message)
+
+        offset = (self.page_number - 1) * page_size
+        rows = list(queryset[offset:offset + page_size + 1])
+        self.has_next = len(rows) > page_size
+        return rows[:page_size]
+
+    def get_page_link(self, page_number):
+        url = self.request.build_absolute_uri()
+        if page_number == 1:
+            return remove_query_param(url, self.page_query_param)
+        return replace_query_param(url, self.page_query_param, page_number)
+
+    # --- レスポンス ---
+    def get_paginated_response(self, data):
+        if self.mode == 'cursor':
+            return Response({
+                'next': self.get_next_cursor_link(),
+                'results': data,
+            })
+        if self.mode == 'no_count':
+            return Response({
+                'next': self.get_page_link(self.page_number + 1) if self.has_next else None,
+                'previous': self.get_page_link(self.page_number - 1) if self.page_number > 1 else None,
+                'results': data,
+            })
+        return super().get_paginated_response(data)
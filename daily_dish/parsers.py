@@ -0,0 +1,35 @@
+import io
+import re
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境では標準のjsonモジュールで解析する
+    orjson = None
+
+# orjsonは64bitを超える整数を黙ってfloatにするため、長い数字列を含む入力はJSONParserで解析する
+_LONG_DIGITS_PATTERN = re.compile(rb'[0-9]{19}')
+
+
+class FastJSONParser(JSONParser):
+    """
+    orjsonによる高速なJSONパーサー
+    UTF-8以外の文字コードや、orjsonで解析できない入力（64bitを超える整数・不正なJSONなど）は
+    JSONParserの処理にフォールバックする（エラーメッセージも従来どおり）。
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read() if stream is not None else b''
+        if _LONG_DIGITS_PATTERN.search(body):
+            return super().parse(io.BytesIO(body), media_type, parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(io.BytesIO(body), media_type, parser_context)
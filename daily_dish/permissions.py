@@ -1,3 +1,6 @@
+import hmac
+
+from django.conf import settings
 from rest_framework.permissions import BasePermission
 from .models import ApiKey
 
@@ -38,9 +41,9 @@ class IsOwnerOrReadOnly(BasePermission):
         if request.method in ['GET', 'HEAD', 'OPTIONS']:
             return True
         
-        # 書き込み権限は所有者のみ
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
+        # 書き込み権限は所有者のみ（user_idで比較し、ユーザーを読み込まない）
+        if hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.id
         
         return False
 
@@ -49,6 +52,19 @@ class IsOwner(BasePermission):
     """所有者のみアクセス可能"""
     
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, 'user'):
-            return obj.user == request.user
-        return False
\ No newline at end of file
+        # user_idで比較し、ユーザーを読み込まない
+        if hasattr(obj, 'user_id'):
+            return obj.user_id == request.user.id
+        return False
+
+
+class IsMetricsScraper(BasePermission):
+    """メトリクス取得用のトークン（Authorization: Bearer <METRICS_TOKEN>）を持つ場合のみ許可"""
+    
+    def has_permission(self, request, view):
+        token = getattr(settings, 'METRICS_TOKEN', '')
+        # トークン未設定時は誰にも公開しない
+        if not token:
+            return False
+        header = request.META.get('HTTP_AUTHORIZATION', '')
+        return hmac.compare_digest(header.encode(), f'Bearer {token}'.encode())
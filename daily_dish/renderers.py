@@ -0,0 +1,90 @@
+import json
+import re
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # orjsonがない環境では標準のjsonモジュールで出力する
+    orjson = None
+
+
+# orjsonと標準のjsonで表記が異なる指数表記の数値（1e16 / 1e+16）
+_EXPONENT_PATTERN = re.compile(rb'[0-9]e[-0-9]')
+_drf_encoder = JSONEncoder()
+
+if orjson is not None:
+    # datetime/date/timeはDRFのエンコーダーに任せて表記を揃える（UTCの'Z'など）
+    _ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+def fast_dumps(data):
+    """DRFのJSONRendererと同じバイト列を出力（orjsonで出力できない場合はNone）
+
+    Decimal・UUID・遅延文字列などはDRFのエンコーダーで変換する。
+    NaN/Infinityはエラーにならずnullとして出力される点のみ異なる。
+    """
+    if orjson is None:
+        return None
+    try:
+        ret = orjson.dumps(data, default=_drf_encoder.default, option=_ORJSON_OPTIONS)
+    except orjson.JSONEncodeError:
+        # 64bitを超える整数など
+        return None
+    if _EXPONENT_PATTERN.search(ret):
+        return None
+    # JSONRendererと同様にJavaScriptで改行扱いになる文字をエスケープ
+    if b'\xe2\x80' in ret:
+        ret = ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+    return ret
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    orjsonによる高速なJSONレンダラー
+    JSONRendererと同じ出力を返す。インデント指定時やorjsonで出力できない
+    データの場合はJSONRendererの処理にフォールバックする。
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is None and self.compact and not self.ensure_ascii:
+            ret = fast_dumps(data)
+            if ret is not None:
+                return ret
+        return super().render(data, accepted_media_type, renderer_context)
+
+
+class NDJSONRenderer(BaseRenderer):
+    """
+    改行区切りJSON（NDJSON）レンダラー
+    ストリーミングエクスポートのコンテントネゴシエーション用。通常のレスポンス
+    （エラーなど）は1行のJSONとして出力する。
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return dumps_line(data)
+
+
+def dumps_line(data):
+    """1件をNDJSONの1行（bytes）に変換"""
+    ret = fast_dumps(data)
+    if ret is None:
+        ret = json.dumps(
+            data, cls=JSONEncoder, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+    return ret + b'\n'
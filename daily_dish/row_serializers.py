@@ -0,0 +1,225 @@
+"""
+一覧API用の読み取り専用シリアライザー
+
+values() の行（辞書）から直接レスポンスの辞書を組み立てる。ModelSerializerの
+インスタンス化やフィールドごとの to_representation を行わないため、数千件の
+一覧でも高速に変換できる。出力は serializers.py の対応するシリアライザーと
+同じ（test_row_serializers.py で検証）。書き込みは従来どおりDRFの
+シリアライザーでバリデーションする。
+"""
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+from .models import IngredientCache
+from .serializers import query_param_set
+
+
+_drf_datetime = serializers.DateTimeField()
+_amount_field = IngredientCache._meta.get_field('amount')
+_drf_amount = serializers.DecimalField(
+    max_digits=_amount_field.max_digits, decimal_places=_amount_field.decimal_places
+)
+
+
+def datetime_value(value):
+    """DateTimeField.to_representation と同じ出力（現在のタイムゾーンのISO 8601）"""
+    if value is None:
+        return None
+    output_format = api_settings.DATETIME_FORMAT
+    if not settings.USE_TZ or timezone.is_naive(value) or output_format is None or output_format.lower() != ISO_8601:
+        return _drf_datetime.to_representation(value)
+    value = value.astimezone(timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def amount_value(value):
+    """DecimalField.to_representation と同じ出力（COERCE_DECIMAL_TO_STRINGに従う）"""
+    if value is None:
+        return None
+    return _drf_amount.to_representation(value)
+
+
+class Nested:
+    """ネストしたシリアライザー（prefix付きの列から組み立てる）"""
+
+    def __init__(self, serializer_class, prefix):
+        self.serializer_class = serializer_class
+        self.prefix = prefix
+
+
+class RowSerializer:
+    """
+    values() の行から辞書を組み立てるシリアライザーの基底クラス
+
+    fields: (出力名, 列名, 変換関数) のタプル。変換関数がNoneなら値をそのまま使う。
+            列名の代わりに Nested を指定するとネストした辞書を出力する
+    expandable_fields: ?expand= で末尾に追加するフィールド（同じ形式）
+    """
+    fields = ()
+    expandable_fields = ()
+    # キーセットページネーションのカーソルに必要な列
+    required_columns = ('id', 'created_at')
+
+    def __init__(self, fields=None, expand=None, prefix=''):
+        self.prefix = prefix
+        expand = expand or set()
+        entries = [entry for entry in self.fields if not fields or entry[0] in fields]
+        entries += [
+            entry for entry in self.expandable_fields
+            if entry[0] in expand and (not fields or entry[0] in fields)
+        ]
+
+        self.columns = [prefix + column for column in self.required_columns]
+        self._getters = []
+        for name, source, convert in entries:
+            if isinstance(source, Nested):
+                # ?fields= は最上位にのみ適用（SparseFieldsetMixinと同じ）
+                nested = source.serializer_class(expand=expand, prefix=prefix + source.prefix)
+                self._add_columns(nested.columns)
+                self._getters.append((name, nested.to_representation))
+                continue
+            column = prefix + source
+            self._add_columns([column])
+            if convert is None:
+                self._getters.append((name, itemgetter(column)))
+            else:
+                self._getters.append((name, lambda row, column=column, convert=convert: convert(row[column])))
+
+    def _add_columns(self, columns):
+        for column in columns:
+            if column not in self.columns:
+                self.columns.append(column)
+
+    @classmethod
+    def from_request(cls, request):
+        """?fields= / ?expand= を反映したシリアライザーを作成"""
+        return cls(fields=query_param_set(request, 'fields'), expand=query_param_set(request, 'expand'))
+
+    def to_representation(self, row):
+        return {name: get(row) for name, get in self._getters}
+
+    def many(self, rows):
+        to_representation = self.to_representation
+        return [to_representation(row) for row in rows]
+
+
+def _ingredient_count(snapshot):
+    return len(snapshot)
+
+
+def _is_existing_recipe(recipe_url):
+    return recipe_url is not None
+
+
+def _is_new_recipe(recipe_url):
+    return recipe_url is None
+
+
+class RecipeSummaryRowSerializer(RowSerializer):
+    """RecipeSummarySerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('recipe_name', 'recipe_name', None),
+        ('recipe_url', 'recipe_url', None),
+        ('ingredient_count', 'ingredients_snapshot', _ingredient_count),
+        ('is_existing_recipe', 'recipe_url', _is_existing_recipe),
+        ('is_new_recipe', 'recipe_url', _is_new_recipe),
+        ('created_at', 'created_at', datetime_value),
+        ('updated_at', 'updated_at', datetime_value),
+    )
+    expandable_fields = (
+        ('ingredients', 'ingredients_snapshot', list),
+    )
+
+
+class CookedDishRowSerializer(RowSerializer):
+    """CookedDishSerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('user', 'user__username', None),
+        ('recipe', 'recipe_id', None),
+        ('recipe_detail', Nested(RecipeSummaryRowSerializer, 'recipe__'), None),
+        ('created_at', 'created_at', datetime_value),
+    )
+
+
+class IngredientCacheRowSerializer(RowSerializer):
+    """IngredientCacheSerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('user', 'user__username', None),
+        ('ingredient_name', 'ingredient_name', None),
+        ('ingredient', 'ingredient_id', None),
+        ('amount', 'amount', amount_value),
+        ('unit', 'unit', None),
+        ('created_at', 'created_at', datetime_value),
+    )
+
+
+class ExternalRecipeRowSerializer(RowSerializer):
+    """ExternalRecipeSerializer と同じ出力（エクスポート用）"""
+    fields = (
+        ('id', 'id', None),
+        ('recipe_name', 'recipe_name', None),
+        ('recipe_url', 'recipe_url', None),
+        ('ingredients', 'ingredients_snapshot', list),
+        ('created_at', 'created_at', datetime_value),
+    )
+
+
+class ExternalRecipeSummaryRowSerializer(RowSerializer):
+    """ExternalRecipeSummarySerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('recipe_name', 'recipe_name', None),
+        ('recipe_url', 'recipe_url', None),
+        ('ingredient_count', 'ingredients_snapshot', _ingredient_count),
+        ('created_at', 'created_at', datetime_value),
+    )
+    expandable_fields = (
+        ('ingredients', 'ingredients_snapshot', list),
+    )
+
+
+class ExternalCookedDishRowSerializer(RowSerializer):
+    """ExternalCookedDishSerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('recipe_name', 'recipe__recipe_name', None),
+        ('created_at', 'created_at', datetime_value),
+    )
+
+
+class ExternalIngredientCacheRowSerializer(RowSerializer):
+    """ExternalIngredientCacheSerializer と同じ出力"""
+    fields = (
+        ('id', 'id', None),
+        ('ingredient_name', 'ingredient_name', None),
+        ('amount', 'amount', amount_value),
+        ('unit', 'unit', None),
+        ('created_at', 'created_at', datetime_value),
+    )
+
+
+class RowListMixin:
+    """
+    一覧（GET）を row_serializer_class で返す ListAPIView 用のミックスイン
+    作成（POST）は従来どおり serializer_class でバリデーションする
+    """
+    row_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.row_serializer_class.from_request(request)
+        queryset = self.filter_queryset(self.get_queryset()).values(*serializer.columns)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(serializer.many(page))
+        return Response(serializer.many(queryset))
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from .models import Recipe, CookedDish, IngredientCache, ApiKey
+from .services.ingredients import clean_name, resolve_id
 
 User = get_user_model()
 
@@ -34,6 +35,42 @@ class UserCreateSerializer(serializers.ModelSerializer):
         return user
 
 
+def query_param_set(request, name):
+    """?fields=a,b のようなカンマ区切りのクエリパラメータを集合で返す（GET以外は空）"""
+    if request is None or request.method != 'GET':
+        return set()
+    value = request.query_params.get(name, '')
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields=id,recipe_name で出力するフィールドを絞り込む（一覧API用）
+    ?expand=ingredients で材料リストを追加する（EXPANDABLE_FIELDSに含まれるもの）
+    """
+    EXPANDABLE_FIELDS = {}
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.query_param_set('fields')
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+    
+    def query_param_set(self, name):
+        return query_param_set(self.context.get('request'), name)
+    
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # ?fields= は最上位のシリアライザーにのみ適用（ネスト時は材料の追加だけ行う）
+        parent = self.parent.parent if isinstance(self.parent, serializers.ListSerializer) else self.parent
+        requested = self.query_param_set('fields') if parent is None else set()
+        for name in self.query_param_set('expand') & set(self.EXPANDABLE_FIELDS):
+            if not requested or name in requested:
+                data[name] = self.EXPANDABLE_FIELDS[name](instance)
+        return data
+
+
 class RecipeSerializer(serializers.ModelSerializer):
     """統一レシピシリアライザー"""
     ingredients = serializers.SerializerMethodField(read_only=True)
@@ -61,6 +98,11 @@ class RecipeSerializer(serializers.ModelSerializer):
     
     def validate(self, attrs):
         """レシピのバリデーション"""
+        # 材料名の空白を整える（正規食材IDは保存時に解決）
+        for i in range(1, 21):
+            if attrs.get(f'ingredient_{i}'):
+                attrs[f'ingredient_{i}'] = clean_name(attrs[f'ingredient_{i}'])
+        
         # 最低1つの材料は必要
         has_ingredient = False
         for i in range(1, 21):
@@ -78,10 +120,27 @@ class RecipeSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class CookedDishSerializer(serializers.ModelSerializer):
+class RecipeSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """レシピ一覧用の軽量シリアライザー（材料は ?expand=ingredients で追加）"""
+    ingredient_count = serializers.SerializerMethodField()
+    is_existing_recipe = serializers.BooleanField(read_only=True)
+    is_new_recipe = serializers.BooleanField(read_only=True)
+    EXPANDABLE_FIELDS = {'ingredients': lambda recipe: recipe.get_ingredients()}
+    
+    class Meta:
+        model = Recipe
+        fields = ['id', 'recipe_name', 'recipe_url', 'ingredient_count',
+                 'is_existing_recipe', 'is_new_recipe', 'created_at', 'updated_at']
+        read_only_fields = fields
+    
+    def get_ingredient_count(self, obj):
+        return len(obj.get_ingredients())
+
+
+class CookedDishSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """料理履歴シリアライザー"""
     user = serializers.StringRelatedField(read_only=True)
-    recipe_detail = RecipeSerializer(source='recipe', read_only=True)
+    recipe_detail = RecipeSummarySerializer(source='recipe', read_only=True)
     
     class Meta:
         model = CookedDish
@@ -96,24 +155,47 @@ class CookedDishSerializer(serializers.ModelSerializer):
     def validate_recipe(self, value):
         """レシピの所有者チェック"""
         request = self.context.get('request')
-        if request and value.user != request.user:
+        if request and value.user_id != request.user.id:
             raise serializers.ValidationError('他のユーザーのレシピは使用できません')
         return value
 
 
-class IngredientCacheSerializer(serializers.ModelSerializer):
+class IngredientCacheSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """食材キャッシュシリアライザー"""
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
         model = IngredientCache
-        fields = ['id', 'user', 'ingredient_name', 'amount', 'unit', 'created_at']
-        read_only_fields = ['id', 'user', 'created_at']
+        fields = ['id', 'user', 'ingredient_name', 'ingredient', 'amount', 'unit', 'created_at']
+        read_only_fields = ['id', 'user', 'ingredient', 'created_at']
     
     def create(self, validated_data):
         """食材キャッシュ作成時にユーザーを自動設定"""
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
+    
+    def validate_ingredient_name(self, value):
+        """食材名の空白を整える"""
+        value = clean_name(value)
+        if not value:
+            raise serializers.ValidationError('食材名を入力してください')
+        return value
+    
+    def validate(self, attrs):
+        """表記ゆれ（とり肉と鶏肉など）による重複登録を防ぐ"""
+        request = self.context.get('request')
+        name = attrs.get('ingredient_name')
+        if request and name:
+            ingredient_id = resolve_id(name, create=False)
+            duplicates = IngredientCache.objects.filter(user_id=request.user.id, ingredient_id=ingredient_id)
+            if self.instance is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+                # 正規食材が未設定の重複行（移行時に合算できなかった行）は同じ食材のままなら更新できる
+                if self.instance.ingredient_id is None and resolve_id(self.instance.ingredient_name, create=False) == ingredient_id:
+                    duplicates = duplicates.none()
+            if ingredient_id is not None and duplicates.exists():
+                raise serializers.ValidationError({'ingredient_name': '同じ食材が既に登録されています'})
+        return attrs
 
 
 class ApiKeySerializer(serializers.ModelSerializer):
@@ -140,7 +222,21 @@ class ExternalRecipeSerializer(serializers.ModelSerializer):
         return obj.get_ingredients()
 
 
-class ExternalCookedDishSerializer(serializers.ModelSerializer):
+class ExternalRecipeSummarySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """外部アプリ向けレシピ一覧シリアライザー（材料は ?expand=ingredients で追加）"""
+    ingredient_count = serializers.SerializerMethodField()
+    EXPANDABLE_FIELDS = {'ingredients': lambda recipe: recipe.get_ingredients()}
+    
+    class Meta:
+        model = Recipe
+        fields = ['id', 'recipe_name', 'recipe_url', 'ingredient_count', 'created_at']
+        read_only_fields = fields
+    
+    def get_ingredient_count(self, obj):
+        return len(obj.get_ingredients())
+
+
+class ExternalCookedDishSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """外部アプリ向け料理履歴シリアライザー"""
     recipe_name = serializers.CharField(source='recipe.recipe_name', read_only=True)
     
@@ -150,7 +246,7 @@ class ExternalCookedDishSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'recipe_name', 'created_at']
 
 
-class ExternalIngredientCacheSerializer(serializers.ModelSerializer):
+class ExternalIngredientCacheSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """外部アプリ向け食材キャッシュシリアライザー"""
     
     class Meta:
@@ -0,0 +1,119 @@
+# daily_dish/services/api_keys.py
+"""
+API Key認証の高速化
+
+- 検証済みのAPI Keyはプロセス内に API_KEY_CACHE_TTL 秒キャッシュする
+  （同一プロセス内の更新・削除はシグナルで即時に無効化。キャッシュはワーカーごとのため、
+  他のワーカーでは無効化・削除したAPI Keyが最大 API_KEY_CACHE_TTL 秒使える）
+- 使用回数・最終使用日時はメモリ上に集計し、API_KEY_USAGE_FLUSH_INTERVAL 秒ごと
+  （およびプロセス終了時）にまとめてDBへ反映する
+"""
+import atexit
+import logging
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ..models import ApiKey
+
+logger = logging.getLogger(__name__)
+
+# api_key文字列 -> (ApiKey, 有効期限（monotonic）)
+_key_cache: Dict[str, Tuple[ApiKey, float]] = {}
+# ApiKey.id -> [未反映の使用回数, 最終使用日時]
+_pending_usage: Dict[int, list] = {}
+_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+def _cache_ttl() -> float:
+    return getattr(settings, 'API_KEY_CACHE_TTL', 60)
+
+
+def _flush_interval() -> float:
+    return getattr(settings, 'API_KEY_USAGE_FLUSH_INTERVAL', 10)
+
+
+def get_active_key(api_key: str) -> Optional[ApiKey]:
+    """有効なAPI Keyを取得（キャッシュになければDBから取得）"""
+    now = time.monotonic()
+    entry = _key_cache.get(api_key)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+
+    api_key_obj = ApiKey.objects.filter(api_key=api_key, is_active=True).first()
+    if api_key_obj is None:
+        _key_cache.pop(api_key, None)
+        return None
+    _key_cache[api_key] = (api_key_obj, now + _cache_ttl())
+    return api_key_obj
+
+
+def invalidate(api_key_obj: ApiKey):
+    """キャッシュから削除（ApiKeyの更新・削除時にシグナルから呼ばれる、このプロセスのみ）"""
+    # キー文字列自体が変更された場合に備え、IDが一致するエントリも削除
+    for key, (cached, _) in list(_key_cache.items()):
+        if key == api_key_obj.api_key or cached.pk == api_key_obj.pk:
+            _key_cache.pop(key, None)
+
+
+def record_usage(api_key_obj: ApiKey):
+    """使用回数を集計（一定間隔ごとにDBへ反映）"""
+    global _last_flush
+    now = timezone.now()
+    with _lock:
+        pending = _pending_usage.setdefault(api_key_obj.id, [0, now])
+        pending[0] += 1
+        pending[1] = now
+        due = time.monotonic() - _last_flush >= _flush_interval()
+        if due:
+            _last_flush = time.monotonic()
+    if due:
+        try:
+            flush_usage()
+        except Exception:
+            # 反映できなかった分は次回に持ち越し、認証済みのリクエストは失敗させない
+            logger.warning('Failed to flush API key usage', exc_info=True)
+
+
+def flush_usage():
+    """集計済みの使用回数をDBに反映"""
+    with _lock:
+        batch = dict(_pending_usage)
+        _pending_usage.clear()
+
+    items = list(batch.items())
+    for index, (api_key_id, (count, last_used_at)) in enumerate(items):
+        try:
+            # シグナルを発火させないよう update() で加算
+            ApiKey.objects.filter(pk=api_key_id).update(
+                usage_count=F('usage_count') + count,
+                last_used_at=last_used_at,
+            )
+        except Exception:
+            # 反映できなかった分は次回に持ち越す（その間に集計された分と合算）
+            _restore_usage(items[index:])
+            raise
+
+
+def _restore_usage(items):
+    with _lock:
+        for api_key_id, (count, last_used_at) in items:
+            pending = _pending_usage.setdefault(api_key_id, [0, last_used_at])
+            pending[0] += count
+            pending[1] = max(pending[1], last_used_at)
+
+
+def _flush_at_exit():
+    try:
+        flush_usage()
+    except Exception:
+        # 終了処理中はDBに接続できない場合がある
+        pass
+
+
+atexit.register(_flush_at_exit)
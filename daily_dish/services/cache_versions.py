@@ -0,0 +1,49 @@
+# daily_dish/services/cache_versions.py
+"""
+キャッシュ無効化用のバージョン番号
+
+キャッシュキーにバージョン番号を含めておき、データ変更時に番号を進めることで
+古いエントリを削除せずに無効化する。
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+
+def _key(scope: str, owner) -> str:
+    return f"version:{scope}:{owner}"
+
+
+def _initial_version() -> int:
+    # キーが消えた後に古い番号を再利用しないよう、時刻から初期値を作る
+    return int(time.time() * 1000)
+
+
+def get_version(scope: str, owner) -> int:
+    """現在のバージョン番号を取得"""
+    key = _key(scope, owner)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _initial_version(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(scope: str, owner) -> None:
+    """バージョン番号を進める"""
+    key = _key(scope, owner)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _initial_version(), None)
+
+
+def bump_version_on_commit(scope: str, owner) -> None:
+    """
+    バージョン番号を進め、トランザクション内ならコミット後にも進める
+    （コミット前に読まれた古い内容が新しい番号で保存されたままにならないようにする）
+    """
+    bump_version(scope, owner)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: bump_version(scope, owner))
@@ -0,0 +1,80 @@
+# daily_dish/services/change_feed.py
+"""
+外部アプリ向けの差分同期フィード
+
+Recipe / CookedDish / IngredientCache の作成・更新・削除をChangeLogに記録し、
+クライアントは前回のseq（カーソル）以降の変更だけを取得する。
+ChangeLogは CHANGE_LOG_RETENTION_DAYS 日だけ残し（prune）、削除済みの範囲を
+指すカーソルは is_cursor_expired で検出してエクスポートからやり直させる。
+"""
+from datetime import timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+from ..models import Recipe, CookedDish, IngredientCache, ChangeLog
+
+# モデル -> フィード上のリソース名
+RESOURCE_NAMES = {
+    Recipe: 'recipes',
+    CookedDish: 'cooked-dishes',
+    IngredientCache: 'ingredient-cache',
+}
+
+
+def record(model, object_ids, action):
+    """変更を記録"""
+    resource = RESOURCE_NAMES[model]
+    ChangeLog.objects.bulk_create([
+        ChangeLog(resource=resource, object_id=object_id, action=action)
+        for object_id in object_ids
+    ])
+
+
+def latest_seq() -> int:
+    """最新のseq"""
+    return ChangeLog.objects.order_by('-seq').values_list('seq', flat=True).first() or 0
+
+
+def oldest_seq() -> int:
+    """残っている最古のseq（記録がなければ0）"""
+    return ChangeLog.objects.order_by('seq').values_list('seq', flat=True).first() or 0
+
+
+def is_cursor_expired(since: int) -> bool:
+    """since の直後の変更が削除済みか（最古のseqより前を指すカーソル）"""
+    return since < oldest_seq() - 1
+
+
+def prune(days: Optional[int] = None) -> int:
+    """days 日より古い変更を削除（最新の1件は latest_seq のために残す）し、削除件数を返す"""
+    if days is None:
+        days = getattr(settings, 'CHANGE_LOG_RETENTION_DAYS', 30)
+    cutoff = timezone.now() - timedelta(days=days)
+    deleted, _ = ChangeLog.objects.filter(created_at__lt=cutoff, seq__lt=latest_seq()).delete()
+    return deleted
+
+
+def read_changes(since: int, limit: int):
+    """since より後の変更を最大limit件取得
+
+    同じオブジェクトの変更はページ内で最新の1件にまとめる。コミット順とseq順が
+    前後する可能性があるため、直近 CHANGE_FEED_SAFETY_LAG 秒以内の変更は返さない。
+    """
+    lag = getattr(settings, 'CHANGE_FEED_SAFETY_LAG', 1)
+    entries = list(
+        ChangeLog.objects
+        .filter(seq__gt=since, created_at__lte=timezone.now() - timedelta(seconds=lag))
+        .order_by('seq')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    latest = {}
+    for entry in entries:
+        latest.pop((entry.resource, entry.object_id), None)
+        latest[(entry.resource, entry.object_id)] = entry
+
+    next_since = entries[-1].seq if entries else since
+    return list(latest.values()), next_since, has_more
@@ -0,0 +1,143 @@
+# daily_dish/services/conditional.py
+"""
+条件付きリクエスト（ETag / Last-Modified / 304 Not Modified）
+
+検証子は本文を作らずに求める。ETagはURL・表現形式と、レスポンスが依存するリソースの
+変更バージョン（cache_versions、Web APIはユーザーごと・外部APIはテーブル全体）から作り、
+Last-Modified はそれらのリソースが最後に変更された時刻（保存した行の updated_at）とする。
+バージョンと変更時刻はモデルの保存・削除のシグナル（signals.py）で更新する。
+If-None-Match / If-Modified-Since が一致すれば、クエリセットを評価せずに304を返す。
+"""
+import functools
+import hashlib
+from typing import Callable, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .cache_versions import bump_version, get_version
+
+# APIの種類（Web APIはユーザーごと、外部APIはテーブル全体のバージョンを使う）
+WEB = 'web'
+EXTERNAL = 'external'
+ALL_USERS = 'all'
+
+# リソース名（ユーザーごと・テーブル全体のバージョンの単位）
+RECIPES = 'recipes'
+COOKED_DISHES = 'cooked-dishes'
+INGREDIENT_CACHE = 'ingredient-cache'
+USERS = 'users'
+
+DEFAULT_CACHE_CONTROL = {
+    # ユーザーごとのデータのため共有キャッシュには置かせず、毎回再検証させる
+    WEB: 'private, no-cache',
+    # ポーリングする外部アプリは短時間は再検証なしで使う
+    EXTERNAL: 'private, max-age=15',
+}
+VARY_HEADERS = {
+    WEB: ('Accept', 'Authorization'),
+    EXTERNAL: ('Accept', 'X-API-KEY'),
+}
+
+
+def _scope(resource: str) -> str:
+    return f'resource:{resource}'
+
+
+def _modified_key(resource: str, owner) -> str:
+    return f'modified:{resource}:{owner}'
+
+
+def resource_changed(resource: str, user_id, modified_at=None):
+    """
+    リソースの変更を記録（ユーザーごと・テーブル全体のバージョンと変更時刻）
+    コミット前に読まれた古い内容に新しいETagが付かないよう、トランザクション内ではコミット後にも進める
+    """
+    timestamp = int((modified_at or timezone.now()).timestamp())
+
+    def bump():
+        for owner in (user_id, ALL_USERS):
+            bump_version(_scope(resource), owner)
+        cache.set_many({_modified_key(resource, owner): timestamp for owner in (user_id, ALL_USERS)}, None)
+
+    bump()
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(bump)
+
+
+def get_validators(request, resources: Iterable[str], owner, extra_scopes: Iterable[str] = ()) -> Tuple[str, Optional[int]]:
+    """(強いETag, Last-Modified のUNIX時刻 または None)"""
+    resources = tuple(resources)
+    versions = [get_version(_scope(resource), owner) for resource in resources]
+    versions += [get_version(scope, owner) for scope in extra_scopes]
+    payload = '|'.join([
+        getattr(settings, 'ETAG_SALT', ''),
+        str(owner),
+        # ページネーションのリンクはホストを含む
+        request.build_absolute_uri(),
+        getattr(request, 'accepted_media_type', ''),
+        *map(str, versions),
+    ])
+    etag = '"%s"' % hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    modified = cache.get_many([_modified_key(resource, owner) for resource in resources])
+    # 変更時刻が分からないリソースがあれば Last-Modified は付けない
+    last_modified = max(modified.values()) if resources and len(modified) == len(resources) else None
+    return etag, last_modified
+
+
+def respond(request, surface: str, resources: Iterable[str], get_response: Callable, extra_scopes: Iterable[str] = ()):
+    """
+    検証子が一致すれば304を、一致しなければ get_response() のレスポンスを返す
+    （200のレスポンスと304に ETag / Last-Modified / Cache-Control / Vary を付ける）
+    """
+    owner = request.user.id if surface == WEB else ALL_USERS
+    etag, last_modified = get_validators(request, resources, owner, extra_scopes)
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = get_response()
+        if response.status_code != 200:
+            return response
+    elif response.status_code != 304:
+        # If-Match / If-Unmodified-Since の不一致（412）
+        return response
+
+    # 圧縮した変種は別の表現のため弱いETagにする（GZipMiddlewareと同じ扱い、If-None-Match は弱い比較）
+    response['ETag'] = f'W/{etag}' if response.has_header('Content-Encoding') else etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = getattr(settings, 'API_CACHE_CONTROL', DEFAULT_CACHE_CONTROL)[surface]
+    patch_vary_headers(response, VARY_HEADERS[surface])
+    return response
+
+
+def conditional_view(surface: str, resources: Iterable[str], extra_scopes: Iterable[str] = ()):
+    """関数ビュー用デコレーター（@api_view などの内側に付ける）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(request, *args, **kwargs)
+            return respond(request, surface, resources, lambda: func(request, *args, **kwargs), extra_scopes)
+        return wrapper
+    return decorator
+
+
+class ConditionalGetMixin:
+    """
+    GenericAPIView用: GETを条件付きリクエストに対応させる
+    validator_resources にレスポンスが依存するリソース名、conditional_surface に WEB / EXTERNAL を指定する
+    """
+    conditional_surface = WEB
+    validator_resources: Tuple[str, ...] = ()
+
+    def get(self, request, *args, **kwargs):
+        return respond(
+            request, self.conditional_surface, self.validator_resources,
+            lambda: super(ConditionalGetMixin, self).get(request, *args, **kwargs)
+        )
@@ -0,0 +1,190 @@
+# daily_dish/services/cookable.py
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Recipe, RecipeIngredient, IngredientCache
+from .cache_versions import bump_version, get_version
+
+
+class CookableIndex:
+    """ユーザー単位の食材→レシピ転置インデックス
+
+    レシピごとの材料集合と、正規食材IDからレシピIDを引く転置リスト、
+    手持ち食材（IngredientCache）を保持し、整数キーの集合演算だけでスコアリングする。
+    """
+
+    def __init__(self):
+        # recipe_id -> (レシピ名, (正規食材ID, 材料名)のタプル（スロット順）)
+        self.recipes: Dict[int, Tuple[str, Tuple[Tuple[int, str], ...]]] = {}
+        # 正規食材ID -> recipe_idの集合
+        self.postings: Dict[int, Set[int]] = {}
+        # IngredientCache.id -> 正規食材ID
+        self.pantry_rows: Dict[int, int] = {}
+
+    @classmethod
+    def build(cls, user_id: int) -> 'CookableIndex':
+        """DBからインデックスを構築（3クエリ）"""
+        index = cls()
+        names = dict(Recipe.objects.filter(user_id=user_id).values_list('id', 'recipe_name'))
+        ingredients: Dict[int, List[Tuple[int, str]]] = {recipe_id: [] for recipe_id in names}
+        rows = (
+            RecipeIngredient.objects
+            .filter(recipe__user_id=user_id)
+            .order_by('recipe_id', 'position')
+            .values_list('recipe_id', 'ingredient_id', 'name')
+        )
+        for recipe_id, ingredient_id, name in rows:
+            ingredients[recipe_id].append((ingredient_id, name))
+        for recipe_id, recipe_name in names.items():
+            index.put_recipe(recipe_id, recipe_name, ingredients[recipe_id])
+
+        pantry = IngredientCache.objects.filter(user_id=user_id).values_list('id', 'ingredient_id')
+        for cache_id, ingredient_id in pantry:
+            index.put_pantry_item(cache_id, ingredient_id)
+        return index
+
+    # --- 差分更新 ---
+    def put_recipe(self, recipe_id: int, recipe_name: str, ingredients: Iterable[Tuple[int, str]]):
+        """レシピを追加・更新（材料は(正規食材ID, 材料名)の列）"""
+        self.remove_recipe(recipe_id)
+        # 同じ正規食材の重複を除きつつ順序を保持
+        unique = {}
+        for ingredient_id, name in ingredients:
+            if ingredient_id is not None:
+                unique.setdefault(ingredient_id, name)
+        entries = tuple(unique.items())
+        self.recipes[recipe_id] = (recipe_name, entries)
+        for ingredient_id, _ in entries:
+            self.postings.setdefault(ingredient_id, set()).add(recipe_id)
+
+    def remove_recipe(self, recipe_id: int):
+        """レシピを削除"""
+        entry = self.recipes.pop(recipe_id, None)
+        if entry is None:
+            return
+        for ingredient_id, _ in entry[1]:
+            recipe_ids = self.postings.get(ingredient_id)
+            if recipe_ids is not None:
+                recipe_ids.discard(recipe_id)
+                if not recipe_ids:
+                    del self.postings[ingredient_id]
+
+    def put_pantry_item(self, cache_id: int, ingredient_id: Optional[int]):
+        """手持ち食材を追加・更新"""
+        if ingredient_id is None:
+            self.pantry_rows.pop(cache_id, None)
+            return
+        self.pantry_rows[cache_id] = ingredient_id
+
+    def remove_pantry_item(self, cache_id: int):
+        """手持ち食材を削除"""
+        self.pantry_rows.pop(cache_id, None)
+
+    # --- スコアリング ---
+    def rank(self, min_coverage: float = 0.0, limit: Optional[int] = None) -> List[dict]:
+        """手持ち食材でのカバー率が高い順にレシピを返す"""
+        pantry = set(self.pantry_rows.values())
+
+        # 転置リストから手持ち食材ごとに該当レシピを数える
+        matched = Counter()
+        for ingredient_id in pantry:
+            for recipe_id in self.postings.get(ingredient_id, ()):
+                matched[recipe_id] += 1
+
+        scored = []
+        for recipe_id, (recipe_name, entries) in self.recipes.items():
+            if not entries:
+                continue
+            coverage = matched.get(recipe_id, 0) / len(entries)
+            if coverage < min_coverage:
+                continue
+            scored.append((coverage, recipe_id, recipe_name, entries))
+
+        # カバー率の高い順、同率なら新しいレシピ順
+        scored.sort(key=lambda item: (-item[0], -item[1]))
+        if limit is not None:
+            scored = scored[:limit]
+
+        return [
+            {
+                'recipe_id': recipe_id,
+                'recipe_name': recipe_name,
+                'coverage': round(coverage, 4),
+                'matched_count': matched.get(recipe_id, 0),
+                'total_count': len(entries),
+                'missing': [name for ingredient_id, name in entries if ingredient_id not in pantry],
+            }
+            for coverage, recipe_id, recipe_name, entries in scored
+        ]
+
+
+# インデックスが反映している変更のバージョン（コミットした変更ごとに進める）
+INDEX_VERSION = 'cookable-index'
+
+
+def _cache_key(user_id: int) -> str:
+    return f"cookable_index:{user_id}"
+
+
+def _cache_timeout() -> int:
+    return getattr(settings, 'COOKABLE_INDEX_TIMEOUT', 3600)
+
+
+def get_index(user_id: int) -> CookableIndex:
+    """キャッシュ済みのインデックスを取得（なければ、または古ければ構築）"""
+    version = get_version(INDEX_VERSION, user_id)
+    entry = cache.get(_cache_key(user_id))
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    index = CookableIndex.build(user_id)
+    # 構築中にコミットされた変更があればバージョンが進んでいるため、次回の取得で作り直す
+    cache.set(_cache_key(user_id), (version, index), _cache_timeout())
+    return index
+
+
+def _update_index(user_id: int, apply):
+    """
+    コミット後に、キャッシュ済みのインデックスにだけ差分を適用（未構築なら次回アクセス時に構築）
+    ロールバックした変更は反映しない。変更ごとにバージョンを cache.incr で進め、直前のバージョンの
+    インデックスにだけ適用して新しいバージョンで保存する（他のワーカーと同時に更新して直前の
+    バージョンでなくなった場合は適用せず、get_index がバージョンの不一致で作り直す）
+    """
+    def update():
+        bump_version(INDEX_VERSION, user_id)
+        version = get_version(INDEX_VERSION, user_id)
+        entry = cache.get(_cache_key(user_id))
+        if entry is None or entry[0] != version - 1:
+            return
+        index = entry[1]
+        apply(index)
+        cache.set(_cache_key(user_id), (version, index), _cache_timeout())
+    transaction.on_commit(update)
+
+
+# シグナルから呼ばれる差分更新
+def recipe_saved(recipe: Recipe):
+    def apply(index):
+        # コミット後に呼ばれるため、Recipe.save() が書き込んだ材料（RecipeIngredient）を読める
+        ingredients = recipe.recipe_ingredients.order_by('position').values_list('ingredient_id', 'name')
+        index.put_recipe(recipe.id, recipe.recipe_name, ingredients)
+    _update_index(recipe.user_id, apply)
+
+
+def recipe_deleted(recipe: Recipe):
+    # 削除後は instance.pk が None になるため、IDはシグナルの時点で取得する
+    recipe_id = recipe.id
+    _update_index(recipe.user_id, lambda index: index.remove_recipe(recipe_id))
+
+
+def pantry_item_saved(item: IngredientCache):
+    cache_id, ingredient_id = item.id, item.ingredient_id
+    _update_index(item.user_id, lambda index: index.put_pantry_item(cache_id, ingredient_id))
+
+
+def pantry_item_deleted(item: IngredientCache):
+    cache_id = item.id
+    _update_index(item.user_id, lambda index: index.remove_pantry_item(cache_id))
@@ -0,0 +1,117 @@
+# daily_dish/services/counters.py
+"""
+件数カウンターの更新・読み込み
+
+統計APIはCOUNT(*)の代わりにUserCounter/GlobalCounterの1行を読む。
+カウンターはシグナルで作成・削除と同じトランザクション内で増減し、
+ずれた場合は reconcile_counters コマンドで再集計する。
+"""
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+
+from ..models import User, Recipe, CookedDish, IngredientCache, UserCounter, GlobalCounter
+
+GLOBAL_COUNTER_ID = 1
+
+# モデル -> カウンターのフィールド名
+USER_COUNTER_FIELDS = {
+    Recipe: 'total_recipes',
+    CookedDish: 'total_cooked_dishes',
+    IngredientCache: 'total_ingredient_cache',
+}
+GLOBAL_COUNTER_FIELDS = {**USER_COUNTER_FIELDS, User: 'total_users'}
+
+
+def adjust(model, user_id, delta: int, rebuild_missing: bool = True):
+    """作成・削除に合わせてカウンターを増減
+
+    カウンター行がまだない場合、作成時は実件数から作り直す。
+    削除時（ユーザーのカスケード削除中など）は作り直さない。
+    """
+    now = timezone.now()
+    with transaction.atomic(savepoint=False):
+        field = USER_COUNTER_FIELDS.get(model)
+        if field and user_id:
+            updated = UserCounter.objects.filter(user_id=user_id).update(
+                **{field: F(field) + delta, 'updated_at': now}
+            )
+            if not updated and rebuild_missing:
+                rebuild_user_counter(user_id)
+
+        field = GLOBAL_COUNTER_FIELDS[model]
+        updated = GlobalCounter.objects.filter(pk=GLOBAL_COUNTER_ID).update(
+            **{field: F(field) + delta, 'updated_at': now}
+        )
+        if not updated and rebuild_missing:
+            rebuild_global_counter()
+
+
+def count_user_rows(user_id):
+    """ユーザーの実件数を集計"""
+    return {
+        'total_recipes': Recipe.objects.filter(user_id=user_id).count(),
+        'total_cooked_dishes': CookedDish.objects.filter(user_id=user_id).count(),
+        'total_ingredient_cache': IngredientCache.objects.filter(user_id=user_id).count(),
+    }
+
+
+def count_global_rows():
+    """全体の実件数を集計"""
+    return {
+        'total_recipes': Recipe.objects.count(),
+        'total_cooked_dishes': CookedDish.objects.count(),
+        'total_users': User.objects.count(),
+        'total_ingredient_cache': IngredientCache.objects.count(),
+    }
+
+
+def rebuild_user_counter(user_id) -> UserCounter:
+    """ユーザーのカウンターを実件数から作り直す"""
+    counter, _ = UserCounter.objects.update_or_create(
+        user_id=user_id, defaults=count_user_rows(user_id)
+    )
+    return counter
+
+
+def rebuild_global_counter() -> GlobalCounter:
+    """全体のカウンターを実件数から作り直す"""
+    counter, _ = GlobalCounter.objects.update_or_create(
+        pk=GLOBAL_COUNTER_ID, defaults=count_global_rows()
+    )
+    return counter
+
+
+def get_user_stats(user_id) -> dict:
+    """ユーザー統計（カウンター1行の読み込み）"""
+    counter = UserCounter.objects.filter(user_id=user_id).first()
+    if counter is None:
+        counter = rebuild_user_counter(user_id)
+    return counter.as_stats()
+
+
+def get_global_stats() -> dict:
+    """全体統計（カウンター1行の読み込み）"""
+    counter = GlobalCounter.objects.filter(pk=GLOBAL_COUNTER_ID).first()
+    if counter is None:
+        counter = rebuild_global_counter()
+    return counter.as_stats()
+
+
+def find_user_drift():
+    """全ユーザーの実件数を集計し、カウンターとずれている(user_id, 実件数)を返す"""
+    actual = {
+        user_id: {field: 0 for field in USER_COUNTER_FIELDS.values()}
+        for user_id in User.objects.values_list('id', flat=True)
+    }
+    for model, field in USER_COUNTER_FIELDS.items():
+        rows = model.objects.values('user_id').annotate(total=Count('id')).values_list('user_id', 'total')
+        for user_id, total in rows:
+            actual[user_id][field] = total
+
+    stored = {counter.user_id: counter.as_stats() for counter in UserCounter.objects.all()}
+    return [
+        (user_id, counts)
+        for user_id, counts in actual.items()
+        if stored.get(user_id) != counts
+    ]
@@ -0,0 +1,39 @@
+# daily_dish/services/dashboard.py
+"""
+ダッシュボード・統計・最近のアクティビティのレスポンスキャッシュ
+
+ユーザーごとのバージョン番号をキーに含めて保持し、レシピ・料理履歴・食材キャッシュ・
+ユーザーの保存・削除（QuerySet.delete() の一括削除を含む、signals.py）と
+カウンターの修正で番号を進めて無効化する。キャッシュが有効な間はDBにアクセスしない。
+作り直しは stampede.get_or_compute で1リクエストだけが行う。
+"""
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework.exceptions import AuthenticationFailed
+
+from .cache_versions import get_version
+from .stampede import get_or_compute
+
+User = get_user_model()
+
+# バージョンのスコープ名
+DASHBOARD_VERSION = 'dashboard'
+
+
+def get_payload(name: str, user_id, build: Callable) -> dict:
+    """
+    キャッシュ済みのレスポンスを返す（なければ build(user) で作って保存）
+    作り直すときはユーザーを読み込み、無効化・削除済みなら認証エラーにする
+    （ユーザーの保存・削除でもバージョンが進むため、キャッシュが古いユーザーの状態を返すことはない）
+    """
+    key = f'dashboard:{name}:{user_id}:{get_version(DASHBOARD_VERSION, user_id)}'
+
+    def compute():
+        user = User.objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            raise AuthenticationFailed('User not found', code='user_not_found')
+        return build(user)
+
+    return get_or_compute(key, compute, getattr(settings, 'DASHBOARD_CACHE_TIMEOUT', 3600))
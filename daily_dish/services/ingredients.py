@@ -0,0 +1,85 @@
+# daily_dish/services/ingredients.py
+"""
+食材名の正規化と正規食材IDの解決
+
+表記ゆれ（全角/半角・カタカナ/ひらがな・空白）を正規化したキーで
+Ingredient / IngredientSynonym を引き、書き込み時に正規食材IDを決める。
+照合・集計はこのIDで行う。
+"""
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, Optional
+
+from ..models import Ingredient, IngredientSynonym
+
+# 初期登録する同義語（正規名 -> 別表記）
+DEFAULT_SYNONYMS = {
+    '鶏肉': ['とり肉', 'とりにく', '鳥肉'],
+    '豚肉': ['ぶた肉', 'ぶたにく'],
+    '牛肉': ['ぎゅう肉', 'ぎゅうにく'],
+    '卵': ['たまご', '玉子'],
+    '玉ねぎ': ['たまねぎ', '玉葱'],
+    '人参': ['にんじん'],
+    'じゃがいも': ['じゃが芋', '馬鈴薯'],
+    '豆腐': ['とうふ'],
+    '醤油': ['しょうゆ', '醬油'],
+    '味噌': ['みそ'],
+    '砂糖': ['さとう'],
+    '塩': ['しお'],
+}
+
+
+# カタカナ -> ひらがな（ァ-ヶ を ぁ-ゖ に寄せる）
+_KATAKANA_TO_HIRAGANA = {code: code - 0x60 for code in range(0x30A1, 0x30F7)}
+
+
+def normalize(text: str) -> str:
+    """全角/半角・大文字小文字・カタカナ/ひらがなの違いを吸収"""
+    text = unicodedata.normalize('NFKC', text or '').lower()
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def clean_name(name: Optional[str]) -> str:
+    """表示用の食材名を整える（前後・連続する空白のみ除去）"""
+    return ' '.join((name or '').split())
+
+
+@lru_cache(maxsize=4096)
+def normalize_name(name: str) -> str:
+    """照合用のキー（NFKC・小文字・カタカナ/ひらがな統一・空白除去）"""
+    return ''.join(normalize(name).split())
+
+
+def resolve_ids(names: Iterable[str], create: bool = True) -> Dict[str, int]:
+    """食材名 -> 正規食材ID（未登録の食材はcreate=Trueなら新規登録）"""
+    keys = {name: normalize_name(name) for name in names if name and normalize_name(name)}
+    if not keys:
+        return {}
+    wanted = set(keys.values())
+
+    ids = dict(
+        IngredientSynonym.objects
+        .filter(normalized_name__in=wanted)
+        .values_list('normalized_name', 'ingredient_id')
+    )
+    rest = wanted - ids.keys()
+    if rest:
+        ids.update(Ingredient.objects.filter(normalized_name__in=rest).values_list('normalized_name', 'id'))
+
+    missing = wanted - ids.keys()
+    if missing and create:
+        display = {}
+        for name, key in keys.items():
+            display.setdefault(key, clean_name(name))
+        Ingredient.objects.bulk_create(
+            [Ingredient(name=display[key], normalized_name=key) for key in missing],
+            ignore_conflicts=True
+        )
+        ids.update(Ingredient.objects.filter(normalized_name__in=missing).values_list('normalized_name', 'id'))
+
+    return {name: ids[key] for name, key in keys.items() if key in ids}
+
+
+def resolve_id(name: str, create: bool = True) -> Optional[int]:
+    """食材名 -> 正規食材ID"""
+    return resolve_ids([name], create=create).get(name)
@@ -2,6 +2,7 @@
 import re
 from typing import Dict, List, Tuple, Any
 from django.core.exceptions import ValidationError
+from .ingredients import clean_name
 
 class LineTextParser:
     """LINEテキスト解析サービス"""
@@ -41,7 +42,8 @@ class LineTextParser:
                 recipe_name = line[3:].strip()
             elif line.startswith("材料:"):
                 ingredients_str = line[3:].strip()
-                ingredients = [ing.strip() for ing in ingredients_str.split("、") if ing.strip()]
+                # 材料名の空白を整える（正規食材IDは保存時に解決）
+                ingredients = [clean_name(ing) for ing in ingredients_str.split("、") if clean_name(ing)]
             elif line.startswith("量:"):
                 amounts_str = line[2:].strip()
                 amounts = [amt.strip() for amt in amounts_str.split("、") if amt.strip()]
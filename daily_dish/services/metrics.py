@@ -0,0 +1,168 @@
+# daily_dish/services/metrics.py
+"""
+エンドポイントごとの計測（SQL件数・SQL時間・シリアライズ時間・レイテンシ）
+
+MetricsMiddleware がリクエストごとに RequestMetrics を request.metrics に設定し、
+SQLは connection.execute_wrapper で数える。集計は prometheus_client のヒストグラム・カウンターで行い、
+/api/internal/metrics でPrometheusのテキスト形式で返す。
+
+gunicorn の複数ワーカーで動かすときは環境変数 PROMETHEUS_MULTIPROC_DIR（gunicorn.conf.py で設定）に
+各ワーカーが値を書き出し、メトリクスAPIは全ワーカーの合計を返す（prometheus_client のマルチプロセスモード）。
+未設定（runserver・テスト）のときはプロセス内の値を返す。
+"""
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Optional
+
+from django.conf import settings
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.multiprocess import MultiProcessCollector
+
+# バケットの上限（秒 / 件）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+UNMATCHED_VIEW = 'unmatched'
+
+LABEL_NAMES = ('view', 'method')
+
+# このアプリのメトリクスだけを登録する（プロセス・GCなどの既定のメトリクスは含めない）
+REGISTRY = CollectorRegistry()
+
+REQUEST_DURATION = Histogram(
+    'daily_dish_request_duration_seconds', 'Total request latency.',
+    LABEL_NAMES, buckets=LATENCY_BUCKETS, registry=REGISTRY
+)
+SQL_QUERIES = Histogram(
+    'daily_dish_sql_queries', 'SQL queries per request.',
+    LABEL_NAMES, buckets=QUERY_COUNT_BUCKETS, registry=REGISTRY
+)
+SQL_DURATION = Histogram(
+    'daily_dish_sql_duration_seconds', 'Time spent in SQL per request.',
+    LABEL_NAMES, buckets=LATENCY_BUCKETS, registry=REGISTRY
+)
+SERIALIZE_DURATION = Histogram(
+    'daily_dish_serialize_duration_seconds', 'Time spent serializing (excluding SQL) per request.',
+    LABEL_NAMES, buckets=LATENCY_BUCKETS, registry=REGISTRY
+)
+BUDGET_EXCEEDED = Counter(
+    'daily_dish_query_budget_exceeded', 'Requests that exceeded their SQL query budget.',
+    LABEL_NAMES, registry=REGISTRY
+)
+
+# 2層キャッシュ（cache_backends.TieredRedisCache）
+CACHE_REQUESTS = Counter(
+    'daily_dish_cache_requests', 'Cache lookups by result.', ('cache', 'result'), registry=REGISTRY
+)
+CACHE_L2_ERRORS = Counter(
+    'daily_dish_cache_l2_errors', 'Redis calls that failed or timed out.', ('cache',), registry=REGISTRY
+)
+CACHE_CIRCUIT_OPEN = Gauge(
+    'daily_dish_cache_circuit_open', 'Whether Redis is bypassed (1) or used (0) by any worker.',
+    ('cache',), registry=REGISTRY, multiprocess_mode='max'
+)
+CACHE_L1_ENTRIES = Gauge(
+    'daily_dish_cache_l1_entries', 'Entries held in the in-process caches of live workers.',
+    ('cache',), registry=REGISTRY, multiprocess_mode='livesum'
+)
+
+METRICS = (
+    REQUEST_DURATION, SQL_QUERIES, SQL_DURATION, SERIALIZE_DURATION, BUDGET_EXCEEDED,
+    CACHE_REQUESTS, CACHE_L2_ERRORS, CACHE_CIRCUIT_OPEN, CACHE_L1_ENTRIES,
+)
+
+
+class RequestMetrics:
+    """1リクエスト分の計測値（connection.execute_wrapper としても使う）"""
+    __slots__ = ('queries', 'sql_time', 'serialize_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.sql_time = 0.0
+        self.serialize_time: Optional[float] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.sql_time += perf_counter() - start
+
+    def server_timing(self, total: float) -> str:
+        """Server-Timing ヘッダーの値（ミリ秒）"""
+        parts = [f'db;dur={self.sql_time * 1000:.1f};desc="{self.queries} queries"']
+        if self.serialize_time is not None:
+            parts.append(f'serialize;dur={self.serialize_time * 1000:.1f}')
+        parts.append(f'total;dur={total * 1000:.1f}')
+        return ', '.join(parts)
+
+
+@contextmanager
+def serialize_timer(request):
+    """ブロック内の処理時間からSQL時間を除いたものをシリアライズ時間として記録"""
+    request_metrics = getattr(request, 'metrics', None)
+    if request_metrics is None:
+        yield
+        return
+    start, sql_start = perf_counter(), request_metrics.sql_time
+    try:
+        yield
+    finally:
+        elapsed = (perf_counter() - start) - (request_metrics.sql_time - sql_start)
+        request_metrics.serialize_time = (request_metrics.serialize_time or 0.0) + max(elapsed, 0.0)
+
+
+def record_request(view: str, method: str, request_metrics: RequestMetrics, total: float):
+    REQUEST_DURATION.labels(view, method).observe(total)
+    SQL_QUERIES.labels(view, method).observe(request_metrics.queries)
+    SQL_DURATION.labels(view, method).observe(request_metrics.sql_time)
+    if request_metrics.serialize_time is not None:
+        SERIALIZE_DURATION.labels(view, method).observe(request_metrics.serialize_time)
+
+
+def query_budget(view: str, method: str) -> Optional[int]:
+    """QUERY_BUDGETS の上限（"GET ビュー名" を "ビュー名" より優先）"""
+    budgets = getattr(settings, 'QUERY_BUDGETS', {})
+    budget = budgets.get(f'{method} {view}')
+    return budgets.get(view) if budget is None else budget
+
+
+def record_budget_exceeded(view: str, method: str):
+    BUDGET_EXCEEDED.labels(view, method).inc()
+
+
+def render_prometheus() -> bytes:
+    """Prometheusのテキスト形式（version 0.0.4、マルチプロセスモードでは全ワーカーの合計）"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+def reset():
+    """集計をすべて破棄（テスト用）"""
+    for metric in METRICS:
+        metric.clear()
+
+
+class SerializerTimingMixin:
+    """GenericAPIView用: list/retrieve/create/update のシリアライズ時間を計測"""
+
+    def list(self, request, *args, **kwargs):
+        with serialize_timer(request):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        with serialize_timer(request):
+            return super().retrieve(request, *args, **kwargs)
+
+    def create(self, request, *args, **kwargs):
+        with serialize_timer(request):
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with serialize_timer(request):
+            return super().update(request, *args, **kwargs)
@@ -0,0 +1,145 @@
+# daily_dish/services/response_cache.py
+"""
+外部API向けのレスポンスキャッシュ（描画済みJSONのバイト列 + gzip / brotli の変種）
+
+外部APIは全クライアントが同じデータを読むため、描画したJSONをそのまま保存して返す。
+キーは条件付きリクエストの検証子（conditional.get_validators: URL・表現形式・テーブル全体の
+変更バージョン）から作るため、データが変われば別のキーになり古いエントリは使われない。
+圧縮は保存時に1回だけ行い、Accept-Encoding に合う変種を Content-Encoding を付けて返す。
+作り直しは stampede.get_or_compute で1リクエストだけが行い（single-flight）、
+時間切れの間は古いエントリを返しながら作り直す。
+"""
+import functools
+import gzip
+from typing import Callable, Iterable, Optional
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from rest_framework.response import Response
+
+from . import conditional
+from .stampede import get_or_compute
+
+try:
+    import brotli
+except ImportError:  # brotliがない環境ではgzipの変種のみ作る
+    brotli = None
+
+# 返す変種の優先順
+ENCODINGS = ('br', 'gzip')
+# これより小さい本文は圧縮しない
+MIN_COMPRESS_SIZE = 256
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 8
+
+
+def accepted_encodings(header: str) -> set:
+    """Accept-Encoding で受け入れる符号化（q=0 は除く）"""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        quality = 1.0
+        params = params.strip().replace(' ', '')
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def compress(content: bytes) -> dict:
+    """符号化 -> 圧縮したバイト列"""
+    if len(content) < MIN_COMPRESS_SIZE:
+        return {}
+    variants = {'gzip': gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(content, quality=BROTLI_QUALITY)
+    return variants
+
+
+def render_entry(request, response, view=None) -> Optional[dict]:
+    """DRFのレスポンスを描画して保存用のエントリにする（200以外はNone）"""
+    if not isinstance(response, Response) or response.status_code != 200:
+        return None
+    response.accepted_renderer = request.accepted_renderer
+    response.accepted_media_type = request.accepted_media_type
+    response.renderer_context = {'view': view, 'args': (), 'kwargs': {}, 'request': request, 'response': response}
+    content = bytes(response.rendered_content)
+    return {
+        'content_type': response['Content-Type'],
+        'identity': content,
+        **compress(content),
+    }
+
+
+def serve(request, entry: dict) -> HttpResponse:
+    """Accept-Encoding に合う変種を返す"""
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    encoding = next(
+        (encoding for encoding in ENCODINGS if encoding in entry and (encoding in accepted or '*' in accepted)),
+        None
+    )
+    response = HttpResponse(entry[encoding or 'identity'], content_type=entry['content_type'])
+    if encoding is not None:
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+
+def respond(request, resources: Iterable[str], get_response: Callable, extra_scopes: Iterable[str] = (),
+            params: Optional[Iterable[str]] = None, view=None):
+    """
+    キャッシュ済みのバイト列を返す（なければ get_response() を描画して保存）
+    JSON以外の表現、params にないクエリパラメーターを含むリクエストはキャッシュしない
+    """
+    renderer = getattr(request, 'accepted_renderer', None)
+    if renderer is None or renderer.format != 'json':
+        return get_response()
+    if params is not None and not set(request.query_params).issubset(params):
+        return get_response()
+
+    etag, _ = conditional.get_validators(request, resources, conditional.ALL_USERS, extra_scopes)
+    uncached = []
+
+    def build():
+        response = get_response()
+        entry = render_entry(request, response, view)
+        if entry is None:
+            uncached.append(response)
+        return entry
+
+    entry = get_or_compute('response:' + etag.strip('"'), build, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+    # 200以外はキャッシュせずにそのまま返す
+    return serve(request, entry) if entry is not None else uncached[0]
+
+
+def cached_response(resources: Iterable[str], extra_scopes: Iterable[str] = (), params: Iterable[str] = ()):
+    """関数ビュー用デコレーター（@conditional_view の内側に付ける）"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return func(request, *args, **kwargs)
+            return respond(request, resources, lambda: func(request, *args, **kwargs), extra_scopes, params)
+        return wrapper
+    return decorator
+
+
+class ResponseCacheMixin:
+    """
+    外部APIの GenericAPIView 用: GETのレスポンスをバイト列でキャッシュする（ConditionalGetMixin の後に置く）
+    response_cache_params にキャッシュしてよいクエリパラメーター名を指定する
+    """
+    response_cache_params: Iterable[str] = ()
+
+    def get(self, request, *args, **kwargs):
+        return respond(
+            request, self.validator_resources,
+            lambda: super(ResponseCacheMixin, self).get(request, *args, **kwargs),
+            params=self.response_cache_params, view=self
+        )
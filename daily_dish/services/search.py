@@ -0,0 +1,177 @@
+# daily_dish/services/search.py
+"""
+レシピ全文検索
+
+日本語は空白で区切られないため、レシピ名と材料名を正規化したうえで
+文字bigramに分割して索引する。DBごとに実装を切り替える。
+
+- SQLite: FTS5仮想テーブル recipe_search（rowid = recipe_id）
+- PostgreSQL: recipe_search テーブルのトークン配列（bigramと1文字）+ GIN インデックス
+- その他: recipe_name / recipe_ingredients への部分一致
+"""
+from typing import Iterable, List, Optional
+
+from django.db import connection as default_connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from ..models import Recipe, RecipeIngredient, INGREDIENT_SLOT_FIELDS
+from .ingredients import normalize, resolve_id
+
+SEARCH_TABLE = 'recipe_search'
+
+# 索引の更新が必要なフィールド
+INDEXED_FIELDS = INGREDIENT_SLOT_FIELDS | {'recipe_name'}
+
+def _clean(term: str) -> str:
+    # 記号・空白はトークナイザーで区切られるため取り除く
+    return ''.join(ch for ch in normalize(term) if ch.isalnum())
+
+
+def bigrams(term: str) -> List[str]:
+    """文字bigram（末尾の1文字も含める）
+
+    末尾の1文字を加えることで、1文字の検索語を前方一致（"卵"*）で
+    どの位置の文字にも一致させられる。
+    """
+    term = _clean(term)
+    if not term:
+        return []
+    return [term[i:i + 2] for i in range(len(term) - 1)] + [term[-1]]
+
+
+def search_tokens(terms: Iterable[str]) -> List[str]:
+    """PostgreSQLの索引に入れるトークン（bigramとすべての1文字、重複なし）
+
+    1文字の検索語は、SQLiteの前方一致の代わりに1文字のトークンとの完全一致で探す。
+    """
+    tokens = set()
+    for term in terms:
+        term = _clean(term)
+        tokens.update(term[i:i + 2] for i in range(len(term) - 1))
+        tokens.update(term)
+    return sorted(tokens)
+
+
+def document_terms(recipe_name: str, ingredient_names: Iterable[str]) -> List[str]:
+    """索引対象の語（レシピ名と材料名）を正規化して返す"""
+    terms = [normalize(recipe_name)] + [normalize(name) for name in ingredient_names]
+    return [term for term in terms if term]
+
+
+def query_words(query: str) -> List[str]:
+    """検索語を空白で分割して正規化（各語のAND検索）"""
+    return normalize(query).split()
+
+
+class SQLiteFTSBackend:
+    """FTS5によるbigram転置インデックス"""
+
+    def index(self, connection, recipe_id: int, terms: List[str]):
+        tokens = ' '.join(token for term in terms for token in bigrams(term))
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [recipe_id])
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, tokens) VALUES (%s, %s)',
+                [recipe_id, tokens]
+            )
+
+    def remove(self, connection, recipe_id: int):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s', [recipe_id])
+
+    def condition(self, query: str) -> Optional[Q]:
+        # 2文字以上はbigramの完全一致、1文字は前方一致（すべてAND）
+        tokens = []
+        for word in query_words(query):
+            grams = bigrams(word)
+            if len(grams) > 1:
+                tokens.extend(f'"{gram}"' for gram in grams[:-1])
+            elif grams:
+                tokens.append(f'"{grams[0]}"*')
+        if not tokens:
+            return None
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s', [' '.join(tokens)]
+        ))
+
+
+class PostgresBigramBackend:
+    """トークン配列（text[]）のGINインデックスによるbigram転置インデックス"""
+
+    def index(self, connection, recipe_id: int, terms: List[str]):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {SEARCH_TABLE} (recipe_id, tokens) VALUES (%s, %s) '
+                'ON CONFLICT (recipe_id) DO UPDATE SET tokens = EXCLUDED.tokens',
+                [recipe_id, search_tokens(terms)]
+            )
+
+    def remove(self, connection, recipe_id: int):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE recipe_id = %s', [recipe_id])
+
+    def condition(self, query: str) -> Optional[Q]:
+        # 2文字以上はbigram、1文字はその文字のトークンをすべて含む（@>）
+        tokens = set()
+        for word in query_words(query):
+            grams = bigrams(word)
+            tokens.update(grams[:-1] if len(grams) > 1 else grams)
+        if not tokens:
+            return None
+        return Q(id__in=RawSQL(
+            f'SELECT recipe_id FROM {SEARCH_TABLE} WHERE tokens @> %s::text[]', [sorted(tokens)]
+        ))
+
+
+class FallbackBackend:
+    """専用の索引を持たないDB向けの部分一致検索"""
+
+    def index(self, connection, recipe_id: int, terms: List[str]):
+        pass
+
+    def remove(self, connection, recipe_id: int):
+        pass
+
+    def condition(self, query: str) -> Optional[Q]:
+        condition = None
+        for word in query.split():
+            word_condition = (
+                Q(recipe_name__icontains=word)
+                | Q(id__in=RecipeIngredient.objects.filter(name__icontains=word).values('recipe_id'))
+            )
+            condition = word_condition if condition is None else condition & word_condition
+        return condition
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTSBackend(),
+    'postgresql': PostgresBigramBackend(),
+}
+
+
+def get_backend(connection=None):
+    connection = connection or default_connection
+    return BACKENDS.get(connection.vendor, FallbackBackend())
+
+
+def search_recipes(queryset, query: str):
+    """レシピのクエリセットを検索語で絞り込む"""
+    condition = get_backend().condition(query)
+    if condition is None:
+        return queryset
+    # 別表記（とり肉 -> 鶏肉）は正規食材IDで照合
+    ingredient_id = resolve_id(query, create=False)
+    if ingredient_id is not None:
+        condition |= Q(id__in=RecipeIngredient.objects.filter(ingredient_id=ingredient_id).values('recipe_id'))
+    return queryset.filter(condition)
+
+
+# シグナルから呼ばれる索引の更新
+def index_recipe(recipe: Recipe):
+    names = [ingredient['name'] for ingredient in recipe.get_ingredients()]
+    get_backend().index(default_connection, recipe.id, document_terms(recipe.recipe_name, names))
+
+
+def remove_recipe(recipe: Recipe):
+    get_backend().remove(default_connection, recipe.id)
@@ -0,0 +1,100 @@
+# daily_dish/services/shopping_list.py
+import hashlib
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..models import RecipeIngredient, IngredientCache
+from . import units
+from .cache_versions import get_version
+
+# バージョンのスコープ名
+PANTRY_VERSION = 'pantry'
+RECIPES_VERSION = 'recipes'
+
+
+def selection_hash(selections: Dict[int, int]) -> str:
+    """レシピIDと倍率（1/10単位）の組からハッシュを作る"""
+    payload = ','.join(f'{recipe_id}:{multiplier}' for recipe_id, multiplier in sorted(selections.items()))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def get_shopping_list(user_id: int, selections: Dict[int, int]) -> dict:
+    """買い物リストを取得（ユーザー・レシピ集合・手持ち食材のバージョンでキャッシュ）"""
+    key = 'shopping_list:{}:{}:{}:{}'.format(
+        user_id,
+        selection_hash(selections),
+        get_version(PANTRY_VERSION, user_id),
+        get_version(RECIPES_VERSION, user_id),
+    )
+    result = cache.get(key)
+    if result is None:
+        result = build_shopping_list(user_id, selections)
+        cache.set(key, result, getattr(settings, 'SHOPPING_LIST_CACHE_TIMEOUT', 3600))
+    return result
+
+
+def build_shopping_list(user_id: int, selections: Dict[int, int]) -> dict:
+    """選択したレシピの材料を合算し、手持ち食材を差し引く
+
+    selectionsは {recipe_id: 倍率を1/10単位にした整数}。
+    材料は選択したレシピ全体を1クエリで取得し、正規食材IDごとに
+    固定小数点の整数で合算する。
+    """
+    rows = (
+        RecipeIngredient.objects
+        .filter(recipe__user_id=user_id, recipe_id__in=list(selections))
+        .order_by('recipe_id', 'position')
+        .values_list('recipe_id', 'recipe__recipe_name', 'ingredient_id', 'name', 'amount', 'unit')
+    )
+
+    recipes = {}
+    required = {}
+    names = {}
+    for recipe_id, recipe_name, ingredient_id, name, amount, unit in rows:
+        recipes[recipe_id] = recipe_name
+        key = name if ingredient_id is None else ingredient_id
+        names.setdefault(key, name)  # 表示名は最初に現れた表記
+        dimension, value = units.to_fixed(amount, unit, name)
+        value = value * selections[recipe_id] // units.AMOUNT_SCALE
+        required[(key, dimension)] = required.get((key, dimension), 0) + value
+
+    pantry_rows = (
+        IngredientCache.objects
+        .filter(user_id=user_id, ingredient_id__in={key for key, _ in required if isinstance(key, int)})
+        .values_list('ingredient_id', 'ingredient_name', 'amount', 'unit')
+    )
+    pantry = units.aggregate(pantry_rows)
+
+    items = []
+    covered = []
+    for (key, dimension), required_value in required.items():
+        name = names[key]
+        pantry_value = pantry.get((key, dimension), 0)
+        to_buy = required_value - pantry_value
+        if to_buy <= 0:
+            covered.append(name)
+            continue
+        amount, unit = units.from_fixed(dimension, to_buy)
+        items.append({
+            'name': name,
+            'amount': amount,
+            'unit': unit,
+            'required_amount': units.from_fixed(dimension, required_value)[0],
+            'pantry_amount': units.from_fixed(dimension, pantry_value)[0],
+        })
+
+    return {
+        'recipes': [
+            {
+                'id': recipe_id,
+                'recipe_name': recipe_name,
+                'multiplier': selections[recipe_id] / units.AMOUNT_SCALE,
+            }
+            for recipe_id, recipe_name in recipes.items()
+        ],
+        'not_found_ids': sorted(set(selections) - set(recipes)),
+        'items': items,
+        'covered': covered,
+    }
@@ -0,0 +1,102 @@
+# daily_dish/services/slow_queries.py
+"""
+スロークエリログ
+
+SLOW_QUERY_THRESHOLD_MS を超えたクエリを、発行元のビュー・呼び出し元（プロジェクト内の
+スタック）・実行計画（SQLiteは EXPLAIN QUERY PLAN、それ以外は EXPLAIN）とともに
+'daily_dish.slow_queries' ロガーへ1行のJSONで出力する。パラメータの値は個人情報を
+含みうるため記録しない（件数のみ）。
+"""
+import json
+import logging
+import os
+import traceback
+from time import perf_counter
+from typing import List, Optional
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+logger = logging.getLogger('daily_dish.slow_queries')
+
+# 実行計画を取得する文（更新系は実行計画の取得でも副作用を避けるため対象外）
+EXPLAINABLE_PREFIXES = ('SELECT', 'WITH')
+STACK_LIMIT = 8
+
+_PROJECT_DIR = str(settings.BASE_DIR) + os.sep
+# 計測用のラッパー・ミドルウェアのフレームは呼び出し元に含めない
+_SKIPPED_FILES = tuple(
+    os.path.join('daily_dish', *path) for path in (
+        ('middleware.py',), ('services', 'metrics.py'), ('services', 'slow_queries.py'),
+    )
+)
+
+
+def threshold() -> Optional[float]:
+    """しきい値（秒）。Noneなら無効"""
+    value = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', None)
+    return None if value is None else value / 1000
+
+
+def stack_summary() -> List[str]:
+    """プロジェクト内のフレームのみを呼び出し順に返す"""
+    frames = [
+        frame for frame in traceback.extract_stack()
+        if frame.filename.startswith(_PROJECT_DIR)
+        and 'site-packages' not in frame.filename
+        and not frame.filename.endswith(_SKIPPED_FILES)
+    ]
+    return [f'{os.path.relpath(frame.filename, _PROJECT_DIR)}:{frame.lineno} in {frame.name}' for frame in frames[-STACK_LIMIT:]]
+
+
+def explain(connection, sql: str, params) -> Optional[list]:
+    """実行計画を取得（取得できない文・エラー時はNone）"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+        return None
+    prefix = 'EXPLAIN QUERY PLAN ' if connection.vendor == 'sqlite' else 'EXPLAIN '
+    # 実行計画の取得自体は計測・ログの対象にしない
+    wrappers, connection.execute_wrappers = connection.execute_wrappers, []
+    try:
+        # 失敗してもリクエストのトランザクションを壊さないようセーブポイント内で実行
+        with transaction.atomic(using=connection.alias):
+            with connection.cursor() as cursor:
+                cursor.execute(prefix + sql, params)
+                return [list(row) for row in cursor.fetchall()]
+    except DatabaseError:
+        return None
+    finally:
+        connection.execute_wrappers = wrappers
+
+
+class SlowQueryLogger:
+    """connection.execute_wrapper 用: しきい値を超えたクエリをログに出力"""
+
+    def __init__(self, request, threshold_seconds: float):
+        self.request = request
+        self.threshold = threshold_seconds
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        result = execute(sql, params, many, context)
+        duration = perf_counter() - start
+        if duration >= self.threshold:
+            self.log(context['connection'], sql, params, many, duration)
+        return result
+
+    def log(self, connection, sql, params, many, duration):
+        match = getattr(self.request, 'resolver_match', None)
+        entry = {
+            'timestamp': timezone.now().isoformat(),
+            'duration_ms': round(duration * 1000, 1),
+            'view': match.view_name if match is not None else None,
+            'method': self.request.method,
+            'path': self.request.path,
+            'database': connection.alias,
+            'sql': sql,
+            'params_count': len(params) if params and not many else 0,
+            'many': many,
+            'stack': stack_summary(),
+            'plan': None if many else explain(connection, sql, params),
+        }
+        logger.warning(json.dumps(entry, ensure_ascii=False, default=str))
@@ -0,0 +1,100 @@
+# daily_dish/services/stampede.py
+"""
+キャッシュの一斉再計算（スタンピード）対策
+
+get_or_compute はキャッシュした値を返し、なければ fn() で作って保存する。
+- 作り直すのは cache.add のロックを取った1リクエストだけ（single-flight）。値がまだない間、
+  他のリクエストは出来上がりを待つ（ロックが消えても出来ていなければ自分で作る）。
+- 有効期限を過ぎた値は CACHE_STALE_TIMEOUT 秒だけ残し、作り直している間は古い値を返す。
+- 有効期限が近づくと、作り直しにかかった時間に応じた確率で期限前に作り直す
+  （XFetch: now - delta * beta * log(rand()) >= expires_at）。期限切れが一斉に起きないようにする。
+データの変更による無効化はキーに含めたバージョン番号（cache_versions）で行うため、
+古い値を返すのは同じキーの時間切れのときだけで、変更前の値が新しいキーで返ることはない。
+"""
+import math
+import random
+import time
+import uuid
+from typing import Any, Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+# 他のリクエストが作り直すのを待つ間隔（秒）
+POLL_INTERVAL = 0.02
+
+
+def _lock_key(key: str) -> str:
+    return f'{key}:lock'
+
+
+def store(key: str, value, ttl: int, delta: float = 0.0) -> None:
+    """値を保存（有効期限・作り直しにかかった秒数と一緒に、期限切れ後も古い値として残す）"""
+    stale_timeout = getattr(settings, 'CACHE_STALE_TIMEOUT', 300)
+    cache.set(key, (value, time.time() + ttl, delta), ttl + stale_timeout)
+
+
+def _should_refresh(expires_at: float, delta: float) -> bool:
+    beta = getattr(settings, 'CACHE_EARLY_REFRESH_BETA', 1.0)
+    # 1 - random() は (0, 1] のため log の引数が0にならない
+    return time.time() - delta * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def _compute(key: str, fn: Callable, ttl: int):
+    started = time.monotonic()
+    value = fn()
+    if value is not None:
+        store(key, value, ttl, time.monotonic() - started)
+    return value
+
+
+def _compute_locked(key: str, fn: Callable, ttl: int):
+    """ロックを取れれば (True, 作った値)、取れなければ (False, None)"""
+    lock_key = _lock_key(key)
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, getattr(settings, 'CACHE_LOCK_TIMEOUT', 10)):
+        return False, None
+    try:
+        return True, _compute(key, fn, ttl)
+    finally:
+        if cache.get(lock_key) == token:
+            cache.delete(lock_key)
+
+
+def _wait(key: str) -> Optional[tuple]:
+    """他のリクエストが作り直すのを待つ（ロックが消えても出来ていなければNone）"""
+    deadline = time.monotonic() + getattr(settings, 'CACHE_LOCK_WAIT', 2.0)
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(_lock_key(key)) is None:
+            break
+    return None
+
+
+def get_or_compute(key: str, fn: Callable[[], Any], ttl: int):
+    """
+    キャッシュした値を返す（なければ fn() で作って ttl 秒保存、fn() が None を返したときは保存しない）
+    """
+    entry = cache.get(key)
+    if entry is not None:
+        value, expires_at, delta = entry
+        if not _should_refresh(expires_at, delta):
+            return value
+        # 期限切れ・期限前の作り直し: ロックを取れなければ（他のリクエストが作り直し中）今の値を返す
+        acquired, computed = _compute_locked(key, fn, ttl)
+        return computed if acquired else value
+
+    # 値がない: 1回目はロック待ち、ロックが消えても出来ていなければもう1回だけロックを取りにいく
+    for attempt in range(2):
+        acquired, computed = _compute_locked(key, fn, ttl)
+        if acquired:
+            return computed
+        if attempt == 0:
+            entry = _wait(key)
+            if entry is not None:
+                return entry[0]
+    # 待ちきれなければロックなしで作る
+    return _compute(key, fn, ttl)
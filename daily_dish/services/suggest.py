@@ -0,0 +1,106 @@
+# daily_dish/services/suggest.py
+"""
+食材名の入力補完
+
+ユーザーごとに食材名（レシピの材料 + 手持ち食材）を正規化したキーで並べた
+ソート済み配列をワーカープロセス内に保持し、bisectで前方一致を探す。
+レシピ・手持ち食材・ユーザーのバージョン（世代）が変わったときだけ再構築するため、
+キー入力ごとのリクエストではDBにアクセスしない。再構築のときはユーザーを確認し、
+無効化・削除済みなら認証エラーにする（dashboard.get_payload と同じ）。
+"""
+import threading
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from typing import List, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count
+from rest_framework.exceptions import AuthenticationFailed
+
+from ..models import RecipeIngredient, IngredientCache
+from .cache_versions import get_version
+from .dashboard import DASHBOARD_VERSION
+from .ingredients import normalize
+from .shopping_list import PANTRY_VERSION, RECIPES_VERSION
+
+User = get_user_model()
+
+
+class SuggestIndex:
+    """正規化キーのソート済み配列による前方一致インデックス"""
+
+    def __init__(self, counts: Counter):
+        # (正規化キー, 表示名) の昇順
+        self.entries: List[Tuple[str, str]] = sorted(
+            (normalize(name).strip(), name) for name in counts if name
+        )
+        self.keys = [key for key, _ in self.entries]
+        self.counts = counts
+
+    @classmethod
+    def build(cls, user_id: int) -> 'SuggestIndex':
+        """DBからインデックスを構築（2クエリ）"""
+        counts = Counter(dict(
+            RecipeIngredient.objects
+            .filter(recipe__user_id=user_id)
+            .values('name')
+            .annotate(n=Count('id'))
+            .values_list('name', 'n')
+        ))
+        counts.update(
+            IngredientCache.objects.filter(user_id=user_id).values_list('ingredient_name', flat=True)
+        )
+        return cls(counts)
+
+    def suggest(self, prefix: str, limit: int) -> List[dict]:
+        """前方一致する食材名を使用回数の多い順に返す"""
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+        matches = []
+        for i in range(bisect_left(self.keys, prefix), len(self.keys)):
+            if not self.keys[i].startswith(prefix):
+                break
+            name = self.entries[i][1]
+            matches.append((-self.counts[name], self.keys[i], name))
+        matches.sort()
+        return [{'name': name, 'count': -count} for count, _, name in matches[:limit]]
+
+
+# user_id -> (世代, SuggestIndex)。最近使ったユーザーのみ保持する
+_indexes: 'OrderedDict[int, Tuple[tuple, SuggestIndex]]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def _max_users() -> int:
+    return getattr(settings, 'SUGGEST_INDEX_MAX_USERS', 256)
+
+
+def get_index(user_id: int) -> SuggestIndex:
+    """現在の世代のインデックスを取得（世代が変わっていれば再構築）"""
+    # ユーザーの保存・削除では DASHBOARD_VERSION が進む（signals.py）
+    generation = (
+        get_version(RECIPES_VERSION, user_id),
+        get_version(PANTRY_VERSION, user_id),
+        get_version(DASHBOARD_VERSION, user_id),
+    )
+    with _lock:
+        entry = _indexes.get(user_id)
+        if entry is not None and entry[0] == generation:
+            _indexes.move_to_end(user_id)
+            return entry[1]
+
+    if not User.objects.filter(pk=user_id, is_active=True).exists():
+        raise AuthenticationFailed('User not found', code='user_not_found')
+    index = SuggestIndex.build(user_id)
+    with _lock:
+        _indexes[user_id] = (generation, index)
+        _indexes.move_to_end(user_id)
+        while len(_indexes) > _max_users():
+            _indexes.popitem(last=False)
+    return index
+
+
+def suggest(user_id: int, prefix: str, limit: int = 10) -> List[dict]:
+    return get_index(user_id).suggest(prefix, limit)
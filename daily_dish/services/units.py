@@ -0,0 +1,180 @@
+# daily_dish/services/units.py
+"""
+単位換算エンジン
+
+量は基本単位（質量: g / 体積: ml / 個数: 各単位）の1/10000を1とする
+整数の固定小数点値で扱い、合計や比較はすべて整数演算で行う。
+換算係数は表から事前計算し、単位・食材ごとにメモ化する。
+"""
+import re
+import unicodedata
+from decimal import Decimal
+from functools import lru_cache
+from typing import Dict, Hashable, Iterable, Optional, Tuple
+
+# 基本単位1あたりの固定小数点値
+FIXED_SCALE = 10000
+# 入力される量の精度（DecimalField decimal_places=1 に合わせて1/10単位）
+AMOUNT_SCALE = 10
+
+MASS = 'mass'
+VOLUME = 'volume'
+COUNT_PREFIX = 'count:'
+OTHER_PREFIX = 'other:'
+
+# 単位 -> (次元, 基本単位での大きさ×FIXED_SCALE)
+UNIT_TABLE = {
+    # 質量（基本単位: g）
+    'g': (MASS, 10000),
+    'グラム': (MASS, 10000),
+    'kg': (MASS, 10000000),
+    'キロ': (MASS, 10000000),
+    'キログラム': (MASS, 10000000),
+    'mg': (MASS, 10),
+    # 体積（基本単位: ml）
+    'ml': (VOLUME, 10000),
+    'cc': (VOLUME, 10000),
+    'ミリリットル': (VOLUME, 10000),
+    'dl': (VOLUME, 1000000),
+    'l': (VOLUME, 10000000),
+    'リットル': (VOLUME, 10000000),
+    '大さじ': (VOLUME, 150000),
+    '小さじ': (VOLUME, 50000),
+    'カップ': (VOLUME, 2000000),
+    '合': (VOLUME, 1800000),
+}
+
+# 表記ゆれ -> 正規の単位名
+UNIT_ALIASES = {
+    'gram': 'g',
+    'grams': 'g',
+    'kilo': 'kg',
+    'cc.': 'cc',
+    'ℓ': 'l',
+    'ｌ': 'l',
+    '大匙': '大さじ',
+    'おおさじ': '大さじ',
+    'tbsp': '大さじ',
+    '小匙': '小さじ',
+    'こさじ': '小さじ',
+    'tsp': '小さじ',
+    'cup': 'カップ',
+    'c': 'カップ',
+}
+
+# 数量として扱えない単位（同じ単位どうしでのみまとめる）
+UNMEASURED_UNITS = frozenset(['少々', '適量', '適宜', 'ひとつまみ', 'お好みで'])
+
+# 食材ごとの密度（g/ml を1000倍した整数）。大さじ1(15ml)の重量から算出
+DENSITY_PERMILLE = {
+    '水': 1000,
+    '酒': 1000,
+    '酢': 1000,
+    '牛乳': 1000,
+    'ケチャップ': 1000,
+    '醤油': 1200,
+    'しょうゆ': 1200,
+    'みりん': 1200,
+    '味噌': 1200,
+    'みそ': 1200,
+    '塩': 1200,
+    '砂糖': 600,
+    '小麦粉': 600,
+    '薄力粉': 600,
+    '片栗粉': 600,
+    'パン粉': 200,
+    'サラダ油': 800,
+    '油': 800,
+    'ごま油': 800,
+    'オリーブオイル': 800,
+    'バター': 800,
+    'マヨネーズ': 800,
+    'はちみつ': 1400,
+}
+
+# 「大さじ2」のように単位が数値の前に来る表記
+_UNIT_FIRST_PATTERN = re.compile(r'^(大さじ|小さじ|カップ)\s*(\d+(?:\.\d+)?)$')
+
+
+@lru_cache(maxsize=1024)
+def normalize_unit(unit: Optional[str]) -> str:
+    """単位文字列を正規化（全角/半角・大文字小文字・表記ゆれを統一）"""
+    if not unit:
+        return ''
+    normalized = unicodedata.normalize('NFKC', unit).strip()
+    lowered = normalized.lower()
+    if lowered in UNIT_TABLE or lowered in UNIT_ALIASES:
+        normalized = lowered
+    return UNIT_ALIASES.get(normalized, normalized)
+
+
+@lru_cache(maxsize=4096)
+def resolve(unit: Optional[str], ingredient: Optional[str] = None) -> Tuple[str, int]:
+    """単位（と食材）から(次元, 単位あたりの固定小数点値)を求める
+
+    密度が登録された食材は体積を質量に換算し、gとml表記を合算できるようにする。
+    表にない単位はその単位自体を次元とし、同じ単位どうしでのみ合算する。
+    """
+    unit = normalize_unit(unit)
+    dimension, factor = UNIT_TABLE.get(unit, (None, FIXED_SCALE))
+    if dimension is None:
+        prefix = OTHER_PREFIX if unit in UNMEASURED_UNITS else COUNT_PREFIX
+        return f'{prefix}{unit}', factor
+
+    if dimension == VOLUME and ingredient:
+        density = DENSITY_PERMILLE.get(unicodedata.normalize('NFKC', ingredient).strip())
+        if density is not None:
+            return MASS, factor * density // 1000
+    return dimension, factor
+
+
+def split_unit_first(amount, unit: Optional[str]) -> Tuple[object, Optional[str]]:
+    """「大さじ2」形式の単位を(2, "大さじ")に分解（量が1で単位側に数値がある場合のみ）"""
+    if unit:
+        match = _UNIT_FIRST_PATTERN.match(unicodedata.normalize('NFKC', unit).strip())
+        if match and to_tenths(amount) == AMOUNT_SCALE:
+            return Decimal(match.group(2)), match.group(1)
+    return amount, unit
+
+
+def to_tenths(amount) -> int:
+    """量を1/10単位の整数に変換（小数第2位以下は丸める）"""
+    if amount is None:
+        return 0
+    if isinstance(amount, int):
+        return amount * AMOUNT_SCALE
+    if isinstance(amount, Decimal):
+        return int(amount.scaleb(1).to_integral_value())
+    return int(round(float(amount) * AMOUNT_SCALE))
+
+
+def to_fixed(amount, unit: Optional[str], ingredient: Optional[str] = None) -> Tuple[str, int]:
+    """量と単位を(次元, 固定小数点値)に変換"""
+    amount, unit = split_unit_first(amount, unit)
+    dimension, factor = resolve(unit, ingredient)
+    return dimension, to_tenths(amount) * factor // AMOUNT_SCALE
+
+
+def aggregate(rows: Iterable[Tuple[Hashable, str, object, Optional[str]]],
+              totals: Optional[Dict[Tuple[Hashable, str], int]] = None) -> Dict[Tuple[Hashable, str], int]:
+    """(キー, 食材名, 量, 単位)の列を(キー, 次元)ごとに整数で合算
+
+    キーには食材名や正規化済みの食材IDなど、合算の単位にしたい値を渡す。
+    """
+    if totals is None:
+        totals = {}
+    for key, ingredient, amount, unit in rows:
+        dimension, value = to_fixed(amount, unit, ingredient)
+        totals[(key, dimension)] = totals.get((key, dimension), 0) + value
+    return totals
+
+
+def from_fixed(dimension: str, value: int) -> Tuple[float, str]:
+    """固定小数点値を表示用の(量, 単位)に戻す（小数1桁に丸める）"""
+    if dimension == MASS:
+        unit, factor = ('kg', 10000000) if abs(value) >= 10000000 else ('g', 10000)
+    elif dimension == VOLUME:
+        unit, factor = ('l', 10000000) if abs(value) >= 10000000 else ('ml', 10000)
+    else:
+        unit, factor = dimension.split(':', 1)[1], FIXED_SCALE
+    return round(value / factor, 1), unit
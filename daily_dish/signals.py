@@ -0,0 +1,150 @@
+# daily_dish/signals.py
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import User, Recipe, CookedDish, IngredientCache, UserCounter, ChangeLog, ApiKey
+from .services import api_keys, change_feed, conditional, cookable, counters, dashboard, search, shopping_list
+from .services.cache_versions import bump_version_on_commit
+
+
+# 「今作れるレシピ」転置インデックスの差分更新
+@receiver(post_save, sender=Recipe)
+def update_cookable_index_on_recipe_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cookable.recipe_saved(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def update_cookable_index_on_recipe_delete(sender, instance, **kwargs):
+    cookable.recipe_deleted(instance)
+
+
+@receiver(post_save, sender=IngredientCache)
+def update_cookable_index_on_pantry_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        cookable.pantry_item_saved(instance)
+
+
+@receiver(post_delete, sender=IngredientCache)
+def update_cookable_index_on_pantry_delete(sender, instance, **kwargs):
+    cookable.pantry_item_deleted(instance)
+
+
+# 買い物リストのキャッシュ無効化
+@receiver([post_save, post_delete], sender=Recipe)
+def bump_recipes_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version_on_commit(shopping_list.RECIPES_VERSION, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=IngredientCache)
+def bump_pantry_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version_on_commit(shopping_list.PANTRY_VERSION, instance.user_id)
+
+
+# ダッシュボード・統計のキャッシュ無効化（QuerySet.delete() の一括削除でも1件ごとに呼ばれる）
+@receiver([post_save, post_delete], sender=Recipe)
+@receiver([post_save, post_delete], sender=CookedDish)
+@receiver([post_save, post_delete], sender=IngredientCache)
+def bump_dashboard_version(sender, instance, raw=False, **kwargs):
+    if not raw:
+        bump_version_on_commit(dashboard.DASHBOARD_VERSION, instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=User)
+def bump_dashboard_version_on_user_change(sender, instance, raw=False, update_fields=None, **kwargs):
+    # ログイン時の last_login の更新はレスポンスに含まれないため無視
+    if raw or update_fields == frozenset({'last_login'}):
+        return
+    bump_version_on_commit(dashboard.DASHBOARD_VERSION, instance.pk)
+
+
+# 条件付きリクエストの検証子（ETag / Last-Modified）の更新
+VALIDATOR_RESOURCES = {
+    Recipe: conditional.RECIPES,
+    CookedDish: conditional.COOKED_DISHES,
+    IngredientCache: conditional.INGREDIENT_CACHE,
+    User: conditional.USERS,
+}
+
+
+@receiver([post_save, post_delete], sender=Recipe)
+@receiver([post_save, post_delete], sender=CookedDish)
+@receiver([post_save, post_delete], sender=IngredientCache)
+@receiver([post_save, post_delete], sender=User)
+def record_resource_change(sender, instance, signal, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields == frozenset({'last_login'}):
+        return
+    user_id = instance.pk if sender is User else instance.user_id
+    # 保存は行の updated_at（あれば）、削除は現在時刻を変更時刻とする
+    modified_at = getattr(instance, 'updated_at', None) if signal is post_save else None
+    conditional.resource_changed(VALIDATOR_RESOURCES[sender], user_id, modified_at)
+
+
+# 件数カウンターの更新（保存・削除と同じトランザクション内）
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=CookedDish)
+@receiver(post_save, sender=IngredientCache)
+def increment_counters(sender, instance, created=False, raw=False, **kwargs):
+    if not created or raw:
+        return
+    if sender is User:
+        UserCounter.objects.create(user=instance)
+        counters.adjust(User, None, 1)
+    else:
+        counters.adjust(sender, instance.user_id, 1)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=CookedDish)
+@receiver(post_delete, sender=IngredientCache)
+def decrement_counters(sender, instance, **kwargs):
+    # QuerySet.delete()（一括削除）でも1件ごとに呼ばれる
+    user_id = None if sender is User else instance.user_id
+    counters.adjust(sender, user_id, -1, rebuild_missing=False)
+
+
+# 差分同期フィードへの記録
+@receiver(post_save, sender=Recipe)
+@receiver(post_save, sender=CookedDish)
+@receiver(post_save, sender=IngredientCache)
+def record_change_on_save(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    change_feed.record(sender, [instance.pk], ChangeLog.ACTION_UPSERT)
+    if sender is Recipe and not created and (update_fields is None or 'recipe_name' in update_fields):
+        # 料理履歴の外部表現はレシピ名を含むため、レシピ更新時に合わせて記録
+        cooked_ids = CookedDish.objects.filter(recipe_id=instance.pk).values_list('id', flat=True)
+        change_feed.record(CookedDish, cooked_ids, ChangeLog.ACTION_UPSERT)
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(post_delete, sender=CookedDish)
+@receiver(post_delete, sender=IngredientCache)
+def record_change_on_delete(sender, instance, **kwargs):
+    change_feed.record(sender, [instance.pk], ChangeLog.ACTION_DELETE)
+
+
+# API Keyキャッシュの無効化
+@receiver(post_save, sender=ApiKey)
+@receiver(post_delete, sender=ApiKey)
+def invalidate_api_key(sender, instance, **kwargs):
+    api_keys.invalidate(instance)
+
+
+# 検索索引の更新
+@receiver(post_save, sender=Recipe)
+def index_recipe_for_search(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not search.INDEXED_FIELDS.intersection(update_fields):
+        return
+    search.index_recipe(instance)
+
+
+@receiver(post_delete, sender=Recipe)
+def remove_recipe_from_search(sender, instance, **kwargs):
+    search.remove_recipe(instance)
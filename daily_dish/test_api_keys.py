@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import QuerySet
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import ApiKey
+from .services import api_keys
+from .testing import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, API_KEY_USAGE_FLUSH_INTERVAL=3600)
+class ApiKeyAuthenticationCacheTest(APITestCase):
+    """API Keyキャッシュと使用回数のまとめ書きのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        api_keys.flush_usage()
+        self.api_key = ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        self.url = reverse('daily_dish:external_stats')
+    
+    def test_steady_state_has_no_api_key_queries(self):
+        """2回目以降のリクエストではapi_keysテーブルにアクセスしないテスト"""
+        self.client.get(self.url)
+        
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse([q for q in ctx.captured_queries if 'api_keys' in q['sql']])
+    
+    def test_usage_is_flushed_in_bulk(self):
+        """使用回数がまとめて反映されるテスト"""
+        for _ in range(3):
+            self.client.get(self.url)
+        
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 0)
+        
+        api_keys.flush_usage()
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 3)
+        self.assertIsNotNone(self.api_key.last_used_at)
+    
+    def test_usage_is_kept_when_flush_fails(self):
+        """DBへの反映に失敗した使用回数は次回の反映に持ち越されるテスト"""
+        for _ in range(3):
+            self.client.get(self.url)
+        
+        # 一定間隔ごとの反映はリクエストの中で行われるが、失敗してもリクエストは成功する
+        with override_settings(API_KEY_USAGE_FLUSH_INTERVAL=0), \
+                mock.patch.object(api_keys, 'logger') as logger, \
+                mock.patch.object(QuerySet, 'update', side_effect=DatabaseError('unavailable')):
+            self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        logger.warning.assert_called_once()
+        
+        # 直接呼んだときは例外を送出する（集計は残る）
+        with mock.patch.object(QuerySet, 'update', side_effect=DatabaseError('unavailable')):
+            with self.assertRaises(DatabaseError):
+                api_keys.flush_usage()
+        
+        self.client.get(self.url)
+        api_keys.flush_usage()
+        self.api_key.refresh_from_db()
+        self.assertEqual(self.api_key.usage_count, 5)
+    
+    def test_deactivated_key_is_rejected_immediately(self):
+        """無効化したAPI Keyはキャッシュ済みでも拒否されるテスト"""
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        
+        self.api_key.is_active = False
+        self.api_key.save()
+        
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
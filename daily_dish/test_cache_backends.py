@@ -0,0 +1,169 @@
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django_redis.cache import RedisCache
+
+from . import cache_backends
+from .cache_backends import TieredRedisCache
+from .services import metrics
+
+# 接続が即座に拒否されるアドレス（Redis障害の再現）
+UNREACHABLE = 'redis://127.0.0.1:1/0'
+
+
+def make_cache(**options):
+    options.setdefault('INVALIDATION_CHANNEL', None)
+    options.setdefault('SOCKET_CONNECT_TIMEOUT', 0.1)
+    options.setdefault('SOCKET_TIMEOUT', 0.1)
+    return TieredRedisCache(UNREACHABLE, {'TIMEOUT': 300, 'OPTIONS': options})
+
+
+class TieredCacheTestMixin:
+
+    def setUp(self):
+        cache_backends._states.clear()
+        metrics.reset()
+        # 回路の開閉の警告ログを出力しない
+        logger_patcher = mock.patch.object(cache_backends, 'logger')
+        self.logger = logger_patcher.start()
+        self.addCleanup(logger_patcher.stop)
+        self.cache = make_cache(L1_MAX_ENTRIES=3, CIRCUIT_FAILURE_THRESHOLD=2, CIRCUIT_RESET_TIMEOUT=60)
+        self.state = self.cache.state
+
+    def stat(self, name, **labels):
+        return metrics.REGISTRY.get_sample_value(name, {'cache': self.state.name, **labels}) or 0
+
+
+class DegradedCacheTest(TieredCacheTestMixin, SimpleTestCase):
+    """Redisに到達できないときのL1のみでの動作とサーキットブレーカーのテスト"""
+
+    def test_falls_back_to_l1(self):
+        self.cache.set('linking:U1', 'waiting', 300)
+        self.assertEqual(self.cache.get('linking:U1'), 'waiting')
+        self.assertEqual(self.cache.get('missing', 'default'), 'default')
+        self.assertTrue(self.cache.has_key('linking:U1'))
+        self.cache.delete('linking:U1')
+        self.assertIsNone(self.cache.get('linking:U1'))
+
+    def test_add_respects_l1(self):
+        self.assertTrue(self.cache.add('key', 1))
+        self.assertFalse(self.cache.add('key', 2))
+        self.assertEqual(self.cache.get('key'), 1)
+
+    def test_incr_is_not_counted_in_l1(self):
+        # ワーカーごとにL1の値から数えると番号が食い違うため、bump_version が時刻から作り直せるよう送出する
+        self.cache.set('version', 1)
+        with self.assertRaises(ValueError):
+            self.cache.incr('version')
+        self.assertEqual(self.cache.get('version'), 1)
+
+    def test_circuit_opens_and_skips_redis(self):
+        self.cache.get('a')
+        self.cache.get('b')
+        self.assertTrue(self.state.breaker.is_open)
+        self.assertEqual(self.stat('daily_dish_cache_l2_errors_total'), 2)
+        self.assertEqual(self.stat('daily_dish_cache_circuit_open'), 1)
+        self.logger.warning.assert_called_once()
+
+        with mock.patch.object(RedisCache, 'get') as l2_get:
+            self.assertIsNone(self.cache.get('c'))
+        l2_get.assert_not_called()
+        self.assertEqual(self.stat('daily_dish_cache_requests_total', result='miss'), 3)
+
+    def test_half_open_recovery_drops_l1(self):
+        self.cache.get('a')
+        self.cache.get('b')
+        self.cache.set('stale', 'written during outage')
+        self.state.breaker.opened_at -= 60
+
+        with mock.patch.object(RedisCache, 'get', return_value='fresh') as l2_get:
+            self.assertEqual(self.cache.get('key'), 'fresh')
+        l2_get.assert_called_once()
+        self.assertFalse(self.state.breaker.is_open)
+        self.assertEqual(self.stat('daily_dish_cache_circuit_open'), 0)
+        self.assertIsNone(self.state.local.get('stale', None))
+
+
+class LocalTierTest(TieredCacheTestMixin, SimpleTestCase):
+    """L1（プロセス内LRU）のテスト"""
+
+    def test_l2_hit_is_kept_in_l1(self):
+        with mock.patch.object(RedisCache, 'get', return_value={'count': 1}) as l2_get:
+            self.assertEqual(self.cache.get('hot'), {'count': 1})
+            value = self.cache.get('hot')
+        l2_get.assert_called_once()
+        self.assertEqual(self.stat('daily_dish_cache_requests_total', result='l2_hit'), 1)
+        self.assertEqual(self.stat('daily_dish_cache_requests_total', result='l1_hit'), 1)
+
+        # 呼び出し元の変更はL1に共有されない
+        value['count'] = 2
+        self.assertEqual(self.cache.get('hot'), {'count': 1})
+
+    def test_lru_eviction(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.set(key, key)
+        self.cache.get('a')
+        self.cache.set('d', 'd')
+        self.assertEqual(len(self.state.local), 3)
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual(self.cache.get('a'), 'a')
+
+    def test_zero_timeout_is_not_kept(self):
+        self.cache.set('key', 'value', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_invalidation_message(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+        key = self.cache._l1_key('a')
+
+        self.state.handle_message(f'{self.state.origin} {key}'.encode())
+        self.assertEqual(self.cache.get('a'), 1)
+
+        self.state.handle_message(f'other-worker {key}'.encode())
+        self.assertIsNone(self.state.local.get(key, None))
+        self.assertEqual(self.cache.get('b'), 2)
+
+        self.state.handle_message(b'other-worker *')
+        self.assertEqual(len(self.state.local), 0)
+
+    def test_writes_publish_invalidation(self):
+        cache = make_cache(INVALIDATION_CHANNEL='test:invalidation')
+        redis_client = mock.Mock()
+        with mock.patch.object(RedisCache, 'set', return_value=True), \
+                mock.patch.object(cache.state, 'ensure_subscriber'), \
+                mock.patch.object(cache.client, 'get_client', return_value=redis_client):
+            cache.set('key', 'value')
+        redis_client.publish.assert_called_once_with(
+            'test:invalidation', f'{cache.state.origin} {cache._l1_key("key")}'
+        )
+
+    def test_publish_failure_does_not_fail_write(self):
+        cache = make_cache(INVALIDATION_CHANNEL='test:invalidation')
+        redis_client = mock.Mock()
+        redis_client.publish.side_effect = ConnectionError('publish failed')
+        with mock.patch.object(RedisCache, 'set', return_value=True), \
+                mock.patch.object(cache.state, 'ensure_subscriber'), \
+                mock.patch.object(cache.client, 'get_client', return_value=redis_client):
+            self.assertTrue(cache.set('key', 'value'))
+        self.assertFalse(cache.state.breaker.failures)
+        self.assertEqual(self.stat('daily_dish_cache_l2_errors_total'), 0)
+        self.logger.warning.assert_called_once()
+
+    def test_shared_between_instances(self):
+        self.cache.set('key', 'value')
+        other = make_cache()
+        self.assertIs(other.state, self.state)
+        self.assertEqual(other.get('key'), 'value')
+
+    def test_prometheus_collector(self):
+        self.cache.set('key', 'value')
+        self.cache.get('key')
+        self.cache.get('missing')
+        body = metrics.render_prometheus().decode()
+        self.assertIn('daily_dish_cache_requests_total{cache="127.0.0.1:1/0",result="l1_hit"} 1.0', body)
+        self.assertIn('daily_dish_cache_requests_total{cache="127.0.0.1:1/0",result="miss"} 1.0', body)
+        self.assertIn('daily_dish_cache_l1_entries{cache="127.0.0.1:1/0"} 1.0', body)
+
+    def test_display_name_hides_credentials(self):
+        self.assertEqual(cache_backends._display_name('redis://:secret@redis.internal/1'), 'redis.internal:6379/1')
@@ -0,0 +1,140 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey, ChangeLog
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CHANGE_FEED_SAFETY_LAG=0)
+class ChangeFeedAPITest(APITestCase):
+    """差分同期フィードAPIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+        self.cooked = CookedDish.objects.create(user=self.user, recipe=self.recipe)
+    
+    def changes(self, **params):
+        return self.client.get(reverse('daily_dish:external_changes'), params)
+    
+    def test_initial_sync(self):
+        """作成された全オブジェクトがupsertとして返るテスト"""
+        response = self.changes(since=0)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        changes = response.data['changes']
+        self.assertEqual(
+            [(c['resource'], c['id'], c['action']) for c in changes],
+            [('recipes', self.recipe.id, 'upsert'), ('cooked-dishes', self.cooked.id, 'upsert')]
+        )
+        self.assertEqual(changes[0]['data']['recipe_name'], '親子丼')
+        self.assertFalse(response.data['has_more'])
+    
+    def test_incremental_sync_and_tombstone(self):
+        """next_since以降の更新と削除だけが返るテスト"""
+        since = self.changes(since=0).data['next_since']
+        
+        self.recipe.recipe_name = '他人丼'
+        self.recipe.save()
+        item = IngredientCache.objects.create(
+            user=self.user, ingredient_name='卵', amount=Decimal('6.0'), unit='個'
+        )
+        item_id = item.id
+        item.delete()
+        
+        response = self.changes(since=since)
+        changes = {(c['resource'], c['id']): c for c in response.data['changes']}
+        
+        # レシピ名の変更は料理履歴にも伝播する
+        self.assertEqual(changes[('recipes', self.recipe.id)]['data']['recipe_name'], '他人丼')
+        self.assertEqual(changes[('cooked-dishes', self.cooked.id)]['data']['recipe_name'], '他人丼')
+        # 同じページ内の作成→削除は削除のみ
+        tombstone = changes[('ingredient-cache', item_id)]
+        self.assertEqual(tombstone['action'], 'delete')
+        self.assertNotIn('data', tombstone)
+        
+        # 追いついた後は空
+        response = self.changes(since=response.data['next_since'])
+        self.assertEqual(response.data['changes'], [])
+    
+    def test_paging(self):
+        """limitを超える変更はhas_moreで続きを取得するテスト"""
+        first = self.changes(since=0, limit=1)
+        self.assertEqual(len(first.data['changes']), 1)
+        self.assertTrue(first.data['has_more'])
+        
+        second = self.changes(since=first.data['next_since'], limit=1)
+        self.assertEqual(second.data['changes'][0]['resource'], 'cooked-dishes')
+        self.assertFalse(second.data['has_more'])
+    
+    def test_export_change_seq_header(self):
+        """エクスポートのX-Change-Seqから差分同期を始められるテスト"""
+        response = self.client.get(
+            reverse('daily_dish:external_export', kwargs={'resource': 'recipes'})
+        )
+        b''.join(response.streaming_content)
+        
+        since = int(response['X-Change-Seq'])
+        self.assertEqual(self.changes(since=since).data['changes'], [])
+    
+    def test_invalid_params(self):
+        """不正なパラメータは400を返すテスト"""
+        self.assertEqual(self.changes(since='abc').status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.changes(limit=0).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.changes(limit=5000).status_code, status.HTTP_400_BAD_REQUEST)
+    
+    def test_prune_and_expired_cursor(self):
+        """保持期間を過ぎた変更履歴を削除し、削除済みの範囲を指すsinceは410を返すテスト"""
+        since = self.changes(since=0).data['next_since']
+        ChangeLog.objects.update(created_at=timezone.now() - timedelta(days=31))
+        self.recipe.recipe_name = '他人丼'
+        self.recipe.save()
+        
+        out = StringIO()
+        call_command('prune_change_log', days=30, stdout=out)
+        self.assertIn('2件', out.getvalue())
+        
+        self.assertEqual(self.changes(since=0).status_code, status.HTTP_410_GONE)
+        # 削除前に追いついていたカーソルは続きを取得できる
+        response = self.changes(since=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            {(c['resource'], c['id']) for c in response.data['changes']},
+            {('recipes', self.recipe.id), ('cooked-dishes', self.cooked.id)}
+        )
+    
+    def test_prune_keeps_latest_seq(self):
+        """すべて古くても最新の1件は残し、エクスポートのX-Change-Seqから同期できるテスト"""
+        ChangeLog.objects.update(created_at=timezone.now() - timedelta(days=31))
+        call_command('prune_change_log', stdout=StringIO())
+        
+        self.assertEqual(ChangeLog.objects.count(), 1)
+        response = self.client.get(
+            reverse('daily_dish:external_export', kwargs={'resource': 'recipes'})
+        )
+        b''.join(response.streaming_content)
+        since = int(response['X-Change-Seq'])
+        self.assertEqual(self.changes(since=since).data['changes'], [])
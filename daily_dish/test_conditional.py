@@ -0,0 +1,166 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey
+from .services import conditional
+from .services.cache_versions import get_version
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, API_KEY_USAGE_FLUSH_INTERVAL=3600)
+class ConditionalRequestTest(APITestCase):
+    """ETag / Last-Modified / 304 のテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpassword123'
+        )
+        self.recipe = self.create_recipe(self.user, '親子丼')
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+
+    def create_recipe(self, user, name):
+        return Recipe.objects.create(
+            user=user, recipe_name=name,
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+
+    def use_jwt(self):
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+
+    def use_api_key(self):
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        # API Keyをプロセス内キャッシュに載せる
+        self.client.get(reverse('daily_dish:external_stats'))
+
+    def test_web_list_not_modified(self):
+        self.use_jwt()
+        url = reverse('daily_dish:web_recipe_list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]{40}"$')
+        self.assertTrue(response.has_header('Last-Modified'))
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+        self.assertIn('Authorization', response['Vary'])
+
+        # JWT認証のユーザー取得のみ（一覧のCOUNT・SELECTは行わない）
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response['Cache-Control'], 'private, no-cache')
+
+        # クエリ文字列が違えば別の表現
+        self.assertNotEqual(self.client.get(url, data={'page_size': 1})['ETag'], etag)
+
+        # 他のユーザーの変更では変わらない
+        self.create_recipe(self.other, 'カレー')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.create_recipe(self.user, 'カレー')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 2)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        self.use_jwt()
+        url = reverse('daily_dish:web_recipe_detail', kwargs={'pk': self.recipe.pk})
+        last_modified = self.client.get(url)['Last-Modified']
+
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        # If-None-Match があれば If-Modified-Since より優先
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified, HTTP_IF_NONE_MATCH='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dependent_resources(self):
+        """料理履歴はレシピ名・ユーザー名を含むため、レシピ・ユーザーの変更でも変わる"""
+        self.use_jwt()
+        CookedDish.objects.create(user=self.user, recipe=self.recipe)
+        url = reverse('daily_dish:web_cooked_dish_list')
+        etag = self.client.get(url)['ETag']
+
+        self.recipe.recipe_name = '他人丼'
+        self.recipe.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+
+        self.user.username = 'renamed'
+        self.user.save()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_bulk_delete_changes_etag(self):
+        self.use_jwt()
+        IngredientCache.objects.create(user=self.user, ingredient_name='卵', amount=Decimal('1.0'), unit='個')
+        url = reverse('daily_dish:web_ingredient_cache_list')
+        etag = self.client.get(url)['ETag']
+
+        IngredientCache.objects.filter(user=self.user).delete()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 0)
+
+    def test_dashboard_not_modified(self):
+        self.use_jwt()
+        url = reverse('daily_dish:web_dashboard')
+        etag = self.client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_external_not_modified(self):
+        self.use_api_key()
+        url = reverse('daily_dish:external_recipe_list')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertEqual(response['Cache-Control'], 'private, max-age=15')
+        self.assertIn('X-API-KEY', response['Vary'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # 外部APIは全ユーザーのデータを返すため、どのユーザーの変更でも変わる
+        self.create_recipe(self.other, 'カレー')
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_errors_have_no_validators(self):
+        self.use_jwt()
+        other_recipe = self.create_recipe(self.other, 'カレー')
+        response = self.client.get(reverse('daily_dish:web_recipe_detail', kwargs={'pk': other_recipe.pk}))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_bumped_again_on_commit(self):
+        """コミット前に読まれた内容に新しいETagが付かないよう、コミット後にも進める"""
+        owners = (self.user.id, conditional.ALL_USERS)
+        before = [get_version('resource:recipes', owner) for owner in owners]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.create_recipe(self.user, 'カレー')
+                self.assertEqual([get_version('resource:recipes', owner) for owner in owners], [v + 1 for v in before])
+        self.assertEqual([get_version('resource:recipes', owner) for owner in owners], [v + 2 for v in before])
@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DatabaseError, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, IngredientCache
+from .services import cookable
+from .services.cache_versions import bump_version
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CookableRecipesAPITest(APITestCase):
+    """手持ち食材で作れるレシピAPIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.url = reverse('daily_dish:web_recipe_cookable')
+        
+        self.curry = Recipe.objects.create(
+            user=self.user, recipe_name='チキンカレー',
+            ingredient_1='鶏肉', amount_1=Decimal('300.0'), unit_1='g',
+            ingredient_2='玉ねぎ', amount_2=Decimal('1.0'), unit_2='個',
+            ingredient_3='カレールー', amount_3=Decimal('1.0'), unit_3='箱',
+            ingredient_4='にんじん', amount_4=Decimal('1.0'), unit_4='本',
+        )
+        self.oyakodon = Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g',
+            ingredient_2='卵', amount_2=Decimal('2.0'), unit_2='個',
+        )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='鶏肉', amount=Decimal('500.0'), unit='g'
+        )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='卵', amount=Decimal('6.0'), unit='個'
+        )
+    
+    def test_ranking(self):
+        """カバー率順に並び、不足材料が返ることのテスト"""
+        response = self.client.get(self.url)
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([r['recipe_name'] for r in results], ['親子丼', 'チキンカレー'])
+        self.assertEqual(results[0]['coverage'], 1.0)
+        self.assertEqual(results[0]['missing'], [])
+        self.assertEqual(results[1]['coverage'], 0.25)
+        self.assertEqual(results[1]['missing'], ['玉ねぎ', 'カレールー', 'にんじん'])
+    
+    def test_incremental_update(self):
+        """レシピ・食材の変更がキャッシュ済みインデックスに反映されることのテスト"""
+        self.client.get(self.url)  # インデックスを構築
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientCache.objects.create(
+                user=self.user, ingredient_name='玉ねぎ', amount=Decimal('3.0'), unit='個'
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.oyakodon.delete()
+        
+        with self.assertNumQueries(1):  # 認証のみ
+            response = self.client.get(self.url)
+        results = response.data['results']
+        self.assertEqual([r['recipe_name'] for r in results], ['チキンカレー'])
+        self.assertEqual(results[0]['matched_count'], 2)
+        self.assertEqual(results[0]['missing'], ['カレールー', 'にんじん'])
+    
+    def test_recipe_changes_update_index(self):
+        """レシピの追加・材料の変更がキャッシュ済みインデックスに反映されることのテスト"""
+        self.client.get(self.url)  # インデックスを構築
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            Recipe.objects.create(
+                user=self.user, recipe_name='ゆで卵',
+                ingredient_1='卵', amount_1=Decimal('2.0'), unit_1='個',
+            )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.curry.ingredient_3 = '卵'
+            self.curry.save()
+        
+        with self.assertNumQueries(1):  # 認証のみ
+            response = self.client.get(self.url)
+        results = {r['recipe_name']: r for r in response.data['results']}
+        self.assertEqual(results['ゆで卵']['coverage'], 1.0)
+        self.assertEqual(results['チキンカレー']['matched_count'], 2)
+        self.assertEqual(results['チキンカレー']['missing'], ['玉ねぎ', 'にんじん'])
+    
+    def test_rolled_back_changes_are_not_applied(self):
+        """ロールバックした変更がインデックスに残らないことのテスト"""
+        self.client.get(self.url)  # インデックスを構築
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    self.oyakodon.delete()
+                    raise DatabaseError
+            except DatabaseError:
+                pass
+        
+        response = self.client.get(self.url)
+        self.assertEqual([r['recipe_name'] for r in response.data['results']], ['親子丼', 'チキンカレー'])
+    
+    def test_concurrent_update_rebuilds(self):
+        """他のワーカーの更新とバージョンがずれたインデックスは作り直すことのテスト"""
+        self.client.get(self.url)  # インデックスを構築
+        
+        # 他のワーカーが変更をコミットしたが、インデックスの保存が競合で失われた状態
+        bump_version(cookable.INDEX_VERSION, self.user.id)
+        IngredientCache.objects.filter(user=self.user).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            IngredientCache.objects.create(
+                user=self.user, ingredient_name='卵', amount=Decimal('6.0'), unit='個'
+            )
+        
+        with self.assertNumQueries(4):  # 認証 + インデックスの構築
+            response = self.client.get(self.url)
+        results = {r['recipe_name']: r for r in response.data['results']}
+        self.assertEqual(results['親子丼']['missing'], ['鶏肉'])
+        with self.assertNumQueries(1):
+            self.client.get(self.url)
+    
+    def test_min_coverage_and_limit(self):
+        """min_coverageとlimitによる絞り込みのテスト"""
+        response = self.client.get(self.url, {'min_coverage': '0.5'})
+        self.assertEqual([r['recipe_name'] for r in response.data['results']], ['親子丼'])
+        
+        response = self.client.get(self.url, {'limit': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,131 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, UserCounter, GlobalCounter, ApiKey
+from .services import counters
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CounterMaintenanceTest(TestCase):
+    """件数カウンターの増減テスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+    
+    def test_create_and_delete(self):
+        """作成・削除でカウンターが増減するテスト"""
+        CookedDish.objects.create(user=self.user, recipe=self.recipe)
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='卵', amount=Decimal('6.0'), unit='個'
+        )
+        self.assertEqual(counters.get_user_stats(self.user.id), {
+            'total_recipes': 1,
+            'total_cooked_dishes': 1,
+            'total_ingredient_cache': 1,
+        })
+        
+        # レシピ削除で料理履歴もカスケード削除される
+        self.recipe.delete()
+        self.assertEqual(counters.get_user_stats(self.user.id), {
+            'total_recipes': 0,
+            'total_cooked_dishes': 0,
+            'total_ingredient_cache': 1,
+        })
+        self.assertEqual(counters.get_global_stats()['total_users'], 1)
+    
+    def test_queryset_bulk_delete(self):
+        """QuerySet.delete()でもカウンターが減るテスト"""
+        for name in ['卵', '牛乳', '豆腐']:
+            IngredientCache.objects.create(
+                user=self.user, ingredient_name=name, amount=Decimal('1.0'), unit='個'
+            )
+        IngredientCache.objects.filter(user=self.user).exclude(ingredient_name='卵').delete()
+        
+        self.assertEqual(counters.get_user_stats(self.user.id)['total_ingredient_cache'], 1)
+        self.assertEqual(counters.get_global_stats()['total_ingredient_cache'], 1)
+    
+    def test_user_delete(self):
+        """ユーザー削除（カスケード）でカウンター行を作り直さないテスト"""
+        self.user.delete()
+        
+        self.assertFalse(UserCounter.objects.exists())
+        self.assertEqual(counters.get_global_stats(), {
+            'total_recipes': 0,
+            'total_cooked_dishes': 0,
+            'total_users': 0,
+            'total_ingredient_cache': 0,
+        })
+    
+    def test_reconcile_command(self):
+        """reconcile_countersコマンドでずれを修正するテスト"""
+        UserCounter.objects.filter(user=self.user).update(total_recipes=10)
+        GlobalCounter.objects.update(total_users=5)
+        
+        out = StringIO()
+        call_command('reconcile_counters', '--dry-run', stdout=out)
+        self.assertEqual(UserCounter.objects.get(user=self.user).total_recipes, 10)
+        
+        call_command('reconcile_counters', stdout=out)
+        self.assertEqual(UserCounter.objects.get(user=self.user).total_recipes, 1)
+        self.assertEqual(GlobalCounter.objects.get().total_users, 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class StatsAPICounterTest(APITestCase):
+    """統計APIがカウンターを読むことのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+    
+    def test_web_stats(self):
+        """ユーザー統計のテスト"""
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        
+        with self.assertNumQueries(2):  # 認証 + カウンター1行
+            response = self.client.get(reverse('daily_dish:web_stats'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total_recipes'], 1)
+    
+    def test_external_stats(self):
+        """外部統計のテスト"""
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        response = self.client.get(reverse('daily_dish:external_stats'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['total_recipes'], 1)
+        self.assertEqual(response.json()['total_users'], 1)
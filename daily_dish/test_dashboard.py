@@ -0,0 +1,132 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, UserCounter
+from .services import dashboard
+from .services.cache_versions import get_version
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardCacheTest(APITestCase):
+    """ダッシュボード・統計・最近のアクティビティのキャッシュと無効化のテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpassword123'
+        )
+        self.recipe = self.create_recipe(self.user, '親子丼')
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+
+    def create_recipe(self, user, name):
+        return Recipe.objects.create(
+            user=user, recipe_name=name,
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+
+    def get_dashboard(self):
+        response = self.client.get(reverse('daily_dish:web_dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_repeated_loads_make_no_queries(self):
+        for name in ('web_dashboard', 'web_stats', 'web_recent_activities'):
+            with self.subTest(endpoint=name):
+                first = self.client.get(reverse(f'daily_dish:{name}'))
+                with self.assertNumQueries(0):
+                    second = self.client.get(reverse(f'daily_dish:{name}'))
+                self.assertEqual(second.status_code, status.HTTP_200_OK)
+                self.assertEqual(second.content, first.content)
+
+    def test_invalidated_by_writes(self):
+        self.assertEqual(self.get_dashboard()['stats']['total_recipes'], 1)
+
+        self.create_recipe(self.user, 'カレー')
+        self.assertEqual(self.get_dashboard()['stats']['total_recipes'], 2)
+
+        CookedDish.objects.create(user=self.user, recipe=self.recipe)
+        data = self.get_dashboard()
+        self.assertEqual(data['stats']['total_cooked_dishes'], 1)
+        self.assertEqual(data['recent_activities'][0]['recipe_detail']['recipe_name'], '親子丼')
+
+        self.recipe.recipe_name = '他人丼'
+        self.recipe.save()
+        self.assertEqual(self.get_dashboard()['recent_activities'][0]['recipe_detail']['recipe_name'], '他人丼')
+
+    def test_invalidated_by_bulk_delete(self):
+        for name in ('卵', '玉ねぎ'):
+            IngredientCache.objects.create(user=self.user, ingredient_name=name, amount=Decimal('1.0'), unit='個')
+        self.assertEqual(self.get_dashboard()['stats']['total_ingredient_cache'], 2)
+
+        IngredientCache.objects.filter(user=self.user).delete()
+        self.assertEqual(self.get_dashboard()['stats']['total_ingredient_cache'], 0)
+
+        self.get_dashboard()
+        Recipe.objects.filter(user=self.user).delete()
+        self.assertEqual(self.get_dashboard()['stats']['total_recipes'], 0)
+
+    def test_other_users_writes_keep_cache(self):
+        self.get_dashboard()
+        self.create_recipe(self.other, 'カレー')
+        with self.assertNumQueries(0):
+            self.get_dashboard()
+
+    def test_login_keeps_cache(self):
+        self.get_dashboard()
+        self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        with self.assertNumQueries(0):
+            self.get_dashboard()
+
+    def test_user_changes(self):
+        self.get_dashboard()
+        self.user.email = 'new@example.com'
+        self.user.save()
+        self.assertEqual(self.get_dashboard()['user_info']['email'], 'new@example.com')
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('daily_dish:web_dashboard'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_reconcile_counters_invalidates_stats(self):
+        self.client.get(reverse('daily_dish:web_stats'))
+        UserCounter.objects.filter(user=self.user).update(total_recipes=10)
+        call_command('reconcile_counters', stdout=StringIO())
+
+        response = self.client.get(reverse('daily_dish:web_stats'))
+        self.assertEqual(response.data['total_recipes'], 1)
+
+    def test_bumped_again_on_commit(self):
+        """コミット前のデータで作り直したキャッシュが新しいバージョンで残らないよう、コミット後にも進める"""
+        before = get_version(dashboard.DASHBOARD_VERSION, self.user.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.create_recipe(self.user, 'カレー')
+                self.assertEqual(get_version(dashboard.DASHBOARD_VERSION, self.user.id), before + 1)
+        self.assertEqual(get_version(dashboard.DASHBOARD_VERSION, self.user.id), before + 2)
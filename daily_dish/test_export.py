@@ -0,0 +1,89 @@
+import gzip
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, EXPORT_CHUNK_SIZE=2)
+class ExportAPITest(APITestCase):
+    """NDJSON一括エクスポートAPIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        for i in range(5):
+            recipe = Recipe.objects.create(
+                user=user, recipe_name=f'レシピ{i}',
+                ingredient_1='鶏肉', amount_1=Decimal('100.0'), unit_1='g'
+            )
+            CookedDish.objects.create(user=user, recipe=recipe)
+        IngredientCache.objects.create(
+            user=user, ingredient_name='卵', amount=Decimal('6.0'), unit='個'
+        )
+    
+    def export(self, resource, **extra):
+        url = reverse('daily_dish:external_export', kwargs={'resource': resource})
+        return self.client.get(url, **extra)
+    
+    def test_recipes_export(self):
+        """全件が1行1JSONで返るテスト"""
+        response = self.export('recipes')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode('utf-8').splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['recipe_name'] for row in rows], [f'レシピ{i}' for i in range(5)])
+        self.assertEqual(rows[0]['ingredients'], [{'name': '鶏肉', 'amount': 100.0, 'unit': 'g'}])
+    
+    def test_cooked_dishes_export_gzip(self):
+        """gzip圧縮のテスト"""
+        response = self.export('cooked-dishes', HTTP_ACCEPT_ENCODING='gzip, deflate')
+        
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        body = gzip.decompress(b''.join(response.streaming_content)).decode('utf-8')
+        rows = [json.loads(line) for line in body.splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(rows[0]['recipe_name'], 'レシピ0')
+    
+    def test_gzip_refused_by_q_value(self):
+        """gzip;q=0 のときは圧縮しないテスト"""
+        response = self.export('cooked-dishes', HTTP_ACCEPT_ENCODING='gzip;q=0, deflate')
+        
+        self.assertFalse(response.has_header('Content-Encoding'))
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 5)
+    
+    def test_ingredient_cache_export(self):
+        """食材キャッシュのエクスポートテスト"""
+        response = self.export('ingredient-cache')
+        rows = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(rows[0]['ingredient_name'], '卵')
+        self.assertEqual(rows[0]['amount'], '6.0')
+    
+    def test_unknown_resource(self):
+        """存在しないリソースのテスト"""
+        self.assertEqual(self.export('users').status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_requires_api_key(self):
+        """API Keyなしでは取得できないテスト"""
+        self.client.credentials()
+        self.assertEqual(self.export('recipes').status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,131 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, IngredientCache, Ingredient
+from .services import cookable, ingredients, shopping_list
+from .services.line_parser import LineTextParser
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+class IngredientResolveTest(TestCase):
+    """食材名の正規化と正規食材IDの解決のテスト"""
+    
+    def test_normalize_name(self):
+        self.assertEqual(ingredients.normalize_name(' ﾀﾏﾈｷﾞ '), 'たまねぎ')
+        self.assertEqual(ingredients.normalize_name('鶏 もも肉'), '鶏もも肉')
+    
+    def test_variants_share_one_id(self):
+        """表記ゆれと同義語が同じ正規食材になるテスト"""
+        ids = ingredients.resolve_ids(['鶏肉', 'とり肉', 'トリニク', 'ﾄﾘﾆｸ'])
+        self.assertEqual(len(set(ids.values())), 1)
+        self.assertEqual(Ingredient.objects.get(pk=ids['鶏肉']).name, '鶏肉')
+    
+    def test_unknown_name_is_registered(self):
+        """未登録の食材は作成し、create=Falseでは作成しないテスト"""
+        self.assertIsNone(ingredients.resolve_id('ズッキーニ', create=False))
+        ingredient_id = ingredients.resolve_id('ズッキーニ')
+        self.assertEqual(ingredients.resolve_id('ずっきーに', create=False), ingredient_id)
+    
+    def test_line_parser_cleans_names(self):
+        parsed = LineTextParser.parse_recipe_text('レシピ: 親子丼\n材料: 鶏  肉 、卵\n量: 200g、2個')
+        self.assertEqual(parsed['ingredients'], ['鶏 肉', '卵'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class CanonicalIngredientTest(APITestCase):
+    """正規食材IDによる照合・集計のテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        
+        self.recipe = Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g',
+            ingredient_2='たまご', amount_2=Decimal('2.0'), unit_2='個'
+        )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='とり肉', amount=Decimal('150.0'), unit='g'
+        )
+    
+    def test_recipe_ingredients_store_canonical_id(self):
+        rows = dict(self.recipe.recipe_ingredients.values_list('name', 'ingredient_id'))
+        self.assertEqual(rows['鶏肉'], ingredients.resolve_id('とり肉'))
+        self.assertEqual(rows['たまご'], ingredients.resolve_id('卵'))
+    
+    def test_duplicate_pantry_variant_is_rejected(self):
+        """表記ゆれによる食材キャッシュの重複登録を拒否するテスト"""
+        response = self.client.post(reverse('daily_dish:web_ingredient_cache_list'), {
+            'ingredient_name': 'トリ肉', 'amount': '100.0', 'unit': 'g'
+        })
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ingredient_name', response.data)
+        
+        response = self.client.post(reverse('daily_dish:web_ingredient_cache_list'), {
+            'ingredient_name': ' 玉子 ', 'amount': '6.0', 'unit': '個'
+        })
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['ingredient_name'], '玉子')
+        self.assertEqual(response.data['ingredient'], ingredients.resolve_id('卵'))
+    
+    def test_unlinked_duplicate_can_be_updated(self):
+        """移行時に単位を換算できず正規食材が未設定のまま残った重複行を更新できるテスト"""
+        leftover = IngredientCache.objects.create(
+            user=self.user, ingredient_name='玉子', amount=Decimal('1.0'), unit='パック'
+        )
+        IngredientCache.objects.filter(pk=leftover.pk).update(ingredient_name='とりにく', unit='羽', ingredient=None)
+        url = reverse('daily_dish:web_ingredient_cache_detail', kwargs={'pk': leftover.pk})
+        
+        response = self.client.put(url, {'ingredient_name': 'とりにく', 'amount': '2.0', 'unit': '羽'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['ingredient'])
+        leftover.refresh_from_db()
+        self.assertEqual(leftover.amount, Decimal('2.0'))
+        self.assertIsNone(leftover.ingredient_id)
+        
+        # 別の食材に変えれば正規食材が設定される
+        response = self.client.put(url, {'ingredient_name': 'ねぎ', 'amount': '1.0', 'unit': '本'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['ingredient'], ingredients.resolve_id('ねぎ'))
+    
+    def test_migration_converts_duplicate_units(self):
+        migration = import_module('daily_dish.migrations.0010_link_ingredients')
+        self.assertEqual(migration.convert_amount(Decimal('0.5'), 'kg', 'g'), Decimal('500.0'))
+        self.assertEqual(migration.convert_amount(Decimal('2.0'), '大さじ', 'ｍｌ'), Decimal('30.0'))
+        self.assertIsNone(migration.convert_amount(Decimal('1.0'), '個', 'g'))
+        self.assertIsNone(migration.convert_amount(Decimal('1.0'), 'ml', 'g'))
+    
+    def test_matching_uses_canonical_ids(self):
+        """手持ち食材・材料検索・買い物リストが表記ゆれを同一視するテスト"""
+        ranked = cookable.get_index(self.user.id).rank()
+        self.assertEqual(ranked[0]['matched_count'], 1)
+        self.assertEqual(ranked[0]['missing'], ['たまご'])
+        
+        self.assertEqual(list(Recipe.objects.using_ingredient('トリニク')), [self.recipe])
+        
+        result = shopping_list.build_shopping_list(self.user.id, {self.recipe.id: 10})
+        chicken = next(item for item in result['items'] if item['name'] == '鶏肉')
+        self.assertEqual(chicken['amount'], 50.0)
+        self.assertEqual(chicken['pantry_amount'], 150.0)
+    
+    def test_search_matches_synonyms(self):
+        response = self.client.get(reverse('daily_dish:web_recipe_list'), {'search': 'とり肉'})
+        self.assertEqual([r['recipe_name'] for r in response.data['results']], ['親子丼'])
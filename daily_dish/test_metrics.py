@@ -0,0 +1,162 @@
+import os
+import subprocess
+import sys
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .middleware import QueryBudgetExceeded
+from .models import Recipe
+from .services import metrics
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+# 別プロセスでリクエスト1件分を記録する（gunicornのワーカーの代わり）
+RECORD_SCRIPT = """
+import django
+django.setup()
+from daily_dish.services import metrics
+request_metrics = metrics.RequestMetrics()
+request_metrics.queries = 3
+metrics.record_request('daily_dish:web_recipe_list', 'GET', request_metrics, 0.2)
+metrics.record_budget_exceeded('daily_dish:web_recipe_list', 'GET')
+"""
+RENDER_SCRIPT = """
+import sys
+import django
+django.setup()
+from daily_dish.services import metrics
+sys.stdout.write(metrics.render_prometheus().decode())
+"""
+# gunicorn と同じように設定ファイルを読み込んでから記録する（PROMETHEUS_MULTIPROC_DIR は未設定）
+GUNICORN_SCRIPT = """
+import runpy
+import sys
+config = runpy.run_path('gunicorn.conf.py')
+config['on_starting'](None)
+import django
+django.setup()
+from daily_dish.services import metrics
+metrics.record_budget_exceeded('daily_dish:web_recipe_list', 'GET')
+sys.stdout.write(metrics.render_prometheus().decode())
+"""
+
+
+class MultiProcessMetricsTest(SimpleTestCase):
+    """PROMETHEUS_MULTIPROC_DIR を設定したときに全ワーカーの合計を返すことのテスト"""
+
+    def run_python(self, script, directory):
+        env = {**os.environ, 'PROMETHEUS_MULTIPROC_DIR': directory, 'DJANGO_SETTINGS_MODULE': 'daily_dish_project.settings'}
+        result = subprocess.run(
+            [sys.executable, '-c', script], cwd=settings.BASE_DIR, env=env,
+            capture_output=True, text=True, check=True
+        )
+        return result.stdout
+
+    def test_aggregates_workers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for _ in range(2):
+                self.run_python(RECORD_SCRIPT, directory)
+            body = self.run_python(RENDER_SCRIPT, directory)
+        labels = 'method="GET",view="daily_dish:web_recipe_list"'
+        self.assertIn(f'daily_dish_request_duration_seconds_count{{{labels}}} 2.0', body)
+        self.assertIn(f'daily_dish_sql_queries_sum{{{labels}}} 6.0', body)
+        self.assertIn(f'daily_dish_query_budget_exceeded_total{{{labels}}} 2.0', body)
+
+    def test_gunicorn_config(self):
+        with tempfile.TemporaryDirectory() as directory:
+            env = {key: value for key, value in os.environ.items() if key != 'PROMETHEUS_MULTIPROC_DIR'}
+            env.update(TMPDIR=directory, DJANGO_SETTINGS_MODULE='daily_dish_project.settings')
+            body = subprocess.run(
+                [sys.executable, '-c', GUNICORN_SCRIPT], cwd=settings.BASE_DIR, env=env,
+                capture_output=True, text=True, check=True
+            ).stdout
+            self.assertTrue(os.listdir(os.path.join(directory, 'daily_dish_metrics')))
+        labels = 'method="GET",view="daily_dish:web_recipe_list"'
+        self.assertIn(f'daily_dish_query_budget_exceeded_total{{{labels}}} 1.0', body)
+
+
+@override_settings(CACHES=LOCMEM_CACHES, METRICS_TOKEN='metrics-token')
+class MetricsMiddlewareTest(APITestCase):
+    """計測ミドルウェアとメトリクスAPIのテスト"""
+
+    def setUp(self):
+        cache.clear()
+        metrics.reset()
+        user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword123')
+        Recipe.objects.create(
+            user=user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.url = reverse('daily_dish:web_recipe_list')
+
+    def test_records_per_view(self):
+        self.client.get(self.url)
+        labels = {'view': 'daily_dish:web_recipe_list', 'method': 'GET'}
+        # JWT認証のユーザー取得 + COUNT + 一覧
+        self.assertEqual(metrics.REGISTRY.get_sample_value('daily_dish_sql_queries_sum', labels), 3)
+        self.assertEqual(metrics.REGISTRY.get_sample_value('daily_dish_request_duration_seconds_count', labels), 1)
+        self.assertEqual(metrics.REGISTRY.get_sample_value('daily_dish_serialize_duration_seconds_count', labels), 1)
+
+    @override_settings(SERVER_TIMING=True)
+    def test_server_timing_header(self):
+        response = self.client.get(self.url)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="3 queries", serialize;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+
+    @override_settings(SERVER_TIMING=False)
+    def test_server_timing_disabled(self):
+        self.assertFalse(self.client.get(self.url).has_header('Server-Timing'))
+
+    @override_settings(QUERY_BUDGETS={'GET daily_dish:web_recipe_list': 1}, QUERY_BUDGET_STRICT=True)
+    def test_budget_strict(self):
+        with self.assertLogs('django.request', 'ERROR'), \
+                self.assertRaisesMessage(QueryBudgetExceeded, 'GET daily_dish:web_recipe_list: 3 queries (budget 1)'):
+            self.client.get(self.url)
+
+    @override_settings(QUERY_BUDGETS={'daily_dish:web_recipe_list': 1}, QUERY_BUDGET_STRICT=False)
+    def test_budget_warning(self):
+        with self.assertLogs('daily_dish.middleware', 'WARNING'):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(
+            'daily_dish_query_budget_exceeded_total{method="GET",view="daily_dish:web_recipe_list"} 1.0',
+            metrics.render_prometheus().decode()
+        )
+
+    def test_metrics_endpoint(self):
+        self.client.get(self.url)
+        url = reverse('daily_dish:internal_metrics')
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer wrong-token')
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer metrics-token')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE daily_dish_request_duration_seconds histogram', body)
+        self.assertIn('daily_dish_sql_queries_count{method="GET",view="daily_dish:web_recipe_list"} 1.0', body)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_endpoint_disabled_without_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer ')
+        response = self.client.get(reverse('daily_dish:internal_metrics'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
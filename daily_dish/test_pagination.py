@@ -0,0 +1,90 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, ApiKey
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class KeysetPaginationTest(APITestCase):
+    """一覧APIのページネーションテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        self.url = reverse('daily_dish:external_recipe_list')
+        
+        user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.recipes = [
+            Recipe.objects.create(
+                user=user, recipe_name=f'レシピ{i}',
+                ingredient_1='材料A', amount_1=Decimal('100.0'), unit_1='g'
+            )
+            for i in range(7)
+        ]
+        # created_atが同じ行でも順序が安定することを確認するため揃える
+        Recipe.objects.update(created_at=self.recipes[0].created_at)
+        self.expected = [recipe.id for recipe in reversed(self.recipes)]
+    
+    def test_cursor_pages(self):
+        """キーセット方式で全件を重複なく辿れるテスト"""
+        seen = []
+        response = self.client.get(self.url, {'cursor': '', 'page_size': 3})
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.json())
+            seen.extend(recipe['id'] for recipe in response.json()['results'])
+            if not response.json()['next']:
+                break
+            response = self.client.get(response.json()['next'])
+        
+        self.assertEqual(seen, self.expected)
+    
+    def test_cursor_skips_count_query(self):
+        """キーセット方式はCOUNT(*)もOFFSETも使わないテスト"""
+        first = self.client.get(self.url, {'cursor': '', 'page_size': 2})
+        
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(first.json()['next'])
+        recipe_queries = [q['sql'] for q in context.captured_queries if '"recipes"' in q['sql']]
+        self.assertEqual(len(recipe_queries), 1)
+        self.assertNotIn('COUNT', recipe_queries[0])
+        self.assertNotIn('OFFSET', recipe_queries[0])
+    
+    def test_invalid_cursor(self):
+        """不正なカーソルのテスト"""
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+    
+    def test_page_number_without_count(self):
+        """?count=false で件数を返さないテスト"""
+        response = self.client.get(self.url, {'count': 'false', 'page_size': 5, 'page': 2})
+        
+        self.assertNotIn('count', response.json())
+        self.assertEqual([r['id'] for r in response.json()['results']], self.expected[5:])
+        self.assertIsNone(response.json()['next'])
+        self.assertIsNotNone(response.json()['previous'])
+    
+    def test_page_size_cap(self):
+        """page_sizeの上限テスト"""
+        response = self.client.get(self.url, {'page_size': 1000})
+        self.assertEqual(response.json()['count'], 7)
+        self.assertEqual(len(response.json()['results']), 7)
+        
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(len(response.json()['results']), 2)
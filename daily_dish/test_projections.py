@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, ApiKey
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipeListProjectionTest(APITestCase):
+    """一覧APIの軽量な形式・?expand・?fieldsのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.token = login_response.data['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+        
+        self.recipe = Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g',
+            ingredient_2='卵', amount_2=Decimal('2.0'), unit_2='個'
+        )
+        CookedDish.objects.create(user=self.user, recipe=self.recipe)
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+    
+    def test_web_list_is_summary(self):
+        """一覧は材料数のみでワイドカラムを読み込まないテスト"""
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('daily_dish:web_recipe_list'))
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data['results'][0]
+        self.assertEqual(row['ingredient_count'], 2)
+        self.assertNotIn('ingredients', row)
+        self.assertNotIn('ingredient_1', row)
+        recipe_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "recipes"' in q['sql']]
+        self.assertTrue(recipe_queries)
+        self.assertFalse([sql for sql in recipe_queries if 'ingredient_1' in sql])
+    
+    def test_web_list_expand_and_fields(self):
+        response = self.client.get(reverse('daily_dish:web_recipe_list'), {'expand': 'ingredients'})
+        self.assertEqual(response.data['results'][0]['ingredients'], [
+            {'name': '鶏肉', 'amount': 200.0, 'unit': 'g'},
+            {'name': '卵', 'amount': 2.0, 'unit': '個'},
+        ])
+        
+        response = self.client.get(reverse('daily_dish:web_recipe_list'), {
+            'fields': 'id,recipe_name', 'expand': 'ingredients'
+        })
+        self.assertEqual(response.data['results'][0], {'id': self.recipe.id, 'recipe_name': '親子丼'})
+    
+    def test_detail_is_full(self):
+        """詳細APIは従来どおりすべてのフィールドを返すテスト"""
+        response = self.client.get(reverse('daily_dish:web_recipe_detail', kwargs={'pk': self.recipe.pk}))
+        self.assertEqual(response.data['ingredient_1'], '鶏肉')
+        self.assertEqual(len(response.data['ingredients']), 2)
+    
+    def test_cooked_dish_list_fields(self):
+        response = self.client.get(reverse('daily_dish:web_cooked_dish_list'), {
+            'fields': 'id,recipe_detail', 'expand': 'ingredients'
+        })
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'recipe_detail'})
+        self.assertEqual(row['recipe_detail']['ingredient_count'], 2)
+        self.assertEqual(len(row['recipe_detail']['ingredients']), 2)
+    
+    def test_external_list(self):
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        response = self.client.get(reverse('daily_dish:external_recipe_list'), {'fields': 'id,ingredient_count'})
+        self.assertEqual(response.json()['results'], [{'id': self.recipe.id, 'ingredient_count': 2}])
+        
+        response = self.client.get(reverse('daily_dish:external_ingredient_cache_list'), {'fields': 'id'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
@@ -0,0 +1,163 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+# URL名 -> 1リクエストあたりのクエリ数（件数・ページサイズによらず一定）
+# Web APIはJWT認証のユーザー取得（1クエリ）を含む
+WEB_ENDPOINTS = {
+    'web_recipe_list': 3,             # ユーザー + COUNT + 一覧
+    'web_cooked_dish_list': 3,        # ユーザー + COUNT + 一覧（レシピ・ユーザー名はJOIN）
+    'web_ingredient_cache_list': 3,   # ユーザー + COUNT + 一覧（ユーザー名はJOIN）
+}
+# ユーザーごとにキャッシュするエンドポイント（初回・データ変更後のクエリ数、キャッシュ済みなら0）
+WEB_CACHED_ENDPOINTS = {
+    'web_stats': 2,                   # ユーザー + カウンター
+    'web_recent_activities': 3,       # ユーザー + 料理履歴 + レシピ
+    'web_dashboard': 3,               # ユーザー + カウンター + 料理履歴
+}
+WEB_DETAIL_ENDPOINTS = {
+    'web_recipe_detail': ('recipe', 2),
+    'web_cooked_dish_detail': ('cooked', 2),
+    'web_ingredient_cache_detail': ('pantry', 2),
+}
+# 外部APIのAPI Keyはプロセス内にキャッシュ済み（ウォームアップで取得）
+EXTERNAL_ENDPOINTS = {
+    'external_recipe_list': 2,
+    'external_cooked_dish_list': 2,
+    'external_ingredient_cache_list': 2,
+    'external_recent_activities': 2,
+}
+EXTERNAL_DETAIL_ENDPOINTS = {
+    'external_recipe_detail': ('recipe', 1),
+    'external_cooked_dish_detail': ('cooked', 1),
+    'external_ingredient_cache_detail': ('pantry', 1),
+}
+
+
+@override_settings(CACHES=LOCMEM_CACHES, API_KEY_USAGE_FLUSH_INTERVAL=3600, QUERY_BUDGET_STRICT=True)
+class QueryCountTest(APITestCase):
+    """エンドポイントごとのクエリ数が件数・ページサイズによらず一定であることのテスト（N+1の検出）"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.token = login_response.data['access']
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.objects = {}
+        self.create_rows(2)
+
+    def create_rows(self, count):
+        """レシピ・料理履歴・食材キャッシュをcount件ずつ追加"""
+        for _ in range(count):
+            n = Recipe.objects.count()
+            recipe = Recipe.objects.create(
+                user=self.user, recipe_name=f'レシピ{n}', recipe_url=f'https://example.com/{n}',
+                ingredient_1='鶏肉', amount_1=Decimal('100.0'), unit_1='g',
+                ingredient_2='卵', amount_2=Decimal('2.0'), unit_2='個'
+            )
+            self.objects['recipe'] = recipe
+            self.objects['cooked'] = CookedDish.objects.create(user=self.user, recipe=recipe)
+            self.objects['pantry'] = IngredientCache.objects.create(
+                user=self.user, ingredient_name=f'食材{n}', amount=Decimal('1.5'), unit='個'
+            )
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK, url)
+        return len(ctx.captured_queries)
+
+    def use_jwt(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def use_api_key(self):
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        # API Keyをプロセス内キャッシュに載せる
+        self.client.get(reverse('daily_dish:external_stats'))
+
+    def assertConstantQueries(self, endpoints):
+        for name, expected in endpoints.items():
+            url = reverse(f'daily_dish:{name}')
+            with self.subTest(endpoint=name):
+                self.assertEqual(self.count_queries(url), expected)
+
+        self.create_rows(10)
+        for name, expected in endpoints.items():
+            url = reverse(f'daily_dish:{name}')
+            for params in ({}, {'page_size': 2}, {'page_size': 50}, {'cursor': ''}, {'expand': 'ingredients'}):
+                with self.subTest(endpoint=name, params=params):
+                    # キーセット方式はCOUNTを行わない
+                    expected_count = expected - 1 if 'cursor' in params and name.endswith('_list') else expected
+                    self.assertEqual(self.count_queries(url, params), expected_count)
+
+    def assertDetailQueries(self, endpoints):
+        for name, (key, expected) in endpoints.items():
+            url = reverse(f'daily_dish:{name}', kwargs={'pk': self.objects[key].pk})
+            with self.subTest(endpoint=name):
+                self.assertEqual(self.count_queries(url), expected)
+
+    def test_web_endpoints(self):
+        self.use_jwt()
+        self.assertConstantQueries(WEB_ENDPOINTS)
+
+    def test_web_cached_endpoints(self):
+        self.use_jwt()
+        for rows in (0, 10):
+            self.create_rows(rows)
+            for name, expected in WEB_CACHED_ENDPOINTS.items():
+                url = reverse(f'daily_dish:{name}')
+                with self.subTest(endpoint=name, rows=rows):
+                    self.assertEqual(self.count_queries(url), expected)
+                    self.assertEqual(self.count_queries(url), 0)
+
+    def test_web_detail_endpoints(self):
+        self.use_jwt()
+        self.assertDetailQueries(WEB_DETAIL_ENDPOINTS)
+
+    def test_external_endpoints(self):
+        self.use_api_key()
+        self.assertConstantQueries(EXTERNAL_ENDPOINTS)
+
+    def test_external_detail_endpoints(self):
+        self.use_api_key()
+        self.assertDetailQueries(EXTERNAL_DETAIL_ENDPOINTS)
+
+    def test_owner_check_does_not_load_user(self):
+        """他人のレシピへのアクセスはユーザーを読み込まずに拒否する"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpassword123')
+        recipe = Recipe.objects.create(
+            user=other, recipe_name='他人のレシピ',
+            ingredient_1='塩', amount_1=Decimal('1.0'), unit_1='g'
+        )
+        self.use_jwt()
+        response = self.client.post(reverse('daily_dish:web_cooked_dish_list'), {'recipe': recipe.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.post(
+                reverse('daily_dish:web_cooked_dish_list'), {'recipe': self.objects['recipe'].id}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        user_queries = [q['sql'] for q in ctx.captured_queries if 'FROM "users"' in q['sql']]
+        # JWT認証のユーザー取得のみ
+        self.assertEqual(len(user_queries), 1)
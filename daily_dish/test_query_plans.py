@@ -0,0 +1,139 @@
+import re
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+# 実行計画に出てはいけないパターン（ソート・全件スキャン）
+SQLITE_FORBIDDEN = [
+    re.compile(r'USE TEMP B-TREE FOR (ORDER BY|RIGHT PART OF ORDER BY)'),
+    re.compile(r'^SCAN \w+$'),
+]
+POSTGRES_FORBIDDEN = [
+    re.compile(r'\bSort\b'),
+    re.compile(r'\bSeq Scan on\b'),
+]
+
+
+def explain(sql):
+    """クエリの実行計画を行のリストで返す"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+        # 小さなテストデータでもインデックスを選ぶよう、シーケンシャルスキャンとソートを抑制
+        cursor.execute('SET LOCAL enable_seqscan = off')
+        cursor.execute('SET LOCAL enable_sort = off')
+        cursor.execute(f'EXPLAIN {sql}')
+        return [row[0] for row in cursor.fetchall()]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class QueryPlanTest(APITestCase):
+    """一覧APIのクエリがインデックスで処理されることのテスト（EXPLAIN）"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        other = User.objects.create_user(
+            username='other',
+            email='other@example.com',
+            password='testpassword123'
+        )
+        for owner in [self.user, other]:
+            for i in range(3):
+                recipe = Recipe.objects.create(
+                    user=owner, recipe_name=f'レシピ{i}',
+                    ingredient_1=f'材料{i}', amount_1=Decimal('100.0'), unit_1='g'
+                )
+                CookedDish.objects.create(user=owner, recipe=recipe)
+                IngredientCache.objects.create(
+                    user=owner, ingredient_name=f'材料{i}', amount=Decimal('1.0'), unit='個'
+                )
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+    
+    def login(self):
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+    
+    def assert_plans_use_indexes(self, url_name, params=None):
+        url = reverse(f'daily_dish:{url_name}')
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {})
+        self.assertEqual(response.status_code, 200, url)
+        
+        forbidden = SQLITE_FORBIDDEN if connection.vendor == 'sqlite' else POSTGRES_FORBIDDEN
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.startswith('SELECT'):
+                continue
+            for line in explain(sql):
+                for pattern in forbidden:
+                    self.assertIsNone(
+                        pattern.search(line.strip()),
+                        f'{url_name}: "{line.strip()}"\n{sql}'
+                    )
+    
+    def test_web_list_endpoints(self):
+        """Web APIの一覧・ダッシュボード"""
+        self.login()
+        for url_name in [
+            'web_recipe_list',
+            'web_cooked_dish_list',
+            'web_ingredient_cache_list',
+            'web_recent_activities',
+            'web_dashboard',
+        ]:
+            with self.subTest(url_name=url_name):
+                self.assert_plans_use_indexes(url_name)
+                self.assert_plans_use_indexes(url_name, {'cursor': '', 'page_size': 2})
+    
+    def test_recipe_search(self):
+        """レシピ検索（全文検索索引を使い、全件走査しない）"""
+        self.login()
+        self.assert_plans_use_indexes('web_recipe_list', {'search': '材料1'})
+        self.assert_plans_use_indexes('web_recipe_list', {'search': '材', 'cursor': ''})
+    
+    def test_recipe_search_short_word(self):
+        """2文字の検索語も検索索引で絞り込む（PostgreSQLはトークン配列のGINインデックス）"""
+        self.login()
+        self.assert_plans_use_indexes('web_recipe_list', {'search': '材料'})
+        
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(reverse('daily_dish:web_recipe_list'), {'search': '材料'})
+        sql = next(query['sql'] for query in context.captured_queries if 'recipe_search' in query['sql'])
+        plan = '\n'.join(explain(sql))
+        if connection.vendor == 'sqlite':
+            self.assertIn('VIRTUAL TABLE INDEX', plan)
+        else:
+            self.assertIn('Index Scan on recipe_search_tokens', plan)
+    
+    def test_external_list_endpoints(self):
+        """外部APIの一覧"""
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        for url_name in [
+            'external_recipe_list',
+            'external_cooked_dish_list',
+            'external_ingredient_cache_list',
+            'external_recent_activities',
+        ]:
+            with self.subTest(url_name=url_name):
+                self.assert_plans_use_indexes(url_name)
+                self.assert_plans_use_indexes(url_name, {'cursor': '', 'page_size': 2})
@@ -0,0 +1,152 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, RecipeIngredient
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipeIngredientSyncTest(TestCase):
+    """RecipeIngredient正規化テーブルのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        self.recipe = Recipe.objects.create(
+            user=self.user,
+            recipe_name='チキンカレー',
+            ingredient_1='鶏肉',
+            amount_1=Decimal('300.0'),
+            unit_1='g',
+            ingredient_2='玉ねぎ',
+            amount_2=None,  # 不完全な材料は同期しない
+            unit_2='個',
+            ingredient_3='カレールー',
+            amount_3=Decimal('1.0'),
+            unit_3='箱',
+        )
+    
+    def test_rows_created_on_save(self):
+        """保存時に完全な材料だけが同期されることのテスト"""
+        rows = list(
+            RecipeIngredient.objects.filter(recipe=self.recipe)
+            .order_by('position')
+            .values_list('position', 'name', 'unit')
+        )
+        self.assertEqual(rows, [(1, '鶏肉', 'g'), (3, 'カレールー', '箱')])
+    
+    def test_set_ingredients_replaces_rows(self):
+        """set_ingredients()後の保存で材料が置き換わることのテスト"""
+        self.recipe.set_ingredients([{'name': '豚肉', 'amount': 200.0, 'unit': 'g'}])
+        self.recipe.save()
+        
+        names = list(self.recipe.recipe_ingredients.values_list('name', flat=True))
+        self.assertEqual(names, ['豚肉'])
+    
+    def test_update_fields_without_ingredients_skips_sync(self):
+        """材料以外のupdate_fields指定では同期しないことのテスト"""
+        with CaptureQueriesContext(connection) as ctx:
+            self.recipe.recipe_name = '更新'
+            self.recipe.save(update_fields=['recipe_name'])
+        
+        # 変更フィードなどシグナル側のクエリは対象外
+        self.assertFalse([q for q in ctx.captured_queries if 'recipe_ingredients' in q['sql']])
+    
+    def test_dual_read_matches_wide_columns(self):
+        """正規化テーブルからの読み込み結果がワイドカラムと一致することのテスト"""
+        expected = self.recipe.get_ingredients()
+        recipe = Recipe.objects.with_ingredients().get(pk=self.recipe.pk)
+        
+        with self.assertNumQueries(0):
+            self.assertEqual(recipe.get_ingredients(), expected)
+    
+    def test_using_ingredient(self):
+        """材料名によるレシピ絞り込みのテスト"""
+        Recipe.objects.create(
+            user=self.user,
+            recipe_name='豚汁',
+            ingredient_1='豚肉',
+            amount_1=Decimal('100.0'),
+            unit_1='g',
+        )
+        
+        recipes = Recipe.objects.using_ingredient('鶏肉')
+        self.assertEqual(list(recipes), [self.recipe])
+    
+    def test_snapshot_maintained_on_save(self):
+        """保存時に材料スナップショットが更新されることのテスト"""
+        expected = [
+            {'name': '鶏肉', 'amount': 300.0, 'unit': 'g'},
+            {'name': 'カレールー', 'amount': 1.0, 'unit': '箱'},
+        ]
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.ingredients_snapshot, expected)
+        
+        self.recipe.set_ingredients([{'name': '豚肉', 'amount': Decimal('200.0'), 'unit': 'g'}])
+        self.recipe.save(update_fields=['ingredient_1', 'amount_1', 'unit_1',
+                                        'ingredient_3', 'amount_3', 'unit_3'])
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.ingredients_snapshot, [{'name': '豚肉', 'amount': 200.0, 'unit': 'g'}])
+    
+    def test_listing_reads_snapshot_only(self):
+        """listing()ではワイドカラムを読まずに材料を返すことのテスト"""
+        expected = self.recipe.get_ingredients()
+        
+        with CaptureQueriesContext(connection) as ctx:
+            recipe = Recipe.objects.listing().get(pk=self.recipe.pk)
+            self.assertEqual(recipe.get_ingredients(), expected)
+        
+        self.assertEqual(len(ctx.captured_queries), 1)
+        self.assertNotIn('ingredient_1', ctx.captured_queries[0]['sql'])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipeIngredientFilterAPITest(APITestCase):
+    """?ingredient= 絞り込みAPIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        
+        Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+        Recipe.objects.create(
+            user=self.user, recipe_name='豚汁',
+            ingredient_1='豚肉', amount_1=Decimal('100.0'), unit_1='g'
+        )
+    
+    def test_filter_by_ingredient(self):
+        """材料名で絞り込めることのテスト"""
+        url = reverse('daily_dish:web_recipe_list')
+        response = self.client.get(url, {'ingredient': '鶏肉'})
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [recipe['recipe_name'] for recipe in response.data['results']],
+            ['親子丼']
+        )
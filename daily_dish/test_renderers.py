@@ -0,0 +1,105 @@
+import datetime
+import io
+import uuid
+from decimal import Decimal
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+from . import parsers, renderers
+from .parsers import FastJSONParser
+from .renderers import FastJSONRenderer, NDJSONRenderer
+
+
+@override_settings(USE_TZ=True, TIME_ZONE='Asia/Tokyo')
+class FastJSONRendererTest(SimpleTestCase):
+    """FastJSONRendererがJSONRendererと同じバイト列を返すことのテスト"""
+
+    def assertParity(self, data, renderer_context=None):
+        expected = JSONRenderer().render(data, renderer_context=renderer_context)
+        self.assertEqual(FastJSONRenderer().render(data, renderer_context=renderer_context), expected)
+
+    def test_unicode_and_line_separators(self):
+        self.assertParity({'name': '鶏肉と玉ねぎ 😋', 'memo': 'a b c', 'ctrl': '\x00\t"\\'})
+
+    def test_datetimes(self):
+        jst = datetime.timezone(datetime.timedelta(hours=9))
+        self.assertParity({
+            'aware': datetime.datetime(2024, 5, 1, 12, 30, tzinfo=jst),
+            'utc': datetime.datetime(2024, 5, 1, 3, 30, tzinfo=datetime.timezone.utc),
+            'naive': datetime.datetime(2024, 5, 1, 12, 30),
+            'micro': datetime.datetime(2024, 5, 1, 12, 30, 0, 123456, tzinfo=jst),
+            'date': datetime.date(2024, 5, 1),
+            'time': datetime.time(8, 15, 0, 500),
+            'delta': datetime.timedelta(minutes=90),
+        })
+
+    def test_drf_encoder_types(self):
+        self.assertParity({
+            'amount': Decimal('1.50'),
+            'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+            'lazy': gettext_lazy('This field is required.'),
+            'set': {1},
+            'bytes': b'abc',
+        })
+
+    def test_containers_and_keys(self):
+        self.assertParity(ReturnDict({'results': ReturnList([{'id': 1}, (2, 3)], serializer=None)}, serializer=None))
+        self.assertParity({1: 'one', 'nested': {2: [True, False, None]}})
+        self.assertParity([])
+
+    def test_numbers(self):
+        self.assertParity([0, -1, 2 ** 63 - 1, 2 ** 70, 0.1, 1.5, 1e16, 1e-7, 123456789.123, -0.0])
+
+    def test_indent_falls_back(self):
+        context = {'indent': 2}
+        self.assertParity({'a': [1, 2]}, renderer_context=context)
+        self.assertIn(b'\n  ', FastJSONRenderer().render({'a': 1}, renderer_context=context))
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+    def test_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertIsNone(renderers.fast_dumps({'a': 1}))
+            self.assertEqual(FastJSONRenderer().render({'a': '卵'}), JSONRenderer().render({'a': '卵'}))
+            self.assertEqual(NDJSONRenderer().render({'a': Decimal('2')}), b'{"a":2.0}\n')
+
+    def test_ndjson_line(self):
+        self.assertEqual(NDJSONRenderer().render({'name': '塩', 'n': 1}), '{"name":"塩","n":1}\n'.encode())
+
+
+class FastJSONParserTest(SimpleTestCase):
+    """FastJSONParserがJSONParserと同じ結果を返すことのテスト"""
+
+    def parse(self, parser, body, **context):
+        return parser.parse(io.BytesIO(body), parser_context=context)
+
+    def test_parity(self):
+        body = '{"recipe_name":"肉じゃが","ingredients":[{"name":"じゃがいも","amount":2.5,"unit":"個"}],"n":null}'.encode()
+        self.assertEqual(self.parse(FastJSONParser(), body), self.parse(JSONParser(), body))
+
+    def test_big_int_falls_back(self):
+        for n in (2 ** 64, -(2 ** 63) - 1, 123456789012345678901234567890):
+            body = b'{"n": %d}' % n
+            self.assertEqual(self.parse(FastJSONParser(), body), {'n': n})
+
+    def test_invalid_json_keeps_drf_error(self):
+        with self.assertRaises(ParseError) as stock:
+            self.parse(JSONParser(), b'{"a": ')
+        with self.assertRaises(ParseError) as fast:
+            self.parse(FastJSONParser(), b'{"a": ')
+        self.assertEqual(str(fast.exception.detail), str(stock.exception.detail))
+
+    def test_non_utf8_encoding(self):
+        body = '{"name":"卵"}'.encode('shift_jis')
+        self.assertEqual(self.parse(FastJSONParser(), body, encoding='shift_jis'), {'name': '卵'})
+
+    def test_without_orjson(self):
+        with mock.patch.object(parsers, 'orjson', None):
+            self.assertEqual(self.parse(FastJSONParser(), '{"a":"塩"}'.encode()), {'a': '塩'})
@@ -0,0 +1,141 @@
+import gzip
+import unittest
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory, APITestCase
+from rest_framework import status
+
+from .models import Recipe, ApiKey
+from .renderers import FastJSONRenderer
+from .services import conditional, response_cache
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES, API_KEY_USAGE_FLUSH_INTERVAL=3600)
+class ResponseCacheTest(APITestCase):
+    """外部APIのレスポンスキャッシュのテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        for i in range(3):
+            self.create_recipe(f'レシピ{i}')
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        # API Keyをプロセス内キャッシュに載せる
+        self.client.get(reverse('daily_dish:external_stats'))
+
+    def create_recipe(self, name):
+        return Recipe.objects.create(
+            user=self.user, recipe_name=name,
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+
+    def test_serves_stored_bytes(self):
+        for name in ('external_recipe_list', 'external_recent_activities', 'external_stats'):
+            with self.subTest(endpoint=name):
+                url = reverse(f'daily_dish:{name}')
+                first = self.client.get(url)
+                with self.assertNumQueries(0):
+                    second = self.client.get(url)
+                self.assertEqual(second.status_code, status.HTTP_200_OK)
+                self.assertEqual(second.content, first.content)
+                self.assertEqual(second['Content-Type'], 'application/json')
+                self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_cached_body(self):
+        """キャッシュから返した本文が元のレスポンスと同じ内容になるテスト"""
+        stats_url = reverse('daily_dish:external_stats')
+        stats = self.client.get(stats_url).json()
+        self.assertEqual(stats['total_recipes'], 3)
+        self.assertEqual(stats['total_users'], 1)
+
+        url = reverse('daily_dish:external_recipe_list')
+        self.client.get(url)
+        results = self.client.get(url).json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertEqual({result['recipe_name'] for result in results}, {'レシピ0', 'レシピ1', 'レシピ2'})
+
+    def test_gzip_variant(self):
+        url = reverse('daily_dish:external_recipe_list')
+        identity = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), identity)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        # 圧縮した変種は弱いETag（If-None-Match は弱い比較で一致する）
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @unittest.skipIf(response_cache.brotli is None, 'brotli is not installed')
+    def test_brotli_variant(self):
+        url = reverse('daily_dish:external_recipe_list')
+        identity = self.client.get(url).content
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(response_cache.brotli.decompress(response.content), identity)
+
+    def test_small_body_is_not_compressed(self):
+        response = self.client.get(reverse('daily_dish:external_stats'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_invalidated_by_writes(self):
+        url = reverse('daily_dish:external_recipe_list')
+        self.assertEqual(self.client.get(url).json()['count'], 3)
+        self.create_recipe('レシピ3')
+        self.assertEqual(self.client.get(url).json()['count'], 4)
+
+    def test_uncached_params(self):
+        url = reverse('daily_dish:external_recipe_list')
+        self.client.get(url, {'ordering': 'id'})
+        with self.assertNumQueries(2):
+            self.client.get(url, {'ordering': 'id'})
+
+    def test_errors_are_not_cached(self):
+        url = reverse('daily_dish:external_recipe_list')
+        self.assertEqual(self.client.get(url, {'page': 9}).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(url, {'page': 9}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RespondTest(SimpleTestCase):
+    """respond() の単体テスト"""
+
+    def setUp(self):
+        cache.clear()
+        request = Request(APIRequestFactory().get('/api/external/stats/'))
+        request.accepted_renderer = FastJSONRenderer()
+        request.accepted_media_type = 'application/json'
+        self.request = request
+        self.built = []
+
+    def build(self):
+        self.built.append(1)
+        return Response({'total_recipes': len(self.built)})
+
+    def respond(self):
+        return response_cache.respond(self.request, (conditional.RECIPES,), self.build)
+
+    def test_builds_once(self):
+        self.assertEqual(self.respond().content, b'{"total_recipes":1}')
+        self.assertEqual(self.respond().content, b'{"total_recipes":1}')
+        self.assertEqual(len(self.built), 1)
+
+    def test_accepted_encodings(self):
+        self.assertEqual(response_cache.accepted_encodings('gzip;q=0, br ; q=0.5, identity'), {'br', 'identity'})
+        self.assertEqual(response_cache.accepted_encodings(''), set())
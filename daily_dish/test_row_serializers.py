@@ -0,0 +1,172 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, APITestCase
+
+from .models import Recipe, CookedDish, IngredientCache, ApiKey, COOKED_DISH_LISTING_FIELDS
+from .serializers import (
+    SparseFieldsetMixin, RecipeSummarySerializer, CookedDishSerializer, IngredientCacheSerializer,
+    ExternalRecipeSerializer, ExternalRecipeSummarySerializer,
+    ExternalCookedDishSerializer, ExternalIngredientCacheSerializer
+)
+from .row_serializers import (
+    RecipeSummaryRowSerializer, CookedDishRowSerializer, IngredientCacheRowSerializer,
+    ExternalRecipeRowSerializer, ExternalRecipeSummaryRowSerializer,
+    ExternalCookedDishRowSerializer, ExternalIngredientCacheRowSerializer
+)
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+# (DRFのシリアライザー, 行シリアライザー, クエリセット)
+PAIRS = [
+    (RecipeSummarySerializer, RecipeSummaryRowSerializer,
+     lambda: Recipe.objects.listing().order_by('-created_at', '-id')),
+    (CookedDishSerializer, CookedDishRowSerializer,
+     lambda: CookedDish.objects.select_related('recipe', 'user').only(
+         *COOKED_DISH_LISTING_FIELDS, 'user__username'
+     ).order_by('-created_at', '-id')),
+    (IngredientCacheSerializer, IngredientCacheRowSerializer,
+     lambda: IngredientCache.objects.select_related('user').order_by('-created_at', '-id')),
+    (ExternalRecipeSerializer, ExternalRecipeRowSerializer,
+     lambda: Recipe.objects.listing().order_by('id')),
+    (ExternalRecipeSummarySerializer, ExternalRecipeSummaryRowSerializer,
+     lambda: Recipe.objects.listing().order_by('-created_at', '-id')),
+    (ExternalCookedDishSerializer, ExternalCookedDishRowSerializer,
+     lambda: CookedDish.objects.select_related('recipe').order_by('-created_at', '-id')),
+    (ExternalIngredientCacheSerializer, ExternalIngredientCacheRowSerializer,
+     lambda: IngredientCache.objects.order_by('-created_at', '-id')),
+]
+
+QUERY_VARIANTS = [
+    {},
+    {'expand': 'ingredients'},
+    {'fields': 'id,recipe_name'},
+    {'fields': 'id,recipe_detail,ingredients', 'expand': 'ingredients'},
+    {'fields': 'ingredients', 'expand': 'ingredients'},
+    {'fields': 'amount,unknown'},
+]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RowSerializerParityTest(APITestCase):
+    """行シリアライザーがDRFのシリアライザーと同じJSONを返すことのテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='山田', email='yamada@example.com', password='testpassword123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='testpassword123')
+
+        self.recipes = [
+            Recipe.objects.create(
+                user=self.user, recipe_name='親子丼 "特製"', recipe_url='https://example.com/oyakodon',
+                ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g',
+                ingredient_2='卵', amount_2=Decimal('0.5'), unit_2='個',
+                ingredient_3='醤油', amount_3=Decimal('123456789.1'), unit_3='ml'
+            ),
+            Recipe.objects.create(
+                user=self.other, recipe_name='味噌汁 ',
+                ingredient_1='味噌', amount_1=Decimal('1'), unit_1='大さじ'
+            ),
+        ]
+        for recipe in self.recipes:
+            CookedDish.objects.create(user=recipe.user, recipe=recipe)
+        IngredientCache.objects.create(user=self.user, ingredient_name='玉ねぎ', amount=Decimal('2.5'), unit='個')
+        IngredientCache.objects.create(user=self.other, ingredient_name='塩', amount=Decimal('1000'), unit='g')
+        IngredientCache.objects.filter(ingredient_name='塩').update(ingredient=None)
+
+    def request(self, params):
+        return Request(APIRequestFactory().get('/', params))
+
+    def assertParity(self, serializer_class, row_serializer_class, queryset, params):
+        request = self.request(params)
+        expected = serializer_class(queryset, many=True, context={'request': request}).data
+        row_serializer = row_serializer_class.from_request(request)
+        actual = row_serializer.many(queryset.values(*row_serializer.columns))
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_parity(self):
+        for serializer_class, row_serializer_class, queryset in PAIRS:
+            # ?fields= / ?expand= は一覧用（SparseFieldsetMixin）のシリアライザーのみ
+            variants = QUERY_VARIANTS if issubclass(serializer_class, SparseFieldsetMixin) else [{}]
+            for params in variants:
+                with self.subTest(serializer=serializer_class.__name__, params=params):
+                    self.assertParity(serializer_class, row_serializer_class, queryset(), params)
+
+    def test_parity_in_other_timezone(self):
+        """UTCでは 'Z' 表記になる"""
+        for serializer_class, row_serializer_class, queryset in PAIRS:
+            with self.subTest(serializer=serializer_class.__name__), timezone.override('UTC'):
+                self.assertParity(serializer_class, row_serializer_class, queryset(), {})
+
+    @override_settings(REST_FRAMEWORK={'COERCE_DECIMAL_TO_STRING': False})
+    def test_parity_with_decimal_setting(self):
+        self.assertParity(IngredientCacheSerializer, IngredientCacheRowSerializer, PAIRS[2][2](), {})
+
+    def test_single_query(self):
+        """ネストしたレシピ・ユーザー名も1クエリで取得する"""
+        row_serializer = CookedDishRowSerializer(expand={'ingredients'})
+        with self.assertNumQueries(1):
+            rows = row_serializer.many(CookedDish.objects.values(*row_serializer.columns))
+        self.assertEqual(len(rows), 2)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RowListViewTest(APITestCase):
+    """一覧APIが行シリアライザーで従来と同じレスポンスを返すことのテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', email='test@example.com', password='testpassword123')
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        for i in range(3):
+            recipe = Recipe.objects.create(
+                user=self.user, recipe_name=f'レシピ{i}',
+                ingredient_1='鶏肉', amount_1=Decimal('100.0'), unit_1='g'
+            )
+            CookedDish.objects.create(user=self.user, recipe=recipe)
+        IngredientCache.objects.create(user=self.user, ingredient_name='卵', amount=Decimal('6'), unit='個')
+
+    def test_web_cooked_dish_list(self):
+        params = {'expand': 'ingredients'}
+        response = self.client.get(reverse('daily_dish:web_cooked_dish_list'), params)
+        queryset = CookedDish.objects.filter(user=self.user).order_by('-created_at', '-id')
+        request = Request(APIRequestFactory().get('/', params))
+        expected = CookedDishSerializer(queryset, many=True, context={'request': request}).data
+        self.assertEqual(JSONRenderer().render(response.data['results']), JSONRenderer().render(expected))
+        self.assertEqual(response.data['count'], 3)
+
+    def test_cursor_pagination(self):
+        url = reverse('daily_dish:web_recipe_list')
+        response = self.client.get(url, {'cursor': '', 'page_size': 2})
+        self.assertEqual([row['recipe_name'] for row in response.data['results']], ['レシピ2', 'レシピ1'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['recipe_name'] for row in response.data['results']], ['レシピ0'])
+        self.assertIsNone(response.data['next'])
+
+    def test_web_ingredient_cache_list(self):
+        response = self.client.get(reverse('daily_dish:web_ingredient_cache_list'))
+        row = response.data['results'][0]
+        self.assertEqual(row['user'], 'testuser')
+        self.assertEqual(row['amount'], '6.0')
+
+    def test_create_still_validates(self):
+        response = self.client.post(reverse('daily_dish:web_recipe_list'), {'recipe_name': '材料なし'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_external_list(self):
+        ApiKey.objects.create(key_name='テスト用API Key', api_key='test-api-key-12345')
+        self.client.credentials(HTTP_X_API_KEY='test-api-key-12345')
+        response = self.client.get(reverse('daily_dish:external_cooked_dish_list'))
+        self.assertEqual([row['recipe_name'] for row in response.json()['results']], ['レシピ2', 'レシピ1', 'レシピ0'])
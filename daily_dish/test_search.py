@@ -0,0 +1,99 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe
+from .services import search
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+class BigramTest(SimpleTestCase):
+    """正規化とbigram分割のテスト"""
+    
+    def test_normalize(self):
+        self.assertEqual(search.normalize('ﾁｷﾝカレー'), 'ちきんかれー')
+        self.assertEqual(search.normalize('ＴＯＦＵ'), 'tofu')
+    
+    def test_bigrams(self):
+        self.assertEqual(search.bigrams('鶏肉'), ['鶏肉', '肉'])
+        self.assertEqual(search.bigrams('卵'), ['卵'])
+        self.assertEqual(search.bigrams('・'), [])
+    
+    def test_search_tokens(self):
+        self.assertEqual(search.search_tokens(['鶏肉', 'とり肉']), ['と', 'とり', 'り', 'り肉', '肉', '鶏', '鶏肉'])
+        self.assertEqual(search.search_tokens(['・']), [])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class RecipeSearchAPITest(APITestCase):
+    """レシピ検索APIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.url = reverse('daily_dish:web_recipe_list')
+        
+        self.curry = Recipe.objects.create(
+            user=self.user, recipe_name='チキンカレー',
+            ingredient_1='鶏肉', amount_1=Decimal('300.0'), unit_1='g',
+            ingredient_2='玉ねぎ', amount_2=Decimal('1.0'), unit_2='個'
+        )
+        self.omelette = Recipe.objects.create(
+            user=self.user, recipe_name='オムレツ',
+            ingredient_1='卵', amount_1=Decimal('2.0'), unit_1='個'
+        )
+    
+    def search(self, query):
+        response = self.client.get(self.url, {'search': query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [recipe['recipe_name'] for recipe in response.data['results']]
+    
+    def test_search_by_name(self):
+        """レシピ名の部分一致（カタカナ/ひらがな・半角を区別しない）"""
+        self.assertEqual(self.search('カレー'), ['チキンカレー'])
+        self.assertEqual(self.search('かれー'), ['チキンカレー'])
+        self.assertEqual(self.search('ﾁｷﾝ'), ['チキンカレー'])
+    
+    def test_search_by_ingredient(self):
+        """材料名での検索"""
+        self.assertEqual(self.search('玉ねぎ'), ['チキンカレー'])
+        self.assertEqual(self.search('卵'), ['オムレツ'])
+        self.assertEqual(self.search('鶏肉 玉ねぎ'), ['チキンカレー'])
+        self.assertEqual(self.search('鶏肉 卵'), [])
+    
+    def test_index_follows_updates(self):
+        """更新・削除が索引に反映されるテスト"""
+        self.omelette.recipe_name = 'スパニッシュオムレツ'
+        self.omelette.ingredient_2 = 'じゃがいも'
+        self.omelette.amount_2 = Decimal('1.0')
+        self.omelette.unit_2 = '個'
+        self.omelette.save()
+        self.assertEqual(self.search('じゃがいも'), ['スパニッシュオムレツ'])
+        
+        self.omelette.delete()
+        self.assertEqual(self.search('じゃがいも'), [])
+    
+    def test_other_users_recipes_are_excluded(self):
+        """他ユーザーのレシピは検索されないテスト"""
+        other = User.objects.create_user(username='other', email='other@example.com', password='pass12345')
+        Recipe.objects.create(
+            user=other, recipe_name='ビーフカレー',
+            ingredient_1='牛肉', amount_1=Decimal('300.0'), unit_1='g'
+        )
+        self.assertEqual(self.search('カレー'), ['チキンカレー'])
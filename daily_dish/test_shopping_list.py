@@ -0,0 +1,116 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, IngredientCache
+from .services import shopping_list
+from .services.cache_versions import get_version
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ShoppingListAPITest(APITestCase):
+    """買い物リストAPIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.url = reverse('daily_dish:web_shopping_list')
+        
+        self.curry = Recipe.objects.create(
+            user=self.user, recipe_name='チキンカレー',
+            ingredient_1='鶏肉', amount_1=Decimal('300.0'), unit_1='g',
+            ingredient_2='醤油', amount_2=Decimal('1.0'), unit_2='大さじ',
+        )
+        self.teriyaki = Recipe.objects.create(
+            user=self.user, recipe_name='照り焼き',
+            ingredient_1='鶏肉', amount_1=Decimal('0.2'), unit_1='kg',
+            ingredient_2='醤油', amount_2=Decimal('12.0'), unit_2='g',
+        )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='鶏肉', amount=Decimal('250.0'), unit='g'
+        )
+    
+    def test_aggregate_with_multiplier_minus_pantry(self):
+        """倍率付きで合算し、手持ち食材を差し引くテスト"""
+        response = self.client.post(self.url, {
+            'recipes': [{'id': self.curry.id, 'multiplier': 2}, {'id': self.teriyaki.id}]
+        }, format='json')
+        
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        items = {item['name']: item for item in response.data['items']}
+        # 鶏肉: 300g×2 + 200g - 手持ち250g
+        self.assertEqual(items['鶏肉']['amount'], 550.0)
+        self.assertEqual(items['鶏肉']['unit'], 'g')
+        self.assertEqual(items['鶏肉']['pantry_amount'], 250.0)
+        # 醤油: 大さじ1(18g)×2 + 12g
+        self.assertEqual(items['醤油']['amount'], 48.0)
+    
+    def test_cached_until_pantry_changes(self):
+        """同じリストはキャッシュから返し、手持ち食材の変更で再計算するテスト"""
+        body = {'recipes': [{'id': self.curry.id}]}
+        self.client.post(self.url, body, format='json')
+        
+        with self.assertNumQueries(1):  # 認証のみ
+            self.client.post(self.url, body, format='json')
+        
+        IngredientCache.objects.filter(ingredient_name='鶏肉').update(amount=Decimal('0.0'))
+        IngredientCache.objects.get(ingredient_name='鶏肉').save()
+        response = self.client.post(self.url, body, format='json')
+        items = {item['name']: item for item in response.data['items']}
+        self.assertEqual(items['鶏肉']['amount'], 300.0)
+    
+    def test_versions_bumped_again_on_commit(self):
+        """コミット前のデータで作ったリストが新しいバージョンで残らないよう、コミット後にも進める"""
+        scopes = (shopping_list.RECIPES_VERSION, shopping_list.PANTRY_VERSION)
+        before = [get_version(scope, self.user.id) for scope in scopes]
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.curry.save()
+                IngredientCache.objects.get(ingredient_name='鶏肉').save()
+                self.assertEqual([get_version(scope, self.user.id) for scope in scopes], [v + 1 for v in before])
+        self.assertEqual([get_version(scope, self.user.id) for scope in scopes], [v + 2 for v in before])
+    
+    def test_covered_and_not_found(self):
+        """手持ちで足りる材料と存在しないレシピIDのテスト"""
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='醤油', amount=Decimal('100.0'), unit='ml'
+        )
+        response = self.client.post(self.url, {
+            'recipes': [{'id': self.teriyaki.id}, {'id': 9999}]
+        }, format='json')
+        
+        self.assertEqual(response.data['covered'], ['鶏肉', '醤油'])
+        self.assertEqual(response.data['items'], [])
+        self.assertEqual(response.data['not_found_ids'], [9999])
+    
+    def test_validation(self):
+        """不正な入力のテスト"""
+        response = self.client.post(self.url, {'recipes': [{'id': 'x'}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        # 無限大・非数（丸めで OverflowError / ValueError になる）
+        for multiplier in ('"inf"', '"-inf"', '"nan"', '1e400'):
+            body = '{"recipes": [{"id": %d, "multiplier": %s}]}' % (self.curry.id, multiplier)
+            response = self.client.post(self.url, body, content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        
+        response = self.client.post(self.url, {'recipes': [{'id': 9999}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
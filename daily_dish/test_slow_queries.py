@@ -0,0 +1,75 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe
+from .services import slow_queries
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SlowQueryLogTest(APITestCase):
+    """スロークエリログ（実行計画・呼び出し元付き）のテスト"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        Recipe.objects.create(
+            user=self.user, recipe_name='親子丼',
+            ingredient_1='鶏肉', amount_1=Decimal('200.0'), unit_1='g'
+        )
+
+    def get_entries(self, method, url, data=None):
+        # しきい値0ですべてのクエリを記録
+        with self.settings(SLOW_QUERY_THRESHOLD_MS=0), self.assertLogs('daily_dish.slow_queries', 'WARNING') as logs:
+            response = getattr(self.client, method)(url, data, format='json')
+        self.assertLess(response.status_code, 400)
+        return [json.loads(record.getMessage()) for record in logs.records]
+
+    def test_logs_select_with_plan(self):
+        entries = self.get_entries('get', reverse('daily_dish:web_recipe_list'))
+        entry = next(e for e in entries if 'FROM "recipes"' in e['sql'] and 'COUNT' not in e['sql'])
+
+        self.assertEqual(entry['view'], 'daily_dish:web_recipe_list')
+        self.assertEqual(entry['method'], 'GET')
+        self.assertEqual(entry['params_count'], 1)
+        self.assertTrue(entry['plan'])
+        self.assertIn('recipes', json.dumps(entry['plan']))
+        self.assertTrue(any(frame.startswith('daily_dish/row_serializers.py') for frame in entry['stack']))
+        self.assertFalse([frame for frame in entry['stack'] if frame.startswith('daily_dish/middleware.py')])
+
+    def test_writes_are_not_explained(self):
+        recipe = Recipe.objects.get()
+        entries = self.get_entries('post', reverse('daily_dish:web_cooked_dish_list'), {'recipe': recipe.id})
+        inserts = [e for e in entries if e['sql'].startswith('INSERT')]
+        self.assertTrue(inserts)
+        self.assertTrue(all(e['plan'] is None for e in inserts))
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=None)
+    def test_disabled(self):
+        with self.assertNoLogs('daily_dish.slow_queries', 'WARNING'):
+            response = self.client.get(reverse('daily_dish:web_recipe_list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_explain_failure_keeps_transaction(self):
+        with transaction.atomic():
+            self.assertIsNone(slow_queries.explain(connection, 'SELECT * FROM missing_table', []))
+            self.assertEqual(Recipe.objects.count(), 1)
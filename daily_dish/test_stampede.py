@@ -0,0 +1,99 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from .services import stampede
+from .testing import LOCMEM_CACHES
+
+
+@override_settings(CACHES=LOCMEM_CACHES, CACHE_LOCK_WAIT=0.5, CACHE_EARLY_REFRESH_BETA=1.0)
+class GetOrComputeTest(SimpleTestCase):
+    """get_or_compute（single-flight・古い値の返却・期限前の作り直し）のテスト"""
+
+    key = 'stats:global'
+    lock_key = 'stats:global:lock'
+
+    def setUp(self):
+        cache.clear()
+        self.computed = []
+
+    def compute(self):
+        self.computed.append(1)
+        return len(self.computed)
+
+    def get(self):
+        return stampede.get_or_compute(self.key, self.compute, 60)
+
+    def expire(self):
+        """論理的な有効期限を過ぎた状態にする（古い値としては残っている）"""
+        value, expires_at, delta = cache.get(self.key)
+        cache.set(self.key, (value, expires_at - 120, delta))
+
+    def test_computes_once(self):
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.get(), 1)
+        self.assertEqual(self.computed, [1])
+        self.assertIsNone(cache.get(self.lock_key))
+
+    def test_none_is_not_stored(self):
+        self.assertIsNone(stampede.get_or_compute(self.key, lambda: None, 60))
+        self.assertIsNone(cache.get(self.key))
+
+    def test_expired_value_is_recomputed(self):
+        self.get()
+        self.expire()
+        self.assertEqual(self.get(), 2)
+        self.assertEqual(self.get(), 2)
+
+    def test_serves_stale_while_refreshing(self):
+        self.get()
+        self.expire()
+        cache.add(self.lock_key, 'other-request')
+        with mock.patch.object(stampede.time, 'sleep') as sleep:
+            self.assertEqual(self.get(), 1)
+        # 待たずに古い値を返す
+        sleep.assert_not_called()
+        self.assertEqual(self.computed, [1])
+
+    def test_early_refresh(self):
+        stampede.store(self.key, 1, 60, delta=10.0)
+        self.computed.append(1)
+        # random() が1に近いほど -log(1 - random()) が大きくなり、期限前でも作り直す
+        with mock.patch.object(stampede.random, 'random', return_value=0.0):
+            self.assertEqual(self.get(), 1)
+        with mock.patch.object(stampede.random, 'random', return_value=1 - 1e-12):
+            self.assertEqual(self.get(), 2)
+
+    @override_settings(CACHE_EARLY_REFRESH_BETA=0)
+    def test_early_refresh_disabled(self):
+        stampede.store(self.key, 1, 60, delta=10.0)
+        with mock.patch.object(stampede.random, 'random', return_value=1 - 1e-12):
+            self.assertEqual(self.get(), 1)
+        self.assertEqual(self.computed, [])
+
+    def test_waits_for_computation_in_progress(self):
+        cache.add(self.lock_key, 'other-request')
+        with mock.patch.object(stampede.time, 'sleep', side_effect=lambda seconds: stampede.store(self.key, 0, 60)):
+            self.assertEqual(self.get(), 0)
+        self.assertEqual(self.computed, [])
+
+    def test_computes_when_lock_released_without_value(self):
+        cache.add(self.lock_key, 'other-request')
+        with mock.patch.object(stampede.time, 'sleep', side_effect=lambda seconds: cache.delete(self.lock_key)):
+            self.assertEqual(self.get(), 1)
+        self.assertEqual(cache.get(self.key)[0], 1)
+
+    def test_gives_up_waiting(self):
+        cache.add(self.lock_key, 'other-request')
+        with mock.patch.object(stampede, 'POLL_INTERVAL', 0.2):
+            self.assertEqual(self.get(), 1)
+        self.assertEqual(cache.get(self.lock_key), 'other-request')
+
+    def test_lock_released_on_error(self):
+        def fail():
+            raise RuntimeError('boom')
+
+        with self.assertRaises(RuntimeError):
+            stampede.get_or_compute(self.key, fail, 60)
+        self.assertIsNone(cache.get(self.lock_key))
@@ -0,0 +1,93 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from rest_framework import status
+
+from .models import Recipe, IngredientCache
+from .testing import LOCMEM_CACHES
+
+User = get_user_model()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class IngredientSuggestAPITest(APITestCase):
+    """食材名の入力補完APIのテスト"""
+    
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='testuser',
+            email='test@example.com',
+            password='testpassword123'
+        )
+        login_response = self.client.post(reverse('daily_dish:web_login'), {
+            'username': 'testuser',
+            'password': 'testpassword123'
+        })
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {login_response.data['access']}")
+        self.url = reverse('daily_dish:web_ingredient_suggest')
+        
+        for name in ['親子丼', '唐揚げ']:
+            Recipe.objects.create(
+                user=self.user, recipe_name=name,
+                ingredient_1='とり肉', amount_1=Decimal('200.0'), unit_1='g',
+                ingredient_2='トマト', amount_2=Decimal('1.0'), unit_2='個'
+            )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='鶏もも肉', amount=Decimal('300.0'), unit='g'
+        )
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='とうふ', amount=Decimal('1.0'), unit='丁'
+        )
+    
+    def suggest(self, q, **params):
+        response = self.client.get(self.url, {'q': q, **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+    
+    def test_prefix_ranked_by_frequency(self):
+        """前方一致（カタカナ/ひらがなを区別しない）を使用回数順に返すテスト"""
+        self.assertEqual(self.suggest('と'), [
+            {'name': 'トマト', 'count': 2},
+            {'name': 'とり肉', 'count': 2},
+            {'name': 'とうふ', 'count': 1},
+        ])
+        self.assertEqual(self.suggest('トリ', limit=1), [{'name': 'とり肉', 'count': 2}])
+        self.assertEqual(self.suggest('鶏'), [{'name': '鶏もも肉', 'count': 1}])
+        self.assertEqual(self.suggest(''), [])
+    
+    def test_repeated_requests_do_not_hit_database(self):
+        """2回目以降はDBにアクセスしないテスト"""
+        self.suggest('と')
+        
+        with CaptureQueriesContext(connection) as ctx:
+            self.suggest('とう')
+        self.assertEqual(ctx.captured_queries, [])
+    
+    def test_rebuilt_after_changes(self):
+        """レシピ・手持ち食材の変更後は再構築されるテスト"""
+        self.suggest('と')
+        IngredientCache.objects.create(
+            user=self.user, ingredient_name='豆乳', amount=Decimal('1.0'), unit='本'
+        )
+        self.assertEqual(self.suggest('豆'), [{'name': '豆乳', 'count': 1}])
+    
+    def test_deactivated_user_is_rejected(self):
+        """無効化・削除したユーザーはトークンが有効でも拒否されるテスト"""
+        self.suggest('と')
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, {'q': 'と'}).status_code, status.HTTP_401_UNAUTHORIZED)
+        
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url, {'q': 'と'}).status_code, status.HTTP_401_UNAUTHORIZED)
+    
+    def test_invalid_limit(self):
+        response = self.client.get(self.url, {'q': 'と', 'limit': 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
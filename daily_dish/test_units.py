@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from .services import units
+
+
+class UnitConversionTest(SimpleTestCase):
+    """単位換算エンジンのテスト"""
+    
+    def test_normalize_unit(self):
+        """全角・大文字・表記ゆれの正規化テスト"""
+        self.assertEqual(units.normalize_unit('ｇ'), 'g')
+        self.assertEqual(units.normalize_unit('KG'), 'kg')
+        self.assertEqual(units.normalize_unit(' 大匙 '), '大さじ')
+        self.assertEqual(units.normalize_unit('ｍｌ'), 'ml')
+    
+    def test_mass_and_volume(self):
+        """質量・体積の固定小数点換算テスト"""
+        self.assertEqual(units.to_fixed(Decimal('1.5'), 'kg'), (units.MASS, 15000000))
+        self.assertEqual(units.to_fixed(2, '大さじ'), (units.VOLUME, 300000))
+        self.assertEqual(units.to_fixed(1.0, 'カップ'), (units.VOLUME, 2000000))
+    
+    def test_density_override(self):
+        """密度が登録された食材は体積を質量に換算するテスト"""
+        # 醤油 大さじ1 = 18g
+        self.assertEqual(units.to_fixed(1, '大さじ', '醤油'), (units.MASS, 180000))
+        # 密度不明の食材は体積のまま
+        self.assertEqual(units.to_fixed(1, '大さじ', 'ナンプラー'), (units.VOLUME, 150000))
+    
+    def test_count_units(self):
+        """個数単位は単位ごとに別の次元になるテスト"""
+        self.assertEqual(units.to_fixed(1, '箱'), ('count:箱', 10000))
+        self.assertEqual(units.to_fixed(1, '少々'), ('other:少々', 10000))
+    
+    def test_unit_first_notation(self):
+        """「大さじ2」表記（LineTextParserの出力）の換算テスト"""
+        self.assertEqual(units.to_fixed(1.0, '大さじ2'), (units.VOLUME, 300000))
+    
+    def test_aggregate_across_units(self):
+        """異なる単位の合算テスト"""
+        totals = units.aggregate([
+            ('鶏肉', '鶏肉', Decimal('300.0'), 'g'),
+            ('鶏肉', '鶏肉', Decimal('0.2'), 'kg'),
+            ('醤油', '醤油', Decimal('2.0'), '大さじ'),
+            ('醤油', '醤油', Decimal('10.0'), 'g'),
+            ('卵', '卵', Decimal('2.0'), '個'),
+        ])
+        
+        self.assertEqual(totals[('鶏肉', units.MASS)], 5000000)
+        self.assertEqual(units.from_fixed(units.MASS, totals[('鶏肉', units.MASS)]), (500.0, 'g'))
+        self.assertEqual(units.from_fixed(units.MASS, totals[('醤油', units.MASS)]), (46.0, 'g'))
+        self.assertEqual(units.from_fixed('count:個', totals[('卵', 'count:個')]), (2.0, '個'))
+    
+    def test_from_fixed_large_values(self):
+        """大きな値はkg/lで表示するテスト"""
+        self.assertEqual(units.from_fixed(units.MASS, 12000000), (1.2, 'kg'))
+        self.assertEqual(units.from_fixed(units.VOLUME, 15000000), (1.5, 'l'))
@@ -0,0 +1,11 @@
+# daily_dish/testing.py
+"""
+テスト共通の設定
+
+キャッシュを使うテストは override_settings(CACHES=LOCMEM_CACHES) でプロセス内キャッシュに切り替える
+（Redisに依存せず、setUp の cache.clear() でテストごとに空にできる）。
+"""
+
+LOCMEM_CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+}
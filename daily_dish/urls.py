@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from . import views_web, views_external, views_line
+from . import views_web, views_external, views_internal, views_line
 
 app_name = 'daily_dish'
 
@@ -15,6 +15,8 @@ web_patterns = [
     # レシピ管理
     path('recipes/', views_web.RecipeListCreateView.as_view(), name='web_recipe_list'),
     path('recipes/<int:pk>/', views_web.RecipeDetailView.as_view(), name='web_recipe_detail'),
+    path('recipes/cookable/', views_web.cookable_recipes_view, name='web_recipe_cookable'),
+    path('shopping-list/', views_web.shopping_list_view, name='web_shopping_list'),
     
     # 料理履歴管理
     path('cooked-dishes/', views_web.CookedDishListCreateView.as_view(), name='web_cooked_dish_list'),
@@ -24,6 +26,7 @@ web_patterns = [
     path('ingredient-cache/', views_web.IngredientCacheListCreateView.as_view(), name='web_ingredient_cache_list'),
     path('ingredient-cache/<int:pk>/', views_web.IngredientCacheDetailView.as_view(), name='web_ingredient_cache_detail'),
     path('ingredient-cache/bulk-delete/', views_web.ingredient_cache_bulk_delete_view, name='web_ingredient_cache_bulk_delete'),
+    path('ingredients/suggest/', views_web.ingredient_suggest_view, name='web_ingredient_suggest'),
     
     # 統計・分析
     path('stats/', views_web.user_stats_view, name='web_stats'),
@@ -49,14 +52,27 @@ external_patterns = [
     path('stats/', views_external.external_stats_view, name='external_stats'),
     path('recent-activities/', views_external.external_recent_activities_view, name='external_recent_activities'),
     
+    # 一括エクスポート（NDJSONストリーミング）
+    path('export/<slug:resource>.ndjson', views_external.external_export_view, name='external_export'),
+    
+    # 差分同期フィード
+    path('changes/', views_external.external_changes_view, name='external_changes'),
+    
     # LINE連携機能
     path('users/link-line/', views_line.link_line_user, name='link_line_user'),
     path('recipes/from-line/', views_line.register_recipe_from_line, name='register_recipe_from_line'),
     path('line/webhook/', views_line.line_webhook, name='line_webhook'),
 ]
 
+# 運用向けのURL設定
+internal_patterns = [
+    # メトリクス（Prometheus）
+    path('metrics', views_internal.metrics_view, name='internal_metrics'),
+]
+
 # メインのURL設定
 urlpatterns = [
     path('api/web/', include(web_patterns)),
     path('api/external/', include(external_patterns)),
+    path('api/internal/', include(internal_patterns)),
 ]
\ No newline at end of file
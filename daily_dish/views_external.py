@@ -1,82 +1,121 @@
+import zlib
+
 from rest_framework import generics, status
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes, authentication_classes
+from rest_framework.decorators import api_view, permission_classes, authentication_classes, renderer_classes
+from rest_framework.exceptions import NotFound
+from rest_framework.settings import api_settings
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from .models import Recipe, CookedDish, IngredientCache
+from django.http import StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+from .models import Recipe, CookedDish, IngredientCache, ChangeLog
 from .serializers import (
-    ExternalRecipeSerializer, 
+    ExternalRecipeSerializer, ExternalRecipeSummarySerializer,
     ExternalCookedDishSerializer, 
     ExternalIngredientCacheSerializer
 )
+from .row_serializers import (
+    RowListMixin, ExternalRecipeRowSerializer, ExternalRecipeSummaryRowSerializer,
+    ExternalCookedDishRowSerializer, ExternalIngredientCacheRowSerializer
+)
 from .permissions import IsApiKeyAuthenticated
 from .authentication import ApiKeyAuthentication
+from .renderers import NDJSONRenderer, dumps_line
+from .services.metrics import SerializerTimingMixin
+from .services.conditional import (
+    ConditionalGetMixin, conditional_view, EXTERNAL,
+    RECIPES, COOKED_DISHES, INGREDIENT_CACHE, USERS
+)
+from .services.response_cache import ResponseCacheMixin, accepted_encodings, cached_response
+from .services import change_feed, counters, dashboard
 
 User = get_user_model()
 
 
-class ExternalRecipeListView(generics.ListAPIView):
+class ExternalRecipeListView(ConditionalGetMixin, ResponseCacheMixin, SerializerTimingMixin, RowListMixin, generics.ListAPIView):
     """
     外部アプリ向けレシピ一覧API
     GET /api/external/recipes/
+    GET /api/external/recipes/?expand=ingredients&fields=id,recipe_name,ingredients
+    一覧は軽量な形式（材料数のみ）で返し、材料は ?expand=ingredients で追加する
     """
-    serializer_class = ExternalRecipeSerializer
+    serializer_class = ExternalRecipeSummarySerializer
+    row_serializer_class = ExternalRecipeSummaryRowSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (RECIPES,)
+    response_cache_params = ('page', 'page_size', 'cursor', 'count', 'expand', 'fields')
     
     def get_queryset(self):
         # 全ユーザーのレシピを取得（外部アプリは全データアクセス可能）
-        return Recipe.objects.all().order_by('-created_at')
+        return Recipe.objects.listing().order_by('-created_at', '-id')
 
 
-class ExternalRecipeDetailView(generics.RetrieveAPIView):
+class ExternalRecipeDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveAPIView):
     """
     外部アプリ向けレシピ詳細API
     GET /api/external/recipes/{id}/
     """
-    queryset = Recipe.objects.all()
+    queryset = Recipe.objects.listing()
     serializer_class = ExternalRecipeSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (RECIPES,)
 
 
-class ExternalCookedDishListView(generics.ListAPIView):
+class ExternalCookedDishListView(ConditionalGetMixin, ResponseCacheMixin, SerializerTimingMixin, RowListMixin, generics.ListAPIView):
     """
     外部アプリ向け料理履歴一覧API
     GET /api/external/cooked-dishes/
     """
     serializer_class = ExternalCookedDishSerializer
+    row_serializer_class = ExternalCookedDishRowSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (COOKED_DISHES, RECIPES)
+    response_cache_params = ('page', 'page_size', 'cursor', 'count', 'expand', 'fields')
     
     def get_queryset(self):
-        return CookedDish.objects.all().order_by('-created_at')
+        return CookedDish.objects.select_related('recipe').only(
+            'id', 'created_at', 'recipe__recipe_name'
+        ).order_by('-created_at', '-id')
 
 
-class ExternalCookedDishDetailView(generics.RetrieveAPIView):
+class ExternalCookedDishDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveAPIView):
     """
     外部アプリ向け料理履歴詳細API
     GET /api/external/cooked-dishes/{id}/
     """
-    queryset = CookedDish.objects.all()
+    queryset = CookedDish.objects.select_related('recipe').only('id', 'created_at', 'recipe__recipe_name')
     serializer_class = ExternalCookedDishSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (COOKED_DISHES, RECIPES)
 
 
-class ExternalIngredientCacheListView(generics.ListAPIView):
+class ExternalIngredientCacheListView(ConditionalGetMixin, ResponseCacheMixin, SerializerTimingMixin, RowListMixin, generics.ListAPIView):
     """
     外部アプリ向け食材キャッシュ一覧API
     GET /api/external/ingredient-cache/
     """
     serializer_class = ExternalIngredientCacheSerializer
+    row_serializer_class = ExternalIngredientCacheRowSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (INGREDIENT_CACHE,)
+    response_cache_params = ('page', 'page_size', 'cursor', 'count', 'expand', 'fields')
     
     def get_queryset(self):
-        return IngredientCache.objects.all().order_by('-created_at')
+        return IngredientCache.objects.all().order_by('-created_at', '-id')
 
 
-class ExternalIngredientCacheDetailView(generics.RetrieveAPIView):
+class ExternalIngredientCacheDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveAPIView):
     """
     外部アプリ向け食材キャッシュ詳細API
     GET /api/external/ingredient-cache/{id}/
@@ -85,22 +124,28 @@ class ExternalIngredientCacheDetailView(generics.RetrieveAPIView):
     serializer_class = ExternalIngredientCacheSerializer
     authentication_classes = [ApiKeyAuthentication]
     permission_classes = [IsApiKeyAuthenticated]
+    conditional_surface = EXTERNAL
+    validator_resources = (INGREDIENT_CACHE,)
+
+
+# 統計・最近のアクティビティが依存するリソース（全クライアント共通のためバイト列でキャッシュ）
+STATS_RESOURCES = (RECIPES, COOKED_DISHES, INGREDIENT_CACHE, USERS)
+STATS_SCOPES = (dashboard.DASHBOARD_VERSION,)
+RECENT_ACTIVITIES_RESOURCES = (RECIPES, COOKED_DISHES)
 
 
 @api_view(['GET'])
 @authentication_classes([ApiKeyAuthentication])
 @permission_classes([IsApiKeyAuthenticated])
+@conditional_view(EXTERNAL, STATS_RESOURCES, extra_scopes=STATS_SCOPES)
+@cached_response(STATS_RESOURCES, extra_scopes=STATS_SCOPES)
 def external_stats_view(request):
     """
     外部アプリ向け統計情報API
     GET /api/external/stats/
     """
-    stats = {
-        'total_recipes': Recipe.objects.count(),
-        'total_cooked_dishes': CookedDish.objects.count(),
-        'total_users': User.objects.count(),
-        'total_ingredient_cache': IngredientCache.objects.count(),
-    }
+    # テーブル全体のCOUNT(*)ではなくカウンター1行を読む
+    stats = counters.get_global_stats()
     
     return Response(stats)
 
@@ -108,22 +153,185 @@ def external_stats_view(request):
 @api_view(['GET'])
 @authentication_classes([ApiKeyAuthentication])
 @permission_classes([IsApiKeyAuthenticated])
+@conditional_view(EXTERNAL, RECENT_ACTIVITIES_RESOURCES)
+@cached_response(RECENT_ACTIVITIES_RESOURCES)
 def external_recent_activities_view(request):
     """
     外部アプリ向け最近のアクティビティAPI
     GET /api/external/recent-activities/
     """
     # 最近の料理履歴（10件）
-    recent_cooked = CookedDish.objects.select_related('recipe').order_by('-created_at')[:10]
+    recent_cooked = CookedDish.objects.select_related('recipe').only(
+        'id', 'created_at', 'recipe__recipe_name'
+    ).order_by('-created_at', '-id')[:10]
     recent_cooked_data = ExternalCookedDishSerializer(recent_cooked, many=True).data
     
     # 最近のレシピ（10件）
-    recent_recipes = Recipe.objects.order_by('-created_at')[:10]
-    recent_recipes_data = ExternalRecipeSerializer(recent_recipes, many=True).data
+    recent_recipes = Recipe.objects.listing().order_by('-created_at', '-id')[:10]
+    recent_recipes_data = ExternalRecipeSummarySerializer(recent_recipes, many=True).data
     
     activities = {
         'recent_cooked_dishes': recent_cooked_data,
         'recent_recipes': recent_recipes_data,
     }
     
-    return Response(activities)
\ No newline at end of file
+    return Response(activities)
+
+
+# エクスポート対象: リソース名 -> (クエリセット, シリアライザー, 行シリアライザー)
+EXPORT_RESOURCES = {
+    'recipes': (
+        lambda: Recipe.objects.listing().order_by('id'),
+        ExternalRecipeSerializer,
+        ExternalRecipeRowSerializer,
+    ),
+    'cooked-dishes': (
+        lambda: CookedDish.objects.select_related('recipe').only(
+            'id', 'created_at', 'recipe__recipe_name'
+        ).order_by('id'),
+        ExternalCookedDishSerializer,
+        ExternalCookedDishRowSerializer,
+    ),
+    'ingredient-cache': (
+        lambda: IngredientCache.objects.only(
+            'id', 'ingredient_name', 'amount', 'unit', 'created_at'
+        ).order_by('id'),
+        ExternalIngredientCacheSerializer,
+        ExternalIngredientCacheRowSerializer,
+    ),
+}
+
+# 書き込み1回あたりのバッファサイズ
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+def iter_export_lines(queryset, serializer, chunk_size):
+    """クエリセットをchunk_size件ずつ読み込み、NDJSONをまとめて返す（serializerはto_representationを持つもの）"""
+    buffer = []
+    buffered = 0
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        line = dumps_line(serializer.to_representation(obj))
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= EXPORT_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            buffered = 0
+    if buffer:
+        yield b''.join(buffer)
+
+
+def iter_gzip(chunks):
+    """チャンク列をgzip圧縮しながら返す"""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+@api_view(['GET'])
+@authentication_classes([ApiKeyAuthentication])
+@permission_classes([IsApiKeyAuthenticated])
+@renderer_classes(list(api_settings.DEFAULT_RENDERER_CLASSES) + [NDJSONRenderer])
+def external_export_view(request, resource):
+    """
+    外部アプリ向け一括エクスポートAPI（NDJSONストリーミング）
+    GET /api/external/export/{recipes|cooked-dishes|ingredient-cache}.ndjson
+    Accept-Encoding: gzip を指定するとgzip圧縮して返す
+    X-Change-Seq ヘッダーの値を差分同期フィードの since に使う
+    """
+    if resource not in EXPORT_RESOURCES:
+        raise NotFound(f'Unknown resource: {resource}')
+    
+    queryset_factory, _, row_serializer_class = EXPORT_RESOURCES[resource]
+    # エクスポート開始時点のseq（以降は差分同期フィードで追従できる）
+    change_seq = change_feed.latest_seq()
+    chunk_size = getattr(settings, 'EXPORT_CHUNK_SIZE', 2000)
+    # モデルインスタンスを作らずvalues()の行から直接出力する
+    serializer = row_serializer_class()
+    queryset = queryset_factory().values(*serializer.columns)
+    chunks = iter_export_lines(queryset, serializer, chunk_size)
+    
+    # q値を考慮する（gzip;q=0 は圧縮しない）
+    accepted = accepted_encodings(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+    use_gzip = 'gzip' in accepted or '*' in accepted
+    if use_gzip:
+        chunks = iter_gzip(chunks)
+    
+    response = StreamingHttpResponse(chunks, content_type='application/x-ndjson; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{resource}.ndjson"'
+    response['X-Change-Seq'] = str(change_seq)
+    if use_gzip:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([ApiKeyAuthentication])
+@permission_classes([IsApiKeyAuthenticated])
+def external_changes_view(request):
+    """
+    外部アプリ向け差分同期API
+    GET /api/external/changes/?since=0&limit=500
+    前回レスポンスの next_since を since に指定すると、それ以降の変更だけを返す。
+    削除は action=delete（data なし）のトゥームストーンとして返す。
+    変更履歴の保持期間（CHANGE_LOG_RETENTION_DAYS）より古い since は410を返す。
+    """
+    try:
+        since = int(request.query_params.get('since', 0))
+        limit = int(request.query_params.get('limit', 500))
+    except (ValueError, TypeError):
+        return Response(
+            {'error': 'sinceとlimitは整数で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if since < 0 or not 1 <= limit <= 1000:
+        return Response(
+            {'error': 'sinceは0以上、limitは1〜1000で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if change_feed.is_cursor_expired(since):
+        return Response(
+            {'error': 'sinceより後の変更履歴は削除済みです。エクスポートからやり直してください'},
+            status=status.HTTP_410_GONE
+        )
+    
+    entries, next_since, has_more = change_feed.read_changes(since, limit)
+    
+    # 更新されたオブジェクトをリソースごとにまとめて取得
+    upsert_ids = {}
+    for entry in entries:
+        if entry.action == ChangeLog.ACTION_UPSERT:
+            upsert_ids.setdefault(entry.resource, []).append(entry.object_id)
+    objects = {
+        resource: EXPORT_RESOURCES[resource][0]().in_bulk(ids)
+        for resource, ids in upsert_ids.items()
+    }
+    serializers = {resource: EXPORT_RESOURCES[resource][1]() for resource in upsert_ids}
+    
+    changes = []
+    for entry in entries:
+        change = {
+            'seq': entry.seq,
+            'resource': entry.resource,
+            'id': entry.object_id,
+            'action': entry.action,
+        }
+        if entry.action == ChangeLog.ACTION_UPSERT:
+            obj = objects[entry.resource].get(entry.object_id)
+            if obj is None:
+                # 後続の変更で削除済み（トゥームストーンは後のページで返る）
+                continue
+            change['data'] = serializers[entry.resource].to_representation(obj)
+        changes.append(change)
+    
+    return Response({
+        'changes': changes,
+        'next_since': next_since,
+        'has_more': has_more,
+    })
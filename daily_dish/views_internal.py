@@ -0,0 +1,17 @@
+from django.http import HttpResponse
+from rest_framework.decorators import api_view, permission_classes, authentication_classes
+
+from .permissions import IsMetricsScraper
+from .services import metrics
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([IsMetricsScraper])
+def metrics_view(request):
+    """
+    メトリクスAPI（Prometheusテキスト形式、gunicorn.conf.py で起動したときは全ワーカーの合計）
+    GET /api/internal/metrics
+    Authorization: Bearer <METRICS_TOKEN>
+    """
+    return HttpResponse(metrics.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -2,22 +2,33 @@ from rest_framework import generics, status
 from rest_framework.response import Response
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.permissions import IsAuthenticated
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.contrib.auth import get_user_model
-from .models import Recipe, CookedDish, IngredientCache
+from .models import Recipe, CookedDish, IngredientCache, COOKED_DISH_LISTING_FIELDS
 from .serializers import (
     UserSerializer, UserCreateSerializer,
-    RecipeSerializer,
+    RecipeSerializer, RecipeSummarySerializer,
     CookedDishSerializer, IngredientCacheSerializer
 )
+from .row_serializers import (
+    RowListMixin, RecipeSummaryRowSerializer,
+    CookedDishRowSerializer, IngredientCacheRowSerializer
+)
 from .permissions import IsJWTAuthenticated, IsOwner, IsOwnerOrReadOnly
 from .authentication import HybridAuthentication
+from .services.metrics import SerializerTimingMixin
+from .services.conditional import (
+    ConditionalGetMixin, conditional_view, WEB,
+    RECIPES, COOKED_DISHES, INGREDIENT_CACHE, USERS
+)
+from .services import cookable, counters, dashboard, search, shopping_list, suggest, units
 
 User = get_user_model()
 
 
 # 認証関連
-class UserCreateView(generics.CreateAPIView):
+class UserCreateView(SerializerTimingMixin, generics.CreateAPIView):
     """
     ユーザー登録API
     POST /api/web/auth/register/
@@ -27,7 +38,7 @@ class UserCreateView(generics.CreateAPIView):
     permission_classes = []  # 登録は誰でも可能
 
 
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class UserProfileView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveUpdateAPIView):
     """
     ユーザープロフィール取得・更新API
     GET/PUT/PATCH /api/web/auth/profile/
@@ -35,27 +46,51 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     serializer_class = UserSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated]
+    validator_resources = (USERS,)
     
     def get_object(self):
         return self.request.user
 
 
 # レシピ関連
-class RecipeListCreateView(generics.ListCreateAPIView):
+class RecipeListCreateView(ConditionalGetMixin, SerializerTimingMixin, RowListMixin, generics.ListCreateAPIView):
     """
     レシピ一覧・作成API
     GET/POST /api/web/recipes/
+    GET /api/web/recipes/?ingredient=鶏肉
+    GET /api/web/recipes/?search=カレー
+    GET /api/web/recipes/?expand=ingredients&fields=id,recipe_name,ingredients
+    一覧は軽量な形式（材料数のみ）で返し、材料は ?expand=ingredients で追加する
+    一覧はRecipeSummarySerializerと同じ形式をvalues()の行から直接組み立てる
     """
     serializer_class = RecipeSerializer
+    row_serializer_class = RecipeSummaryRowSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated]
+    validator_resources = (RECIPES, USERS)
+    
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return RecipeSummarySerializer
+        return RecipeSerializer
     
     def get_queryset(self):
-        # ログインユーザーのレシピのみ取得
-        return Recipe.objects.filter(user=self.request.user).order_by('-created_at')
+        # ログインユーザーのレシピのみ取得（一覧は必要な列だけ読み込む）
+        queryset = Recipe.objects.filter(user=self.request.user).listing().order_by('-created_at', '-id')
+        
+        # ?ingredient=鶏肉 で材料による絞り込み
+        ingredient = self.request.query_params.get('ingredient')
+        if ingredient:
+            queryset = queryset.using_ingredient(ingredient.strip())
+        
+        # ?search=カレー でレシピ名・材料名の全文検索
+        query = self.request.query_params.get('search')
+        if query:
+            queryset = search.search_recipes(queryset, query)
+        return queryset
 
 
-class RecipeDetailView(generics.RetrieveUpdateDestroyAPIView):
+class RecipeDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     レシピ詳細・更新・削除API
     GET/PUT/PATCH/DELETE /api/web/recipes/{id}/
@@ -63,26 +98,116 @@ class RecipeDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = RecipeSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated, IsOwner]
+    validator_resources = (RECIPES, USERS)
     
     def get_queryset(self):
-        return Recipe.objects.filter(user=self.request.user)
+        # シリアライザーのuser（ユーザー名）を同じクエリで取得
+        return Recipe.objects.filter(user=self.request.user).select_related('user')
+
+
+@api_view(['GET'])
+@authentication_classes([HybridAuthentication])
+@permission_classes([IsJWTAuthenticated])
+def cookable_recipes_view(request):
+    """
+    手持ち食材で作れるレシピAPI
+    GET /api/web/recipes/cookable/?min_coverage=0.5&limit=20
+    """
+    try:
+        min_coverage = float(request.query_params.get('min_coverage', 0))
+        limit = request.query_params.get('limit')
+        limit = int(limit) if limit else None
+    except (ValueError, TypeError):
+        return Response(
+            {'error': 'min_coverageとlimitは数値で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if limit is not None and limit < 1:
+        return Response(
+            {'error': 'limitは1以上で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    results = cookable.get_index(request.user.id).rank(min_coverage=min_coverage, limit=limit)
+    
+    return Response({
+        'count': len(results),
+        'results': results,
+    })
+
+
+@api_view(['POST'])
+@authentication_classes([HybridAuthentication])
+@permission_classes([IsJWTAuthenticated])
+def shopping_list_view(request):
+    """
+    買い物リストAPI（選択したレシピの材料合計から手持ち食材を差し引く）
+    POST /api/web/shopping-list/
+    Body: {"recipes": [{"id": 1, "multiplier": 2}, {"id": 3}]}
+    """
+    recipes = request.data.get('recipes', [])
+    
+    if not recipes:
+        return Response(
+            {'error': 'レシピを指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if not isinstance(recipes, list):
+        return Response(
+            {'error': 'recipesは配列で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    # レシピID -> 倍率（1/10単位の整数）
+    selections = {}
+    try:
+        for item in recipes:
+            recipe_id = int(item['id'])
+            multiplier = units.to_tenths(float(item.get('multiplier', 1)))
+            if not 0 < multiplier <= 1000:
+                raise ValueError
+            selections[recipe_id] = selections.get(recipe_id, 0) + multiplier
+    except (KeyError, ValueError, TypeError, OverflowError):
+        return Response(
+            {'error': 'idは整数、multiplierは0より大きく100以下の数値で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    result = shopping_list.get_shopping_list(request.user.id, selections)
+    
+    if not result['recipes']:
+        return Response(
+            {'error': '対象のレシピが見つかりません'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    return Response(result)
 
 
 # 料理履歴関連
-class CookedDishListCreateView(generics.ListCreateAPIView):
+class CookedDishListCreateView(ConditionalGetMixin, SerializerTimingMixin, RowListMixin, generics.ListCreateAPIView):
     """
     料理履歴一覧・作成API
     GET/POST /api/web/cooked-dishes/
     """
     serializer_class = CookedDishSerializer
+    row_serializer_class = CookedDishRowSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated]
+    validator_resources = (COOKED_DISHES, RECIPES, USERS)
     
     def get_queryset(self):
-        return CookedDish.objects.filter(user=self.request.user).order_by('-created_at')
+        return (
+            CookedDish.objects.filter(user=self.request.user)
+            .select_related('recipe', 'user')
+            .only(*COOKED_DISH_LISTING_FIELDS)
+            .order_by('-created_at', '-id')
+        )
 
 
-class CookedDishDetailView(generics.RetrieveDestroyAPIView):
+class CookedDishDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveDestroyAPIView):
     """
     料理履歴詳細・削除API
     GET/DELETE /api/web/cooked-dishes/{id}/
@@ -90,26 +215,33 @@ class CookedDishDetailView(generics.RetrieveDestroyAPIView):
     serializer_class = CookedDishSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated, IsOwner]
+    validator_resources = (COOKED_DISHES, RECIPES, USERS)
     
     def get_queryset(self):
-        return CookedDish.objects.filter(user=self.request.user)
+        return (
+            CookedDish.objects.filter(user=self.request.user)
+            .select_related('recipe', 'user')
+            .only(*COOKED_DISH_LISTING_FIELDS)
+        )
 
 
 # 食材キャッシュ関連
-class IngredientCacheListCreateView(generics.ListCreateAPIView):
+class IngredientCacheListCreateView(ConditionalGetMixin, SerializerTimingMixin, RowListMixin, generics.ListCreateAPIView):
     """
     食材キャッシュ一覧・作成API
     GET/POST /api/web/ingredient-cache/
     """
     serializer_class = IngredientCacheSerializer
+    row_serializer_class = IngredientCacheRowSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated]
+    validator_resources = (INGREDIENT_CACHE, USERS)
     
     def get_queryset(self):
-        return IngredientCache.objects.filter(user=self.request.user).order_by('-created_at')
+        return IngredientCache.objects.filter(user=self.request.user).select_related('user').order_by('-created_at', '-id')
 
 
-class IngredientCacheDetailView(generics.RetrieveUpdateDestroyAPIView):
+class IngredientCacheDetailView(ConditionalGetMixin, SerializerTimingMixin, generics.RetrieveUpdateDestroyAPIView):
     """
     食材キャッシュ詳細・更新・削除API
     GET/PUT/PATCH/DELETE /api/web/ingredient-cache/{id}/
@@ -117,9 +249,10 @@ class IngredientCacheDetailView(generics.RetrieveUpdateDestroyAPIView):
     serializer_class = IngredientCacheSerializer
     authentication_classes = [HybridAuthentication]
     permission_classes = [IsJWTAuthenticated, IsOwner]
+    validator_resources = (INGREDIENT_CACHE, USERS)
     
     def get_queryset(self):
-        return IngredientCache.objects.filter(user=self.request.user)
+        return IngredientCache.objects.filter(user=self.request.user).select_related('user')
 
 
 @api_view(['DELETE'])
@@ -155,22 +288,21 @@ def ingredient_cache_bulk_delete_view(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # ユーザーが所有する食材キャッシュのみ削除
-    ingredient_caches = IngredientCache.objects.filter(
-        user=request.user,
+    # ユーザーが所有する食材キャッシュのみ削除（対象IDは1クエリで取得）
+    deleted_ids = list(IngredientCache.objects.filter(
+        user_id=request.user.id,
         id__in=ids
-    )
+    ).values_list('id', flat=True))
     
-    if not ingredient_caches.exists():
+    if not deleted_ids:
         return Response(
             {'error': '削除対象の食材が見つかりません'},
             status=status.HTTP_404_NOT_FOUND
         )
     
     # 削除実行
-    deleted_count = ingredient_caches.count()
-    deleted_ids = list(ingredient_caches.values_list('id', flat=True))
-    ingredient_caches.delete()
+    deleted_count = len(deleted_ids)
+    IngredientCache.objects.filter(id__in=deleted_ids).delete()
     
     return Response({
         'message': f'{deleted_count}件の食材を削除しました',
@@ -179,77 +311,122 @@ def ingredient_cache_bulk_delete_view(request):
     }, status=status.HTTP_200_OK)
 
 
-# 統計・分析関連
 @api_view(['GET'])
-@authentication_classes([HybridAuthentication])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsJWTAuthenticated])
-def user_stats_view(request):
+def ingredient_suggest_view(request):
     """
-    ユーザー統計情報API
-    GET /api/web/stats/
+    食材名の入力補完API（キー入力ごとに呼ばれるためDBにアクセスしない）
+    GET /api/web/ingredients/suggest/?q=とり&limit=10
     """
-    user = request.user
+    try:
+        limit = int(request.query_params.get('limit', 10))
+    except (ValueError, TypeError):
+        return Response(
+            {'error': 'limitは数値で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    stats = {
-        'total_recipes': Recipe.objects.filter(user=user).count(),
-        'total_cooked_dishes': CookedDish.objects.filter(user=user).count(),
-        'total_ingredient_cache': IngredientCache.objects.filter(user=user).count(),
-    }
+    if not 1 <= limit <= 50:
+        return Response(
+            {'error': 'limitは1〜50で指定してください'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
-    return Response(stats)
+    query = request.query_params.get('q', '')
+    # トークンのユーザーIDのみ使用（ユーザーの取得は行わない）
+    results = suggest.suggest(int(request.user.id), query, limit)
+    
+    return Response({
+        'query': query,
+        'results': results,
+    })
+
+
+# 統計・分析関連（ユーザーごとにキャッシュ、キャッシュが有効な間はDBにアクセスしない）
+DASHBOARD_RESOURCES = (RECIPES, COOKED_DISHES, INGREDIENT_CACHE, USERS)
 
 
 @api_view(['GET'])
-@authentication_classes([HybridAuthentication])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsJWTAuthenticated])
-def user_recent_activities_view(request):
+@conditional_view(WEB, DASHBOARD_RESOURCES, extra_scopes=(dashboard.DASHBOARD_VERSION,))
+def user_stats_view(request):
     """
-    ユーザーの最近のアクティビティAPI
-    GET /api/web/recent-activities/
+    ユーザー統計情報API
+    GET /api/web/stats/
     """
-    user = request.user
+    stats = dashboard.get_payload(
+        'stats', request.user.id,
+        lambda user: counters.get_user_stats(user.id)
+    )
     
+    return Response(stats)
+
+
+def _recent_activities(user):
     # 最近の料理履歴（5件）
-    recent_cooked = CookedDish.objects.filter(user=user).select_related('recipe').order_by('-created_at')[:5]
+    recent_cooked = (
+        CookedDish.objects.filter(user=user)
+        .select_related('recipe', 'user')
+        .only(*COOKED_DISH_LISTING_FIELDS)
+        .order_by('-created_at', '-id')[:5]
+    )
     recent_cooked_data = CookedDishSerializer(recent_cooked, many=True).data
     
     # 最近のレシピ（5件）
-    recent_recipes = Recipe.objects.filter(user=user).order_by('-created_at')[:5]
-    recent_recipes_data = RecipeSerializer(recent_recipes, many=True).data
+    recent_recipes = Recipe.objects.filter(user=user).listing().order_by('-created_at', '-id')[:5]
+    recent_recipes_data = RecipeSummarySerializer(recent_recipes, many=True).data
     
-    activities = {
+    return {
         'recent_cooked_dishes': recent_cooked_data,
         'recent_recipes': recent_recipes_data,
     }
-    
-    return Response(activities)
 
 
 @api_view(['GET'])
-@authentication_classes([HybridAuthentication])
+@authentication_classes([JWTStatelessUserAuthentication])
 @permission_classes([IsJWTAuthenticated])
-def user_dashboard_view(request):
+@conditional_view(WEB, DASHBOARD_RESOURCES, extra_scopes=(dashboard.DASHBOARD_VERSION,))
+def user_recent_activities_view(request):
     """
-    ユーザーダッシュボード情報API
-    GET /api/web/dashboard/
+    ユーザーの最近のアクティビティAPI
+    GET /api/web/recent-activities/
     """
-    user = request.user
+    activities = dashboard.get_payload('recent_activities', request.user.id, _recent_activities)
     
-    # 統計情報
-    stats = {
-        'total_recipes': Recipe.objects.filter(user=user).count(),
-        'total_cooked_dishes': CookedDish.objects.filter(user=user).count(),
-        'total_ingredient_cache': IngredientCache.objects.filter(user=user).count(),
-    }
+    return Response(activities)
+
+
+def _dashboard(user):
+    # 統計情報（カウンター1行の読み込み）
+    stats = counters.get_user_stats(user.id)
     
     # 最近のアクティビティ
-    recent_cooked = CookedDish.objects.filter(user=user).select_related('recipe').order_by('-created_at')[:3]
+    recent_cooked = (
+        CookedDish.objects.filter(user=user)
+        .select_related('recipe', 'user')
+        .only(*COOKED_DISH_LISTING_FIELDS)
+        .order_by('-created_at', '-id')[:3]
+    )
     recent_cooked_data = CookedDishSerializer(recent_cooked, many=True).data
     
-    dashboard = {
+    return {
         'stats': stats,
         'recent_activities': recent_cooked_data,
         'user_info': UserSerializer(user).data,
     }
+
+
+@api_view(['GET'])
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsJWTAuthenticated])
+@conditional_view(WEB, DASHBOARD_RESOURCES, extra_scopes=(dashboard.DASHBOARD_VERSION,))
+def user_dashboard_view(request):
+    """
+    ユーザーダッシュボード情報API
+    GET /api/web/dashboard/
+    """
+    dashboard_data = dashboard.get_payload('dashboard', request.user.id, _dashboard)
     
-    return Response(dashboard)
\ No newline at end of file
+    return Response(dashboard_data)
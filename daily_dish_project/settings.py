@@ -71,6 +71,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # 計測（SQL件数・レイテンシ）はすべてのミドルウェアを含めるため先頭に置く
+    'daily_dish.middleware.MetricsMiddleware',
+    'daily_dish.middleware.SlowQueryLogMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -175,10 +178,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # orjsonによる高速化（JSONRenderer/JSONParserと同じ入出力、未インストール時は標準のjson）
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'daily_dish.renderers.FastJSONRenderer',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PARSER_CLASSES': [
+        'daily_dish.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # キーセット（?cursor=）・件数なし（?count=false）・?page_size= に対応
+    'DEFAULT_PAGINATION_CLASS': 'daily_dish.pagination.KeysetPagination',
     'PAGE_SIZE': 20
 }
 
@@ -215,6 +225,62 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# 計測設定
+# /api/internal/metrics の認証トークン（未設定時は無効）
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+# Server-Timing ヘッダーを付与する
+SERVER_TIMING = os.environ.get('SERVER_TIMING', str(DEBUG)).lower() == 'true'
+# エンドポイントごとのSQLクエリ数の上限（"メソッド URL名" または "URL名"）
+# 件数・ページサイズによらず一定であるべき値（N+1の検出用）。Web APIはJWT認証の
+# ユーザー取得、外部APIは初回のAPI Key取得と使用回数の反映を含む
+QUERY_BUDGETS = {
+    'GET daily_dish:web_recipe_list': 5,  # ?ingredient= / ?search= の食材ID解決を含む
+    'GET daily_dish:web_recipe_detail': 2,
+    'GET daily_dish:web_cooked_dish_list': 3,
+    'GET daily_dish:web_cooked_dish_detail': 2,
+    'GET daily_dish:web_ingredient_cache_list': 3,
+    'GET daily_dish:web_ingredient_cache_detail': 2,
+    'GET daily_dish:web_recent_activities': 3,
+    'GET daily_dish:web_dashboard': 3,
+    'GET daily_dish:external_recipe_list': 4,
+    'GET daily_dish:external_recipe_detail': 3,
+    'GET daily_dish:external_cooked_dish_list': 4,
+    'GET daily_dish:external_cooked_dish_detail': 3,
+    'GET daily_dish:external_ingredient_cache_list': 4,
+    'GET daily_dish:external_ingredient_cache_detail': 3,
+    'GET daily_dish:external_recent_activities': 4,
+}
+# 上限超過を例外にする（テストでは override_settings で有効にする）
+QUERY_BUDGET_STRICT = os.environ.get('QUERY_BUDGET_STRICT', 'false').lower() == 'true'
+# このミリ秒を超えたクエリを実行計画付きで slow_queries.log に出力する（0で無効）
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 200)) or None
+
+# 条件付きリクエスト（ETag / Last-Modified、daily_dish/services/conditional.py）
+# レスポンスの形式が変わるデプロイで値を変えると、古いETagを一致させない
+ETAG_SALT = os.environ.get('ETAG_SALT', '')
+# APIの種類ごとの Cache-Control
+API_CACHE_CONTROL = {
+    'web': 'private, no-cache',
+    'external': f"private, max-age={int(os.environ.get('EXTERNAL_API_MAX_AGE', 15))}",
+}
+
+# 外部APIのレスポンスキャッシュ（daily_dish/services/response_cache.py）
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 300))
+
+# 差分同期フィード（daily_dish/services/change_feed.py）
+# ChangeLogを残す日数（prune_change_log で削除、これより古いカーソルはエクスポートからやり直す）
+CHANGE_LOG_RETENTION_DAYS = int(os.environ.get('CHANGE_LOG_RETENTION_DAYS', 30))
+
+# キャッシュの作り直し（daily_dish/services/stampede.py）
+# 作り直し中のロックの有効期限と、値がないときに他のリクエストが出来上がりを待つ上限（秒）
+# ロックの有効期限は最も遅い作り直しより長くする（途中で切れると別のリクエストも作り直し始める）
+CACHE_LOCK_TIMEOUT = int(os.environ.get('CACHE_LOCK_TIMEOUT', 10))
+CACHE_LOCK_WAIT = float(os.environ.get('CACHE_LOCK_WAIT', 2.0))
+# 有効期限を過ぎた値を作り直し中に返す期間（秒）
+CACHE_STALE_TIMEOUT = int(os.environ.get('CACHE_STALE_TIMEOUT', 300))
+# 期限前に作り直す確率の強さ（大きいほど早めに作り直す、0で無効）
+CACHE_EARLY_REFRESH_BETA = float(os.environ.get('CACHE_EARLY_REFRESH_BETA', 1.0))
+
 # LINE Bot API設定
 LINE_CHANNEL_SECRET = os.environ.get('LINE_CHANNEL_SECRET', '')
 LINE_CHANNEL_ACCESS_TOKEN = os.environ.get('LINE_CHANNEL_ACCESS_TOKEN', '')
@@ -226,10 +292,18 @@ RECIPE_PARSER_API_KEY = os.environ.get('RECIPE_PARSER_API_KEY', '')
 # セッション管理（Redis設定）
 CACHES = {
     'default': {
-        'BACKEND': 'django_redis.cache.RedisCache',
+        # プロセス内LRU（L1）+ Redis（L2）。Redis障害時はL1のみで動く（daily_dish/cache_backends.py）
+        'BACKEND': 'daily_dish.cache_backends.TieredRedisCache',
         'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/1'),
         'OPTIONS': {
             'CLIENT_CLASS': 'django_redis.client.DefaultClient',
+            # Redisが応答しないときにリクエストを待たせない
+            'SOCKET_CONNECT_TIMEOUT': float(os.environ.get('REDIS_CONNECT_TIMEOUT', 0.1)),
+            'SOCKET_TIMEOUT': float(os.environ.get('REDIS_SOCKET_TIMEOUT', 0.2)),
+            'L1_MAX_ENTRIES': int(os.environ.get('CACHE_L1_MAX_ENTRIES', 1000)),
+            'L1_TIMEOUT': 30,
+            'CIRCUIT_FAILURE_THRESHOLD': 2,
+            'CIRCUIT_RESET_TIMEOUT': 15,
         },
         'TIMEOUT': 300,  # 5分間
     }
@@ -244,6 +318,11 @@ LOGGING = {
             'format': '{levelname} {asctime} {module} {process:d} {thread:d} {message}',
             'style': '{',
         },
+        # メッセージ自体が1行のJSON
+        'json_line': {
+            'format': '{message}',
+            'style': '{',
+        },
     },
     'handlers': {
         'file': {
@@ -252,6 +331,15 @@ LOGGING = {
             'filename': os.path.join(BASE_DIR, 'line_bot.log'),
             'formatter': 'verbose',
         },
+        'slow_queries_file': {
+            'level': 'WARNING',
+            'class': 'logging.handlers.RotatingFileHandler',
+            'filename': os.environ.get('SLOW_QUERY_LOG_FILE', os.path.join(BASE_DIR, 'slow_queries.log')),
+            'maxBytes': 10 * 1024 * 1024,
+            'backupCount': 5,
+            'delay': True,  # 最初のスロークエリまでファイルを作らない
+            'formatter': 'json_line',
+        },
         'console': {
             'level': 'INFO',
             'class': 'logging.StreamHandler',
@@ -269,6 +357,11 @@ LOGGING = {
             'level': 'INFO',
             'propagate': False,
         },
+        'daily_dish.slow_queries': {
+            'handlers': ['slow_queries_file'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
         'django': {
             'handlers': ['console'],
             'level': 'ERROR',
@@ -32,6 +32,7 @@ export interface Recipe {
   is_new_recipe: boolean;
   created_at: string;
   updated_at: string;
+  ingredient_count?: number;
   ingredients: Array<{
     name: string;
     amount: number;
@@ -100,6 +101,9 @@ export const apiService = {
     let url = `${API_BASE}/web/recipes/`;
     const params = new URLSearchParams();
     
+    // 一覧は材料を含まない軽量な形式のため、材料の表示用に展開を指定
+    params.append('expand', 'ingredients');
+    
     if (page && page > 1) {
       params.append('page', page.toString());
     }
@@ -0,0 +1,28 @@
+# gunicorn.conf.py（gunicorn は起動ディレクトリのこのファイルを自動で読み込む）
+"""
+メトリクス（daily_dish/services/metrics.py）を複数ワーカーで集計するための設定
+
+各ワーカーは PROMETHEUS_MULTIPROC_DIR に値を書き出し、/api/internal/metrics は
+どのワーカーが応答しても全ワーカーの合計を返す。ディレクトリは起動のたびに空にする。
+"""
+import os
+import shutil
+import tempfile
+
+# prometheus_client は読み込まれた時点の環境変数で値の保存先（プロセス内 / ファイル）を決めるため、
+# どこかで読み込まれるより前に設定する。ワーカーはマスターからforkするため環境変数を引き継ぐ
+os.environ.setdefault('PROMETHEUS_MULTIPROC_DIR', os.path.join(tempfile.gettempdir(), 'daily_dish_metrics'))
+
+
+def on_starting(server):
+    """前回の起動のワーカーの値を破棄"""
+    directory = os.environ['PROMETHEUS_MULTIPROC_DIR']
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """終了したワーカーのゲージ（livesum）を集計から外す"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)